@@ -14,6 +14,7 @@ __license__ = "BSD-3"
 __version__ = '0.10.3'  # Use single quotes for bumpversion (see setup.cfg)
 
 
+from .aggregate import Aggregate, Avg, Collect, Count, Max, Min, Sum
 from .binary_predicate import OPERATORS, OPERATORS_TO_STR, BinaryPredicate
 from .cached import CachedEntriesConnector, JsonCachedConnector, PickleCachedConnector
 from .cache import (
@@ -33,24 +34,35 @@ from .csv import CsvConnector, CsvModeEnum
 from .dblp import DBLP_API_URL, DBLP_ALIASES, DblpConnector
 from .dict_util import reverse_dict, freeze_dict
 from .doc_type import DocType, doc_type_to_html
-from .download import DownloadConnector, download, downloads, now, trim_http
+from .download import (
+    DownloadConnector, Downloader, download, downloads, downloads_gen,
+    extract_response, extract_response_lxml, now, trim_http
+)
 from .entries_connector import EntriesConnector
-from .filesystem import check_writable_directory, ctime, find, mkdir, mtime, rm
+from .filesystem import (
+    FilesystemConnector, check_writable_directory, ctime, find, mkdir, mtime, rm
+)
 from .for_each import ForEachFilter, for_each_sub_entry
+from .full_text import FullTextFilter, FullTextIndex, FullTextIndexConnector, tokenize
+from .fuzzy_join import FuzzyJoinConnector, fuzzy_join
 from .google_scholar import GoogleScholarConnector
 from .group_by import GroupByConnector, group_by
 from .hal import HAL_API_URL, HAL_ALIASES, HalConnector
 from .html import (
-    connector_to_html, entry_to_html, entries_to_html, html, print_error, value_to_html
+    connector_to_html, entry_to_html, entries_to_html, html, html_to_text, html_to_text_lxml,
+    print_error, value_to_html
 )
-from .html_table import HtmlTableConnector, HtmlTableParser, html_table
+from .html_table import (
+    HtmlTableConnector, HtmlTableParser, html_table, html_table_gen, html_table_gen_lxml
+)
+from .hyperloglog import HyperLogLog
 from .ipynb import in_ipynb
 from .join_if import (
     INNER_JOIN, LEFT_JOIN, RIGHT_JOIN, FULL_OUTER_JOIN, merge_dict,
     JoinIfConnector, inner_join_if, left_join_if, right_join_if, full_outer_join_if
 )
 from .json import JsonConnector, JsonFileConnector
-from .lambdas import LambdasConnector, lambdas
+from .lambdas import LambdasConnector, MemoizedLambda, lambdas, lambdas_gen, parallel_lambdas
 from .ldap import LdapConnector
 from .lexical_cast import cast_bool, cast_none, lexical_cast, lexical_casts
 from .limit import LimitConnector, limit
@@ -61,28 +73,36 @@ from .log import (
 )
 from .mongo import MongoConnector
 from .natural_join import NaturalJoinConnector, are_naturally_joined, natural_join
+from .page_store import DEFAULT_PAGE_STORE_DIR, PageStore, callable_name
+from .pipeline import PipelineConnector
 from .proxy import Proxy, proxy_enable, proxy_disable, make_session, proxy_enable_localhost
 from .query import (
     ACTION_CREATE, ACTION_READ, ACTION_UPDATE, ACTION_DELETE,
     SORT_ASC, SORT_DESC, Query
 )
-from .rename import RenameConnector, rename, rename_query
+from .rename import RenameConnector, rename, rename_query, renamed, renamed_query
 from .request_cache import install_cache
 from .search import (
     SearchFilter, search,
     equals, contains, lower_case_contains, lower_case_equals, contains_words
 )
 from .select import SelectConnector, select
+from .session import SessionManager, get_session
 from .singleton import Singleton
-from .sort_by import SortByConnector, sort_by
+from .snapshot import (
+    Snapshot, SnapshotConnector, load_snapshot, save_snapshot,
+    json_to_snapshot, pickle_to_snapshot, snapshot_to_json, snapshot_to_pickle
+)
+from .sort_by import SortByConnector, external_sort, sort_by
+from .sqlite import SqliteConnector
 from .strings import (
     to_international_string, remove_punctuation,
     remove_html_tags, remove_html_escape_sequences,
     remove_latex_escape_sequence,
     to_canonic_string, to_canonic_fullname, unicode_to_utf8
 )
-from .twitter import TwitterConnector, tweet_to_dict
+from .twitter import DEFAULT_TWITTER_STORE_DIR, TwitterConnector, tweet_to_dict
 from .union import UnionConnector, union
-from .unique import UniqueConnector, unique
+from .unique import CountDistinctConnector, UniqueConnector, count_distinct, unique
 from .unnest import UnnestConnector, unnest
 from .where import WhereConnector, where
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+"""
+Aggregate functions, used to summarize each group of entries
+formed by a :py:class:`GroupByConnector` (see also :py:func:`group_by`).
+
+An aggregate folds the entries of a group into an accumulator:
+
+- :py:meth:`Aggregate.init` creates the accumulator;
+- :py:meth:`Aggregate.update` folds an entry into the accumulator;
+- :py:meth:`Aggregate.result` converts the accumulator to the output value.
+
+Except :py:class:`Collect`, the accumulators have a constant size.
+Like in SQL, the aggregates applying to an attribute ignore
+the entries where this attribute is missing or ``None``.
+"""
+
+
+class Aggregate:
+    """
+    :py:class:`Aggregate` is the base class of the aggregate functions.
+    """
+    def __init__(self, attribute: str = None):
+        """
+        Constructor.
+
+        Args:
+            attribute (str): The aggregated attribute, or ``None``
+                if the aggregate applies to the whole entries.
+        """
+        self.m_attribute = attribute
+
+    @property
+    def attribute(self) -> str:
+        """
+        Retrieves the aggregated attribute.
+
+        Returns:
+            The aggregated attribute, or ``None`` if the aggregate
+            applies to the whole entries.
+        """
+        return self.m_attribute
+
+    def init(self) -> object:
+        """
+        Creates an accumulator.
+
+        Returns:
+            The initial accumulator.
+        """
+        raise NotImplementedError
+
+    def update(self, acc: object, entry: dict) -> object:
+        """
+        Folds an entry into an accumulator.
+
+        Args:
+            acc (object): The accumulator.
+            entry (dict): The folded entry.
+
+        Returns:
+            The updated accumulator.
+        """
+        if self.m_attribute is None:
+            return self.fold(acc, entry)
+        value = entry.get(self.m_attribute)
+        return acc if value is None else self.fold(acc, value)
+
+    def fold(self, acc: object, value: object) -> object:
+        """
+        Folds a value into an accumulator.
+
+        Args:
+            acc (object): The accumulator.
+            value (object): The folded value (an entry if :py:attr:`self.attribute`
+                is ``None``, a value of this attribute otherwise).
+
+        Returns:
+            The updated accumulator.
+        """
+        raise NotImplementedError
+
+    def result(self, acc: object) -> object:
+        """
+        Converts an accumulator to the output value.
+
+        Args:
+            acc (object): The accumulator.
+
+        Returns:
+            The output value.
+        """
+        return acc
+
+    def __str__(self) -> str:
+        return "%s(%s)" % (
+            type(self).__name__.upper(),
+            self.m_attribute if self.m_attribute is not None else "*"
+        )
+
+
+class Count(Aggregate):
+    """
+    Counts the entries (resp. the values of an attribute) of a group.
+
+    Example:
+        >>> from minifold import group_by
+        >>> group_by("a", [{"a": 1, "b": 2}, {"a": 1}, {"a": 2}], {"n": Count(), "nb": Count("b")})
+        [{'a': 1, 'n': 2, 'nb': 1}, {'a': 2, 'n': 1, 'nb': 0}]
+    """
+    def init(self) -> int:
+        return 0
+
+    def fold(self, acc: int, value: object) -> int:
+        return acc + 1
+
+
+class Sum(Aggregate):
+    """
+    Sums the values of an attribute in a group.
+    """
+    def __init__(self, attribute: str):
+        super().__init__(attribute)
+
+    def init(self):
+        return 0
+
+    def fold(self, acc, value):
+        return acc + value
+
+
+class Min(Aggregate):
+    """
+    Computes the minimal value of an attribute in a group
+    (``None`` if there is no such value).
+    """
+    def __init__(self, attribute: str):
+        super().__init__(attribute)
+
+    def init(self):
+        return None
+
+    def fold(self, acc, value):
+        return value if acc is None or value < acc else acc
+
+
+class Max(Aggregate):
+    """
+    Computes the maximal value of an attribute in a group
+    (``None`` if there is no such value).
+    """
+    def __init__(self, attribute: str):
+        super().__init__(attribute)
+
+    def init(self):
+        return None
+
+    def fold(self, acc, value):
+        return value if acc is None or value > acc else acc
+
+
+class Avg(Aggregate):
+    """
+    Computes the average value of an attribute in a group
+    (``None`` if there is no such value).
+    """
+    def __init__(self, attribute: str):
+        super().__init__(attribute)
+
+    def init(self) -> list:
+        return [0, 0]  # Sum, count
+
+    def fold(self, acc: list, value) -> list:
+        acc[0] += value
+        acc[1] += 1
+        return acc
+
+    def result(self, acc: list):
+        (total, n) = acc
+        return total / n if n else None
+
+
+class Collect(Aggregate):
+    """
+    Collects the entries (resp. the values of an attribute) of a group.
+    This is the aggregate corresponding to the default behavior of
+    :py:func:`group_by`.
+    """
+    def init(self) -> list:
+        return list()
+
+    def fold(self, acc: list, value: object) -> list:
+        acc.append(value)
+        return acc
@@ -151,3 +151,47 @@ class BinaryPredicate:
             ``False`` otherwise.
         """
         return self.match(entry)
+
+
+def to_conjuncts(filters: object) -> list:
+    """
+    Splits a minifold filter into the list of filters that must
+    all be satisfied (i.e., the operands of the ``&&`` clauses).
+
+    Example:
+        >>> p = BinaryPredicate(
+        ...     BinaryPredicate("a", "==", 1), "&&",
+        ...     BinaryPredicate(BinaryPredicate("b", "<", 2), "&&", BinaryPredicate("c", ">", 3))
+        ... )
+        >>> [str(conjunct) for conjunct in to_conjuncts(p)]
+        ['a == 1', 'b < 2', 'c > 3']
+
+    Args:
+        filters (object): A minifold filter (e.g., a :py:class:`BinaryPredicate`
+            instance, a lambda) or ``None``.
+
+    Returns:
+        The list of conjuncts (empty if ``filters`` is ``None``).
+    """
+    if filters is None:
+        return list()
+    if isinstance(filters, BinaryPredicate) and filters.operator == operator.__and__:
+        return to_conjuncts(filters.left) + to_conjuncts(filters.right)
+    return [filters]
+
+
+def from_conjuncts(conjuncts: list) -> object:
+    """
+    Builds the minifold filter satisfied iff all the input filters are satisfied.
+    This is the reverse operation of :py:func:`to_conjuncts`.
+
+    Args:
+        conjuncts (list): A list of minifold filters.
+
+    Returns:
+        The corresponding filter, or ``None`` if ``conjuncts`` is empty.
+    """
+    ret = None
+    for conjunct in conjuncts:
+        ret = conjunct if ret is None else BinaryPredicate(ret, "&&", conjunct)
+    return ret
@@ -213,6 +213,24 @@ class CacheConnector(Connector):
             self.write(query, data)
         return self.answer(query, data)
 
+    def count(self, query: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+        If ``query`` is cached, the count is computed from the cached entries.
+        Otherwise, it is delegated to :py:attr:`self.child` (and not cached).
+
+        Args:
+            query (Query): The handled :py:class:`Query` instance.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        if self.is_cached(query):
+            (data, success) = self.read(query)
+            if success and isinstance(data, list):
+                return len(data)
+        return self.child.count(query)
+
 
 # Default parameters, used to initialize StorageCacheConnector class members.
 DEFAULT_CACHE_STORAGE_BASE_DIR = os.path.join(
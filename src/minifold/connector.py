@@ -81,6 +81,45 @@ class Connector:
         # return self.answer(query, entries)
         return list()
 
+    def query_gen(self, query: Query) -> iter:
+        """
+        Handles an input :py:class:`Query` instance and iterates over
+        the matching entries.
+
+        By default, this method iterates over the list returned by
+        :py:meth:`self.query`. It should be overloaded by the child classes
+        able to stream their results (e.g., from a database cursor).
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        return iter(self.query(query))
+
+    def count(self, query: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance,
+        i.e., ``len(self.query(query))``.
+
+        By default, this method counts the entries iterated by
+        :py:meth:`self.query_gen`. It should be overloaded by the child
+        classes able to count the entries without fetching them (e.g.,
+        a database supporting ``COUNT(*)``), and by the operators able
+        to derive the count from the count of their children.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        n = 0
+        for _ in self.query_gen(query):
+            n += 1
+        return n
+
     def attributes(self, object: str) -> set:
         """
         Lists the available attributes related to a given collection of
@@ -111,20 +150,40 @@ class Connector:
         Returns:
             The reshaped entries.
         """
+        return list(self.reshape_entries_gen(query, entries))
+
+    def reshape_entries_gen(self, query: Query, entries: iter) -> iter:
+        """
+        Iterates over the reshaped entries (see :py:meth:`self.reshape_entries`).
+        The input entries are consumed lazily, and not beyond the LIMIT.
+
+        Args:
+            query (Query): The handled :py:class:`Query` instance.
+            entries (iter): The raw entries.
+
+        Returns:
+            An iterator over the reshaped entries.
+        """
         max_attributes = self.attributes(query.object)
         attributes = (
             set(query.attributes) & max_attributes if query.attributes
             else max_attributes
         )
 
-        ret = list()
-        for entry in entries[query.offset:]:
+        num_returned = 0
+        num_skipped = 0
+        for entry in entries:
             # LIMIT
-            if len(ret) == query.limit:
+            if num_returned == query.limit:
                 break
 
             # WHERE
             if query.filters is None or query.filters(entry):
+                # OFFSET
+                if query.offset and num_skipped < query.offset:
+                    num_skipped += 1
+                    continue
+
                 # SELECT
                 entry = {
                     k: v
@@ -135,8 +194,10 @@ class Connector:
                 for k in missing_attributes:
                     entry[k] = None
 
-                ret.append(entry)
-        return ret
+                num_returned += 1
+                yield entry
+                if num_returned == query.limit:
+                    break
 
     def answer(self, query: Query, ret: list):
         """
@@ -24,6 +24,31 @@ def count_gen(gen: iter) -> int:
     return n
 
 
+def clip_count(n: int, offset: int = None, limit: int = None) -> int:
+    """
+    Applies the OFFSET and LIMIT statements to a number of entries.
+
+    Example:
+        >>> clip_count(10, offset=3, limit=5)
+        5
+        >>> clip_count(10, offset=8, limit=5)
+        2
+
+    Args:
+        n (int): The number of entries.
+        offset (int): A positive integer or ``None`` if not needed.
+        limit (int): A positive integer or ``None`` if not needed.
+
+    Returns:
+        The number of entries remaining once OFFSET and LIMIT are applied.
+    """
+    if offset:
+        n = max(n - offset, 0)
+    if limit is not None:
+        n = min(n, limit)
+    return n
+
+
 def count(entries: list) -> int:
     """
     Count the number of entries.
@@ -47,6 +72,9 @@ class CountConnector(Connector):
     statement in a minifold query plan. As it is one of the rare
     connector returning an integer (instead of a list of entries) this
     is often the root connector in the tree modeling the minifold query plan.
+
+    The count is delegated to :py:meth:`Connector.count`, so that the
+    child connector may answer it without fetching the entries.
     """
     def __init__(self, child: Connector):
         """
@@ -74,4 +102,4 @@ class CountConnector(Connector):
         super().query(query)
         if query.action != ACTION_READ:
             raise ValueError("Invalid action in query %s" % query)
-        return count(self.m_child.query(query))
+        return self.m_child.count(query)
@@ -19,7 +19,8 @@ Some query examples:
 By default DBLP only returns up to 30 records (see
 `this link <https://dblp.org/faq/How+to+use+the+dblp+search+API.html>`__).
 
-The default limit in :py:class:`DblpConnector` is set to ``9999``.
+The default limit in :py:class:`DblpConnector` is set to ``9999``. The results
+are fetched by pages of at most ``1000`` results (``h`` and ``f`` parameters).
 
 It is possible to query a specific researcher using its DBLP-ID.
 The ID can be found by browsing the page related to a researcher.
@@ -47,19 +48,6 @@ except ImportError as e:
     )
     raise e
 
-try:
-    import requests
-except ImportError as e:
-    from .log import Log
-    Log.warning(
-        "\n".join([
-            "Please install requests",
-            "  APT: sudo apt install python3-requests",
-            "  PIP: sudo pip3 install --upgrade requests",
-        ])
-    )
-    raise e
-
 try:
     import xmltodict
 except ImportError as e:
@@ -76,13 +64,16 @@ except ImportError as e:
 import datetime
 import json
 import operator
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pformat
 
 from .binary_predicate import BinaryPredicate
 from .connector import Connector
 from .doc_type import DocType
 from .log import Log
+from .session import get_session
 from .strings import to_international_string, to_canonic_fullname as _to_canonic_fullname
 from .query import Query, ACTION_READ
 
@@ -90,6 +81,12 @@ from .query import Query, ACTION_READ
 # Default queried DBLP API.
 DBLP_API_URL = "https://dblp.dagstuhl.de"
 
+# Maximal number of results per DBLP page (see the "h" parameter).
+DBLP_PAGE_SIZE = 1000
+
+# Maximal number of results fetched by default for a DBLP search.
+DBLP_MAX_RESULTS = 9999
+
 # Maps DBLP ontology to our ontology.
 DBLP_ALIASES = {
     "type": "dblp_doc_type",
@@ -129,7 +126,9 @@ class DblpConnector(Connector):
         map_dblp_id: dict = None,
         map_dblp_name: dict = None,
         dblp_api_url: str = DBLP_API_URL,
-        wait_time: datetime.timedelta = datetime.timedelta(seconds=10)
+        wait_time: datetime.timedelta = datetime.timedelta(seconds=10),
+        page_size: int = DBLP_PAGE_SIZE,
+        max_workers: int = 4
     ):
         """
         Constructor.
@@ -144,6 +143,9 @@ class DblpConnector(Connector):
                 DBLP query. This is to address `rate limitations
                 <https://dblp.org/faq/Am+I+allowed+to+crawl+the+dblp+website.html>`__
                 imposed by DBLP.
+            page_size (int): The number of results per DBLP page.
+                Defaults to :py:data:`DBLP_PAGE_SIZE`, the maximum allowed by DBLP.
+            max_workers (int): The maximal number of pages fetched concurrently.
         """
         super().__init__()
         self.m_api_url = dblp_api_url
@@ -160,6 +162,9 @@ class DblpConnector(Connector):
         }
         self.last_query_time = datetime.datetime.now() - wait_time
         self.wait_time = wait_time
+        self.page_size = min(page_size, DBLP_PAGE_SIZE)
+        self.max_workers = max_workers
+        self.m_lock = threading.Lock()
 
     def attributes(self, object: str) -> set:
         """
@@ -454,141 +459,248 @@ class DblpConnector(Connector):
         """
         return [self.reshape_entry(query, entry) for entry in entries]
 
-    def query(self, query: Query) -> list:
+    def wait(self):
         """
-        Handles an input :py:class:`Query` instance.
+        Waits until the next DBLP query is allowed by the rate limitation.
+        This method is thread-safe: concurrent callers are spaced by
+        at least ``self.wait_time``.
+        """
+        with self.m_lock:
+            now = datetime.datetime.now()
+            query_time = max(now, self.last_query_time + self.wait_time)
+            self.last_query_time = query_time
+        wait_time = (query_time - now).total_seconds()
+        if wait_time > 0:
+            Log.info(f"Waiting {wait_time} seconds due to DBLP rate limiting")
+            time.sleep(wait_time)
+
+    def fetch(self, q_dblp: str) -> str:
+        """
+        Sends a DBLP query (according to the rate limitation) through
+        the process-wide keep-alive session (see :py:class:`SessionManager`).
 
         Args:
-            query (Query): The handled query.
+            q_dblp (str): The DBLP query URL.
+
+        Raises:
+            RuntimeError: if the DBLP server does not reply.
 
         Returns:
-            The list of entries matching ``query``.
+            The (decoded) content of the DBLP reply.
         """
-        super().query(query)
-        entries = list()
-        if query.action == ACTION_READ:
-
-            pid = None
-            format = self.format
-            object = ""
-            url_options = list()
-            if query.object == "publication":
-                object = "search/publ"
-            elif query.object == "researcher":
-                object = "search/author"
-            elif query.object == "conference":
-                object = "search/venue"
+        self.wait()
+        Log.info("--> DBLP: %s" % q_dblp)
+        reply = get_session().get(q_dblp, timeout=(10, 10))
+        if reply.status_code != 200:
+            raise RuntimeError("Cannot get reply from %s" % self.api_url)
+        return reply.content.decode("utf-8")
+
+    @staticmethod
+    def xml_to_entries(data: str) -> list:
+        """
+        Converts the XML bibliography returned by DBLP for a given PID
+        to the corresponding list of (flat) entries.
+
+        Args:
+            data (str): The XML DBLP reply.
+
+        Returns:
+            The corresponding list of entries.
+        """
+        data = data.replace("<i>", "")
+        data = data.replace("</i>", "")
+        result = xmltodict.parse(data, dict_constructor=dict)
+        # N.B. There are two other keys of interests
+        # - "co" : coauthors
+        # - "person" : information about the researcher
+
+        def xml_to_entry(d: dict) -> dict:
+            """
+            Converts a dictionary obtained from XML result returned
+            by DBLP to a flat dictionary.
+
+            Args:
+                d: The DBLP dictionary.
+
+            Returns:
+                The corresponding flat dictionary.
+            """
+            publication_type = next(iter(d.keys()))
+            entry = d[publication_type]
+            entry["type"] = publication_type
+            key = (
+                "author" if "author" in entry.keys() else
+                "editor" if "editor" in entry.keys() else
+                None
+            )
+            if key:
+                # Sometimes, author is represented by a dict with key
+                # '@orcid' and '#text'
+                if isinstance(entry[key], str):
+                    entry[key] = [entry[key]]
+
+                entry["authors"] = [
+                    author["#text"] if isinstance(author, dict) else author
+                    for author in entry[key]
+                ]
             else:
-                fullname = query.object
-                pid = self.map_dblp_id.get(fullname)
-                dblp_name = self.get_dblp_name(fullname)
-                object = "pid" if pid else "search/publ"
-                # For the moment, DBLP only supports XML for pid-based queries.
-                # https://dblp.org/pid/30/1446.xml
-                if pid:
-                    format = "xml"
-                else:
-                    url_options.append(dblp_name)
-
-            if object == "pid":
-                q_dblp = "%(server)s/%(object)s/%(pid)s.%(format)s" % {
-                    "server": self.api_url,
-                    "object": object,
-                    "pid": pid,
-                    "format": format,
-                }
+                Log.warning(f"No author found for this DBLP publication:\n{pformat(entry)}")
+
+            # In XML data, the DBLP base URL is missing
+            url = entry.get("url")
+            if url and not url.startswith("http"):
+                entry["url"] = f"https://dblp.org/{url}"
+            return entry
+
+        return [xml_to_entry(d) for d in result["dblpperson"]["r"]]
+
+    def query_to_dblp(self, query: Query) -> tuple:
+        """
+        Converts a minifold query to the corresponding DBLP query.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            A ``(q_dblp, format)`` tuple where ``q_dblp`` is the DBLP URL,
+            without the paging options (``h``, ``f``) if ``format`` is ``"json"``.
+        """
+        pid = None
+        format = self.format
+        object = ""
+        url_options = list()
+        if query.object == "publication":
+            object = "search/publ"
+        elif query.object == "researcher":
+            object = "search/author"
+        elif query.object == "conference":
+            object = "search/venue"
+        else:
+            fullname = query.object
+            pid = self.map_dblp_id.get(fullname)
+            dblp_name = self.get_dblp_name(fullname)
+            object = "pid" if pid else "search/publ"
+            # For the moment, DBLP only supports XML for pid-based queries.
+            # https://dblp.org/pid/30/1446.xml
+            if pid:
+                format = "xml"
             else:
-                # WHERE
-                if query.filters:
-                    search = {
-                        "prefix": self.get_dblp_name(query.object),
-                        "suffix": ""
-                    }
-                    self.binary_predicate_to_dblp(query.filters, search)
-                    url_options.append("%s%s" % (search["prefix"], search["suffix"]))
-
-                # OFFSET and LIMIT
-                url_options.append("h=%s" % query.limit if query.limit is not None else "h=9999")
-                if query.offset:
-                    url_options.append("f=%s" % query.offset)
-
-                # Format of the result.
-                url_options.append("format=%s" % format)
-                q_dblp = "%(server)s/%(object)s/api?q=%(query)s" % {
-                    "server": self.api_url,
-                    "object": object,
-                    "query": "&".join(url_options)
+                url_options.append(dblp_name)
+
+        if object == "pid":
+            q_dblp = "%(server)s/%(object)s/%(pid)s.%(format)s" % {
+                "server": self.api_url,
+                "object": object,
+                "pid": pid,
+                "format": format,
+            }
+        else:
+            # WHERE
+            if query.filters:
+                search = {
+                    "prefix": self.get_dblp_name(query.object),
+                    "suffix": ""
                 }
+                self.binary_predicate_to_dblp(query.filters, search)
+                url_options.append("%s%s" % (search["prefix"], search["suffix"]))
+
+            # Format of the result.
+            url_options.append("format=%s" % format)
+            q_dblp = "%(server)s/%(object)s/api?q=%(query)s" % {
+                "server": self.api_url,
+                "object": object,
+                "query": "&".join(url_options)
+            }
+        return (q_dblp, format)
+
+    def fetch_page(self, query: Query, q_dblp: str, offset: int, limit: int) -> tuple:
+        """
+        Fetches a page of DBLP search results.
 
-            Log.info("--> DBLP: %s" % q_dblp)
-            wait_time = max(
-                0,
-                (
-                    self.wait_time - (datetime.datetime.now() - self.last_query_time)
-                ).total_seconds()
-            )
-            Log.info(f"Waiting {wait_time} seconds due to DBLP rate limiting")
-            time.sleep(wait_time)
-            # http = urllib3.PoolManager(timeout=urllib3.Timeout(connect=1.0, read=2.0))
-            # reply = http.request("GET", q_dblp, retries = 5)
-            reply = requests.get(q_dblp, timeout=(10, 10))
-
-            if reply.status_code == 200:
-                data = reply.content.decode("utf-8")
-                if format == "json":
-                    result = json.loads(data)
-                    entries = self.extract_entries(query, result)
-                elif format == "xml":
-                    data = data.replace("<i>", "")
-                    data = data.replace("</i>", "")
-                    result = xmltodict.parse(data, dict_constructor=dict)
-                    # N.B. There are two other keys of interests
-                    # - "co" : coauthors
-                    # - "person" : information about the researcher
-
-                    def xml_to_entry(d: dict) -> dict:
-                        """
-                        Converts a dictionary obtained from XML result returned
-                        by DBLP to a flat dictionary.
-
-                        Args:
-                            d: The DBLP dictionary.
-
-                        Returns:
-                            The corresponding flat dictionary.
-                        """
-                        publication_type = next(iter(d.keys()))
-                        entry = d[publication_type]
-                        entry["type"] = publication_type
-                        key = (
-                            "author" if "author" in entry.keys() else
-                            "editor" if "editor" in entry.keys() else
-                            None
-                        )
-                        if key:
-                            # Sometimes, author is represented by a dict with key
-                            # '@orcid' and '#text'
-                            if isinstance(entry[key], str):
-                                entry[key] = [entry[key]]
-
-                            entry["authors"] = [
-                                author["#text"] if isinstance(author, dict) else author
-                                for author in entry[key]
-                            ]
-                        else:
-                            Log.warning(f"No author found for this DBLP publication:\n{pformat(entry)}")
-
-                        # In XML data, the DBLP base URL is missing
-                        url = entry.get("url")
-                        if url and not url.startswith("http"):
-                            entry["url"] = f"https://dblp.org/{url}"
-                        return entry
-
-                    entries = [xml_to_entry(d) for d in result["dblpperson"]["r"]]
-                else:
-                    raise RuntimeError("Format not implemented: %s" % self.format)
-            else:
-                raise RuntimeError("Cannot get reply from %s" % self.api_url)
+        Args:
+            query (Query): The handled query.
+            q_dblp (str): The DBLP query URL, without paging options.
+            offset (int): The index of the first fetched DBLP result.
+            limit (int): The maximal number of fetched DBLP results.
+
+        Returns:
+            A ``(entries, total)`` tuple where ``entries`` are the
+            (reshaped) entries of the page and ``total`` is the number
+            of DBLP results matching the query.
+        """
+        url = "%s&h=%d" % (q_dblp, limit)
+        if offset:
+            url += "&f=%d" % offset
+        result = json.loads(self.fetch(url))
+        try:
+            total = int(result["result"]["hits"]["@total"])
+        except KeyError:
+            total = 0
+        entries = self.extract_entries(query, result)
+        return (self.reshape_entries(query, entries), total)
+
+    def query_gen(self, query: Query) -> iter:
+        """
+        Handles an input :py:class:`Query` instance and iterates over
+        the matching entries.
+
+        The DBLP search is split into pages of ``self.page_size`` results.
+        Once the first page is fetched, the remaining pages are fetched
+        concurrently (as fast as allowed by ``self.wait_time``) and the
+        entries are yielded page by page, in order.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching ``query``.
+        """
+        if query.action != ACTION_READ:
+            return
+        (q_dblp, format) = self.query_to_dblp(query)
+
+        if format == "xml":
+            entries = DblpConnector.xml_to_entries(self.fetch(q_dblp))
+            yield from self.reshape_entries(query, entries)
+            return
+        elif format != "json":
+            raise RuntimeError("Format not implemented: %s" % self.format)
+
+        # OFFSET and LIMIT
+        offset = query.offset if query.offset else 0
+        limit = query.limit if query.limit is not None else DBLP_MAX_RESULTS
+        page_size = min(self.page_size, limit)
+        if page_size <= 0:
+            return
+        (entries, total) = self.fetch_page(query, q_dblp, offset, page_size)
+        yield from entries
 
-        self.last_query_time = datetime.datetime.now()
-        return self.answer(query, self.reshape_entries(query, entries))
+        stop = min(offset + limit, total)
+        offsets = range(offset + page_size, stop, page_size)
+        if not offsets:
+            return
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [
+                executor.submit(
+                    self.fetch_page, query, q_dblp, f, min(page_size, stop - f)
+                ) for f in offsets
+            ]
+            for future in futures:
+                (entries, _) = future.result()
+                yield from entries
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def query(self, query: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching ``query``.
+        """
+        super().query(query)
+        return self.answer(query, list(self.query_gen(query)))
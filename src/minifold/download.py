@@ -14,22 +14,36 @@ if sys.version_info < (3, 5):  # async, await
     raise RuntimeError("asyncio requires python>=3.5")
 
 import asyncio
+import atexit
 import datetime
 import concurrent.futures
+import multiprocessing
+import pickle
+import queue
 import re
+import threading
 
-from copy import deepcopy
 from functools import partial
+from urllib.parse import urlparse
 from .connector import Connector
 from .query import ACTION_READ, Query
-from .html import html_to_text
+from .binary_predicate import from_conjuncts, to_conjuncts
+from .html import html_to_text, html_to_text_lxml
+from .lambdas import find_filters_dependencies
 from .log import Log
-from .proxy import make_session
-from .request_cache import install_cache
+from .session import get_session
+from .singleton import Singleton
+from .sort_by import sort_by
 
 DEFAULT_TIMEOUT = (1.0, 2.0)    # (connect timeout, read timeout)
 # DEFAULT_TIMEOUT = (0.5, 1.0)  # (connect timeout, read timeout)
 
+DEFAULT_MAX_CONCURRENCY = 64       # Maximal number of pending HTTP requests
+DEFAULT_MAX_PER_HOST = 8           # Maximal number of pending HTTP requests per host
+DEFAULT_MAX_BODY_SIZE = 16 << 20   # Maximal size of a downloaded body (in bytes)
+DEFAULT_CHUNK_SIZE = 1 << 16       # Size of the chunks read from a streamed body
+DEFAULT_EXTRACT_CHUNK_SIZE = 16    # Number of responses sent at once to an extraction process
+
 
 def now() -> str:
     """
@@ -41,10 +55,17 @@ def now() -> str:
     return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def download(url: str, timeout: tuple = DEFAULT_TIMEOUT, cache_filename: str = None):
+def download(
+    url: str,
+    timeout: tuple = DEFAULT_TIMEOUT,
+    cache_filename: str = None,
+    max_body_size: int = None,
+    headers: dict = None,
+    use_cache: bool = True
+):
     """
-    Downloads the content related to a given URL.
-    See also :py:func:`request_cache` to enable caching.
+    Downloads the content related to a given URL using the process-wide
+    keep-alive session (see :py:class:`SessionManager`).
 
     Args:
         url (str): A string containing the target URL.
@@ -52,6 +73,12 @@ def download(url: str, timeout: tuple = DEFAULT_TIMEOUT, cache_filename: str = N
             (connect timeout, read timeout).
         cache_filename (str): A string containing path to the cache to use.
             Pass ``None`` to use the default cache.
+        max_body_size (int): The maximal size (in bytes) of the body.
+            If set, the body is streamed and the download is aborted
+            as soon as this size is exceeded. Pass ``None`` to disable
+            this limit.
+        headers (dict): Additional HTTP headers, or ``None``.
+        use_cache (bool): Pass ``False`` to bypass the HTTP cache.
 
     Raises:
         requests.exceptions.ConnectionError
@@ -59,19 +86,40 @@ def download(url: str, timeout: tuple = DEFAULT_TIMEOUT, cache_filename: str = N
         requests.exceptions.ContentDecodingError
         requests.exceptions.ReadTimeout
         requests.exceptions.SSLError
+        ValueError: if the body exceeds ``max_body_size``.
 
     Returns:
         The corresponding response.
     """
-    install_cache(cache_filename)
     try:
         # Log.debug("download: GET %s (timeout = %s)" % (url, timeout))
-        # https://stackoverflow.com/questions/8287628/proxies-with-python-requests-module
-        session = make_session()
-        return session.get(
-            url,
-            timeout=timeout
-        )
+        # The session (and its keep-alive connections) is shared process-wide.
+        session = get_session(cache_filename, use_cache)
+        if max_body_size is None:
+            return session.get(
+                url,
+                headers=headers,
+                timeout=timeout
+            )
+        response = session.get(url, headers=headers, timeout=timeout, stream=True)
+        try:
+            content_length = response.headers.get("Content-Length")
+            if content_length and int(content_length) > max_body_size:
+                raise ValueError(
+                    "Body too large (%s > %s bytes)" % (content_length, max_body_size)
+                )
+            chunks = list()
+            size = 0
+            for chunk in response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_body_size:
+                    raise ValueError("Body too large (> %s bytes)" % max_body_size)
+                chunks.append(chunk)
+            response._content = b"".join(chunks)
+            response._content_consumed = True
+        finally:
+            response.close()
+        return response
     except Exception as exc:
         Log.warning("download: GET %s (timeout = %s): %s" % (url, timeout, exc))
         return exc
@@ -90,11 +138,128 @@ def trim_http(url: str) -> str:
     return re.sub("https?://", "", url, flags=re.IGNORECASE)
 
 
+class Downloader(metaclass=Singleton):
+    """
+    The :py:class:`Downloader` singleton owns the event loop (running in
+    a background thread) and the executor shared by every bulk download
+    of the process.
+    """
+    def __init__(self, max_workers: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Constructor.
+
+        Args:
+            max_workers (int): The number of threads of the executor, i.e.,
+                the maximal number of pending HTTP requests in the process.
+        """
+        self.m_loop = asyncio.new_event_loop()
+        self.m_thread = threading.Thread(
+            target=self.m_loop.run_forever,
+            name="minifold-downloader",
+            daemon=True
+        )
+        self.m_thread.start()
+        self.m_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="minifold-download"
+        )
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Retrieves the event loop of this :py:class:`Downloader` instance.
+
+        Returns:
+            The event loop.
+        """
+        return self.m_loop
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        """
+        Retrieves the executor of this :py:class:`Downloader` instance.
+
+        Returns:
+            The executor.
+        """
+        return self.m_executor
+
+    def submit(self, coroutine) -> concurrent.futures.Future:
+        """
+        Schedules a coroutine in the event loop of this :py:class:`Downloader`.
+
+        Args:
+            coroutine: The coroutine.
+
+        Returns:
+            The corresponding :py:class:`concurrent.futures.Future` instance.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.m_loop)
+
+
+async def downloads_as_completed(
+    urls: list,
+    timeout: tuple = DEFAULT_TIMEOUT,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_per_host: int = DEFAULT_MAX_PER_HOST,
+    max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+    download: callable = download
+):
+    """
+    Asynchronous generator downloading several URLs concurrently.
+
+    Args:
+        urls (list): An iterable over strings, each of them corresponding to an URL.
+        timeout (tuple): A tuple ``(float, float)`` corresponding to the
+            (connect timeout, read timeout).
+        max_concurrency (int): The maximal number of pending HTTP requests.
+        max_per_host (int): The maximal number of pending HTTP requests per host.
+        max_body_size (int): The maximal size (in bytes) of each body.
+            Pass ``None`` to disable this limit.
+        download (callable): The function downloading a single URL,
+            see :py:func:`download` (or :py:meth:`PageStore.download`).
+
+    Returns:
+        An asynchronous iterator over the ``(url, response)`` pairs, in
+        the order the downloads complete. ``response`` is an
+        :py:class:`Exception` if the download failed.
+    """
+    loop = asyncio.get_running_loop()
+    executor = Downloader().executor
+    semaphore = asyncio.Semaphore(max_concurrency)
+    host_semaphores = dict()
+
+    async def fetch(url: str) -> tuple:
+        host = urlparse(url).netloc
+        host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(max_per_host))
+        async with host_semaphore:
+            async with semaphore:
+                response = await loop.run_in_executor(
+                    executor,
+                    partial(
+                        download,
+                        url,
+                        timeout=timeout,
+                        max_body_size=max_body_size
+                    )
+                )
+        return (url, response)
+
+    tasks = [asyncio.ensure_future(fetch(url)) for url in dict.fromkeys(urls)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 # https://skipperkongen.dk/2016/09/09/easy-parallel-http-requests-with-python-and-asyncio/
 async def downloads_async(
     urls: list,
     timeout: tuple = DEFAULT_TIMEOUT,
-    return_exceptions: bool = True
+    return_exceptions: bool = True,
+    **kwargs
 ):
     """
     Asynchronous download procedure.
@@ -105,6 +270,7 @@ async def downloads_async(
             (connect timeout, read timeout).
         return_exceptions (bool): Pass ``True`` if this function is allowed to raise
             exceptions or must be quiet, ``False`` otherwise. Defaults to ``True``.
+        kwargs: See :py:func:`downloads_as_completed`.
 
     Raises:
         See the :py:func:`download` function for the list of possible exceptions.
@@ -113,28 +279,24 @@ async def downloads_async(
         A ``dict({str : ?}}`` mapping for each queried URL the corresponding
         contents (if successful), the corresponding :py:class:`Exception` otherwise.
     """
-    with concurrent.futures.ThreadPoolExecutor(max_workers=500) as executor:
-        loop = asyncio.get_event_loop()
-        futures = [
-            loop.run_in_executor(
-                executor,
-                partial(download, timeout=timeout, cache_filename=None),
-                url
-            ) for url in urls
-        ]
-        return {
-            url: response
-            for (url, response) in zip(
-                urls,
-                await asyncio.gather(*futures, return_exceptions=return_exceptions)
-            )
-        }
+    ret = dict()
+    async for (url, response) in downloads_as_completed(urls, timeout, **kwargs):
+        if not return_exceptions and isinstance(response, Exception):
+            raise response
+        ret[url] = response
+    return ret
 
 
-def downloads(*args) -> dict:
+def downloads_gen(
+    urls: list,
+    timeout: tuple = DEFAULT_TIMEOUT,
+    return_exceptions: bool = True,
+    **kwargs
+) -> iter:
     """
-    Performs multiple downloads in parallel. See downloads_async for further details.
-    See also :py:func:`request_cache` to enable caching.
+    Performs multiple downloads in parallel and yields the responses as
+    they complete. The downloads are scheduled in the event loop of the
+    :py:class:`Downloader` singleton.
 
     Args:
         urls (list): An iterable over strings, each of them corresponding to an URL.
@@ -142,17 +304,57 @@ def downloads(*args) -> dict:
             (connect timeout, read timeout).
         return_exceptions (bool): Pass ``True`` if this function is allowed to raise
             exceptions or must be quiet, ``False`` otherwise. Defaults to ``True``.
+        kwargs: See :py:func:`downloads_as_completed`.
+
+    Returns:
+        An iterator over the ``(url, response)`` pairs, in the order
+        the downloads complete. ``response`` is an :py:class:`Exception`
+        if the download failed.
+    """
+    responses = queue.Queue()
+    done = object()
+
+    async def produce():
+        try:
+            async for item in downloads_as_completed(urls, timeout, **kwargs):
+                responses.put(item)
+        finally:
+            responses.put(done)
+
+    future = Downloader().submit(produce())
+    try:
+        while True:
+            item = responses.get()
+            if item is done:
+                break
+            (url, response) = item
+            if not return_exceptions and isinstance(response, Exception):
+                raise response
+            yield item
+        future.result()
+    finally:
+        future.cancel()
+
+
+def downloads(urls: list, *args, **kwargs) -> dict:
+    """
+    Performs multiple downloads in parallel. See :py:func:`downloads_gen`
+    for further details.
+
+    Args:
+        urls (list): An iterable over strings, each of them corresponding to an URL.
+        timeout (tuple): A tuple ``(float, float)`` corresponding to the
+            (connect timeout, read timeout).
+        return_exceptions (bool): Pass ``True`` if this function is allowed to raise
+            exceptions or must be quiet, ``False`` otherwise. Defaults to ``True``.
+        kwargs: See :py:func:`downloads_as_completed`.
 
     Returns:
         A ``dict({str : ?}}`` mapping for each queried URL the corresponding
         contents (if successful), the corresponding :py:class:`Exception` otherwise.
     """
     Log.debug("[%s] downloads: start" % now())
-    # https://stackoverflow.com/questions/46727787/runtimeerror-there-is-no-current-event-loop-in-thread-in-async-apscheduler
-    # loop = asyncio.get_event_loop()
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    ret = loop.run_until_complete(downloads_async(*args))
+    ret = dict(downloads_gen(urls, *args, **kwargs))
     Log.debug("[%s] downloads: %d URLs fetched" % (now(), len(ret)))
     return ret
 
@@ -161,7 +363,11 @@ def downloads(*args) -> dict:
 # Minifold
 # ---------------------------------------------------------------------------------
 
-def extract_response(response: object, extract_text: bool = True) -> object:
+def extract_response(
+    response: object,
+    extract_text: bool = True,
+    to_text: callable = None
+) -> object:
     """
     Extracts from a response the corresponding contents or Exception.
 
@@ -170,6 +376,9 @@ def extract_response(response: object, extract_text: bool = True) -> object:
             :py:class:`Exception` instance.
         extract_text (bool): A bool indicating if text must be extracted
             from HTML.
+        to_text (callable): The function converting HTML to text.
+            Pass ``None`` to use :py:func:`html_to_text`. You may pass
+            :py:func:`html_to_text_lxml`, which is faster.
 
     Returns:
         The corresponding Exception or str.
@@ -177,7 +386,76 @@ def extract_response(response: object, extract_text: bool = True) -> object:
     if isinstance(response, Exception):
         return response  # Forward exception
     text = response.text
-    return html_to_text(text) if extract_text else text
+    if not extract_text:
+        return text
+    return to_text(text) if to_text else html_to_text(text)
+
+
+# Faster alternative to extract_response, relying only on lxml.
+extract_response_lxml = partial(extract_response, to_text=html_to_text_lxml)
+
+
+# Process pools shared by the DownloadConnector instances, by number of workers.
+EXTRACT_EXECUTORS = dict()
+EXTRACT_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_extract_executor(num_workers: int) -> concurrent.futures.Executor:
+    """
+    Retrieves the process pool used to extract the HTTP responses.
+    The pools are shared by every :py:class:`DownloadConnector` instance
+    and shut down when the interpreter exits.
+
+    The workers are not forked from the current process, which may run
+    the threads of the :py:class:`Downloader`: they are started using the
+    ``forkserver`` method if available, ``spawn`` otherwise.
+
+    Args:
+        num_workers (int): The number of worker processes.
+
+    Returns:
+        The corresponding :py:class:`concurrent.futures.ProcessPoolExecutor` instance.
+    """
+    with EXTRACT_EXECUTORS_LOCK:
+        executor = EXTRACT_EXECUTORS.get(num_workers)
+        if executor is None:
+            method = (
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context(method)
+            )
+            EXTRACT_EXECUTORS[num_workers] = executor
+        return executor
+
+
+@atexit.register
+def shutdown_extract_executors():
+    """
+    Shuts down the process pools used to extract the HTTP responses.
+    """
+    with EXTRACT_EXECUTORS_LOCK:
+        for executor in EXTRACT_EXECUTORS.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        EXTRACT_EXECUTORS.clear()
+
+
+def extract_responses(extract_response: callable, responses: list) -> list:
+    """
+    Applies a callback to a chunk of responses. This function is
+    run by the worker processes of :py:class:`DownloadConnector`.
+
+    Args:
+        extract_response (callable): ``Callback(response) -> str``
+            callback used to extract data from an HTTP query.
+        responses (list): A list of responses.
+
+    Returns:
+        The list of extracted values.
+    """
+    return [extract_response(response) for response in responses]
 
 
 RE_VALID_URL = re.compile("https?://.*")
@@ -191,9 +469,11 @@ class DownloadConnector(Connector):
         self,
         map_url_out: dict,
         child: Connector,
-        downloads: callable = downloads,
-        extract_response: callable = extract_response
-        # TODO Pass downloads() parameters
+        downloads: callable = downloads_gen,
+        extract_response: callable = extract_response,
+        num_workers: int = None,
+        chunk_size: int = DEFAULT_EXTRACT_CHUNK_SIZE,
+        store: object = None
     ):
         """
         Constructor.
@@ -205,22 +485,182 @@ class DownloadConnector(Connector):
                 Example: ``{"url": "html_content"}``
             child (Connector): The child Connector.
             downloads (callable): ``Callback(urls) -> dict(url: content)`` where
-                urls is an iterable of URLs and where.
+                urls is an iterable of URLs and where
                 the returned dict maps each urls and the corresponding response.
-                Note: You could pass ``partial(download, ...)``
-                to customize the timeouts.
+                The callback may also return an iterable of ``(url, response)``
+                pairs (see :py:func:`downloads_gen`), consumed incrementally.
+                Note: You could pass ``partial(downloads_gen, ...)``
+                to customize the timeouts and the concurrency limits.
             extract_response (callable): ``Callback(response) -> str``
                 callback used to extract data from an HTTP query.
+                You may pass :py:data:`extract_response_lxml` to speed up
+                the HTML to text conversion.
+            num_workers (int): The number of processes used to run
+                ``extract_response``. Pass ``None`` or ``0`` to run it
+                in the calling thread. The callback must be picklable
+                to be run in other processes.
+            chunk_size (int): The number of responses sent at once
+                to a worker process.
+            store (PageStore): A :py:class:`PageStore` instance used to keep
+                (and revalidate) the downloaded pages and the extracted texts
+                across queries, or ``None``. The texts are identified by
+                the name of ``extract_response``.
         """
         super().__init__()
         self.map_url_out = map_url_out
         self.child = child
         self.downloads = downloads
         self.extract_response = extract_response
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.m_executor = None
+        self.m_store = store
+        if store is not None and downloads is downloads_gen:
+            self.downloads = partial(downloads_gen, download=store.download)
+
+    def executor(self) -> concurrent.futures.Executor:
+        """
+        Retrieves the process pool used to extract the responses,
+        if any (see :py:func:`get_extract_executor`).
+
+        Returns:
+            The :py:class:`concurrent.futures.ProcessPoolExecutor` instance
+            or ``None`` if the extraction must be done in the calling thread.
+        """
+        if not self.num_workers or not self.extract_response:
+            return None
+        if self.m_executor is None:
+            try:
+                pickle.dumps(self.extract_response)
+            except Exception as e:
+                Log.warning(
+                    "DownloadConnector: extract_response is not picklable (%s), "
+                    "the responses are extracted in the calling thread" % e
+                )
+                self.num_workers = None
+                return None
+            self.m_executor = get_extract_executor(self.num_workers)
+        return self.m_executor
+
+    def extract_responses(self, responses: iter) -> dict:
+        """
+        Extracts the data from the HTTP responses as they arrive.
+        If ``self.num_workers`` is set, the responses are sent by chunks
+        to a process pool, so that the extraction is pipelined with
+        the pending downloads. If a :py:class:`PageStore` is used, the
+        texts already extracted from the same pages are reused.
+
+        Args:
+            responses (iter): An iterable over the ``(url, response)`` pairs.
+
+        Returns:
+            A ``dict(url: value)`` mapping each URL to the extracted value
+            or to the corresponding :py:class:`Exception`.
+        """
+        if not self.extract_response:
+            return dict(responses)
+        executor = self.executor()
+        store = self.m_store
+        map_url_value = dict()
+
+        def pending_responses() -> iter:
+            for (url, response) in responses:
+                if executor is not None and isinstance(response, Exception):
+                    map_url_value[url] = response  # Forward exception
+                    continue
+                if store is not None and not isinstance(response, Exception):
+                    text = store.text(url, self.extract_response)
+                    if text is not None:
+                        map_url_value[url] = text
+                        continue
+                yield (url, response)
+
+        def set_value(url: str, value: object):
+            map_url_value[url] = value
+            if store is not None and isinstance(value, str):
+                store.put_text(url, self.extract_response, value)
+
+        if executor is None:
+            for (url, response) in pending_responses():
+                set_value(url, self.extract_response(response))
+            return map_url_value
+
+        futures = list()
+        chunk = list()
+
+        def submit():
+            futures.append((
+                [url for (url, _) in chunk],
+                executor.submit(
+                    extract_responses,
+                    self.extract_response,
+                    [response for (_, response) in chunk]
+                )
+            ))
+            chunk.clear()
+
+        for (url, response) in pending_responses():
+            chunk.append((url, response))
+            if len(chunk) == self.chunk_size:
+                submit()
+        if chunk:
+            submit()
+        for (urls, future) in futures:
+            for (url, value) in zip(urls, future.result()):
+                set_value(url, value)
+        return map_url_value
+
+    def download_entries(self, entries: list, attributes: set):
+        """
+        Downloads the URLs of some entries and stores the extracted
+        contents in these entries (in place).
+
+        Args:
+            entries (list): The entries to be completed.
+            attributes (set): The output attributes (see ``self.map_url_out``)
+                to be populated.
+        """
+        map_url_out = {
+            attr_url: attr_out
+            for (attr_url, attr_out) in self.map_url_out.items()
+            if attr_out in attributes
+        }
+        urls = {
+            entry.get(attr_url)
+            for attr_url in map_url_out.keys()
+            for entry in entries
+            if (
+                isinstance(entry.get(attr_url), str)
+                and RE_VALID_URL.match(entry.get(attr_url))
+            )
+        }
+        if not urls:
+            return
+
+        Log.debug("Starting fetching %d URLs" % len(urls))
+        responses = self.downloads(urls)
+        if isinstance(responses, dict):
+            responses = responses.items()
+        # The responses are processed as soon as they are available.
+        map_url_response = self.extract_responses(responses)
+
+        # Dispatch responses in appropriate entry attributes
+        for (attr_url, attr_out) in map_url_out.items():
+            for entry in entries:
+                url = entry.get(attr_url)
+                if url:
+                    entry[attr_out] = map_url_response.get(url)
 
     def query(self, query: Query) -> list:
         """
-        Handles an input :py:class:`Query` instance..
+        Handles an input :py:class:`Query` instance.
+
+        The downloads are delayed as much as possible: the filters that do not
+        depend on the downloaded attributes, as well as the OFFSET and the LIMIT
+        (if possible), are forwarded to the child connector, so that only the
+        URLs of the remaining entries are fetched.
+        The filters depending on the downloaded attributes are evaluated
+        progressively, by fetching batches of pages until the LIMIT is reached.
 
         Args:
             query: A :py:class:`Query` instance.
@@ -228,48 +668,96 @@ class DownloadConnector(Connector):
         Returns:
             The corresponding results.
         """
-        if query.action == ACTION_READ:
-            # Pull child records
-            q_child = deepcopy(query)  # TODO: rework q_child like in LambdasConnector
-            q_child.attributes = set(query.attributes) - set(self.map_url_out.values())
-            entries = self.child.query(q_child)
-
-            attributes = set(query.attributes) & set(self.map_url_out.values()) \
-                if query.attributes else set(self.map_url_out.values())
+        super().query(query)
+        if query.action != ACTION_READ:
+            raise RuntimeError("Action not implemented: %s" % query.action)
 
-            # If some URLs must be queried
+        # Split the filters depending on whether they involve downloaded attributes.
+        out_attributes = set(self.map_url_out.values())
+        early_filters = list()
+        late_filters = list()
+        late_attributes = set()
+        for conjunct in to_conjuncts(query.filters):
+            dependencies = find_filters_dependencies(conjunct)
+            if dependencies & out_attributes:
+                late_filters.append(conjunct)
+                late_attributes |= dependencies
+            else:
+                early_filters.append(conjunct)
+        late_filters = from_conjuncts(late_filters)
+        # If the entries are sorted by a downloaded attribute, they are sorted locally.
+        late_sort = bool(set(query.sort_by.keys()) & out_attributes)
+        if late_sort:
+            late_attributes |= set(query.sort_by.keys())
+        is_late = late_filters is not None or late_sort
+
+        # Attributes to download
+        attributes = (
+            set(query.attributes) & out_attributes if query.attributes
+            else set(out_attributes)
+        ) | (late_attributes & out_attributes)
+
+        # Pull child records
+        q_child = Query(
+            object=query.object,
+            filters=from_conjuncts(early_filters),
+            sort_by=dict() if late_sort else query.sort_by
+        )
+        if query.attributes:
+            q_child.attributes = list(
+                (set(query.attributes) | late_attributes) - out_attributes
+                | {
+                    attr_url
+                    for (attr_url, attr_out) in self.map_url_out.items()
+                    if attr_out in attributes
+                }
+            )
+        if not is_late:
+            q_child.offset = query.offset
+            q_child.limit = query.limit
+        entries = self.child.query(q_child)
+
+        offset = query.offset if query.offset else 0
+        if not is_late:
+            # OFFSET and LIMIT have been handled by the child.
+            if query.limit is not None:
+                entries = entries[:query.limit]
             if attributes:
-                # Fetch URLs
-                urls = set()
-                for attr_url in self.map_url_out.keys():
-                    urls |= {
-                        entry.get(attr_url)
-                        for entry in entries
-                        if (
-                            isinstance(entry.get(attr_url), str)
-                            and RE_VALID_URL.match(entry.get(attr_url))
-                        )
-                    }
-                Log.debug("Starting fetching %d URLs" % len(urls))
-                map_url_response = self.downloads(urls)
-                if self.extract_response:
-                    map_url_response = {
-                        url: self.extract_response(response)
-                        for (url, response) in map_url_response.items()
-                    }
-
-                # Dispatch responses in appropriate entry attributes
-                for (attr_url, attr_out) in self.map_url_out.items():
-                    for entry in entries:
-                        url = entry.get(attr_url)
-                        if url:
-                            entry[attr_out] = map_url_response[url]
-
-            # Forward to parent Connector once entry are reshaped.
-            entries = self.reshape_entries(query, entries)
-            return entries
+                self.download_entries(entries, attributes)
+        elif query.limit is None or late_filters is None or late_sort:
+            self.download_entries(entries, attributes)
+            if late_filters is not None:
+                entries = [entry for entry in entries if late_filters(entry)]
+            if late_sort:
+                entries = sort_by(query.sort_by, entries)
+            entries = (
+                entries[offset:offset + query.limit] if query.limit is not None
+                else entries[offset:]
+            )
         else:
-            raise RuntimeError("Action not implemented: %s" % query.action)
+            # Fetch batches of pages until enough entries satisfy the late filters.
+            num_needed = offset + query.limit
+            kept = list()
+            (i, batch_size) = (0, num_needed)
+            while i < len(entries) and len(kept) < num_needed:
+                batch = entries[i:i + batch_size]
+                i += len(batch)
+                self.download_entries(batch, attributes)
+                kept += [entry for entry in batch if late_filters(entry)]
+                # Size the next batch according to the observed selectivity.
+                num_missing = num_needed - len(kept)
+                batch_size = (
+                    max(1, -(-num_missing * i // len(kept))) if kept
+                    else 2 * batch_size
+                )
+            entries = kept[offset:num_needed]
+
+        # Forward to parent Connector once entry are reshaped.
+        entries = self.reshape_entries(
+            Query(object=query.object, attributes=query.attributes),
+            entries
+        )
+        return self.answer(query, entries)
 
     def attributes(self, object: str) -> set:
         """
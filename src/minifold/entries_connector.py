@@ -5,6 +5,7 @@
 # https://github.com/nokia/minifold
 
 from .connector import Connector
+from .count import clip_count
 from .query import Query, ACTION_READ, action_to_str
 
 
@@ -62,6 +63,29 @@ class EntriesConnector(Connector):
             )
         return self.answer(query, ret)
 
+    def count(self, query: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+        The entries are neither copied nor reshaped.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        if query.action != ACTION_READ:
+            action = action_to_str(query.action)
+            raise RuntimeError(
+                f"EntriesConnector.count: {action} not supported"
+            )
+        keep_if = query.filters
+        n = (
+            len(self.entries) if keep_if is None
+            else sum(1 for entry in self.entries if keep_if(entry))
+        )
+        return clip_count(n, query.offset, query.limit)
+
     @property
     def entries(self) -> list:
         """
@@ -9,11 +9,31 @@ This file gathers useful function to interact with the filesystem of the local s
 """
 
 import datetime
+import hashlib
+import operator
 import os
 import errno
 import shutil
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from .binary_predicate import BinaryPredicate, __in__, from_conjuncts, to_conjuncts
+from .connector import Connector
+from .lambdas import find_filters_dependencies
 from .log import Log
+from .query import ACTION_READ, Query
+
+# Attributes of the entries exposed by a FilesystemConnector that
+# do not require to stat the file.
+FILESYSTEM_NAME_ATTRIBUTES = {"path", "name", "extension"}
+
+# Attributes of the entries exposed by a FilesystemConnector that
+# require to stat the file.
+FILESYSTEM_STAT_ATTRIBUTES = {"size", "mtime"}
+
+# Number of bytes read at once when hashing a file.
+FILESYSTEM_HASH_CHUNK_SIZE = 1 << 20
 
 
 def rm(path: str, recursive: bool = False):
@@ -109,23 +129,307 @@ def check_writable_directory(directory: str):
         raise RuntimeError("Cannot write into directory '%s': %s" % (directory, e))
 
 
-def find(dir_name: str) -> list:
+def may_contain_matches(p: BinaryPredicate, dir_name: str) -> bool:
+    """
+    Checks whether a directory may contain a file whose path satisfies
+    a :py:class:`BinaryPredicate` (applying to the ``"path"`` attribute).
+    This function is conservative: it returns ``True`` if unsure.
+
+    Example:
+        >>> may_contain_matches(BinaryPredicate("path", "==", "/a/b/c.txt"), "/a/b")
+        True
+        >>> may_contain_matches(BinaryPredicate("path", "IN", ["/a/b/c.txt"]), "/a/d")
+        False
+
+    Args:
+        p (BinaryPredicate): The predicate.
+        dir_name (str): The path of the directory.
+
+    Returns:
+        ``False`` if no file in ``dir_name`` can satisfy ``p``, ``True`` otherwise.
+    """
+    if not isinstance(p, BinaryPredicate):
+        return True
+    if p.operator == operator.__and__:
+        return may_contain_matches(p.left, dir_name) and may_contain_matches(p.right, dir_name)
+    elif p.operator == operator.__or__:
+        return may_contain_matches(p.left, dir_name) or may_contain_matches(p.right, dir_name)
+    elif p.left != "path":
+        return True
+
+    # The paths of the files in dir_name are in [prefix, prefix + "\U0010ffff").
+    prefix = os.path.join(dir_name, "")
+    if p.operator == operator.__eq__:
+        return isinstance(p.right, str) and p.right.startswith(prefix)
+    elif p.operator == __in__:
+        return any(isinstance(path, str) and path.startswith(prefix) for path in p.right)
+    elif p.operator in {operator.__lt__, operator.__le__}:
+        return p.right >= prefix
+    elif p.operator in {operator.__gt__, operator.__ge__}:
+        return p.right < prefix + "\U0010ffff"
+    return True
+
+
+class FilesystemConnector(Connector):
+    """
+    The :py:class:`FilesystemConnector` class is a minifold gateway exposing
+    the files stored in a directory (and its subdirectories) as entries
+    with the following attributes:
+
+    - ``"path"``: the path to the file;
+    - ``"name"``: the name of the file;
+    - ``"extension"``: the extension of the file (without the leading dot);
+    - ``"size"``: the size of the file (in bytes);
+    - ``"mtime"``: the modification date of the file;
+    - ``"hash"``: the hash of the content of the file (only if enabled).
+
+    The directory tree is streamed (using ``os.scandir``). Subdirectories that
+    cannot contain a file satisfying the filters applying to ``"path"`` are
+    not traversed. The files not satisfying the filters applying to ``"path"``,
+    ``"name"`` and ``"extension"`` are not stat-ed.
+    """
+    def __init__(
+        self,
+        root: str,
+        hash_algorithm: str = None,
+        max_workers: int = 1,
+        follow_symlinks: bool = True
+    ):
+        """
+        Constructor.
+
+        Args:
+            root (str): The path to the root directory.
+            hash_algorithm (str): The name of the ``hashlib`` algorithm used to
+                compute the ``"hash"`` attribute (e.g., ``"sha256"``), or ``None``
+                to disable this attribute.
+            max_workers (int): The number of directories scanned concurrently.
+                If greater than 1, the files are not listed in depth-first order.
+            follow_symlinks (bool): Pass ``False`` to not traverse the symbolic
+                links to directories.
+        """
+        super().__init__()
+        self.m_root = root
+        self.m_hash_algorithm = hash_algorithm
+        self.m_max_workers = max_workers
+        self.m_follow_symlinks = follow_symlinks
+
+    @property
+    def root(self) -> str:
+        return self.m_root
+
+    def attributes(self, object: str = None) -> set:
+        """
+        Lists the available attributes related to a given collection of
+        minifold entries exposed by this :py:class:`FilesystemConnector` instance.
+
+        Args:
+            object (str): The name of the collection. As a
+                :py:class:`FilesystemConnector` exposes a single collection,
+                you may pass ``None``.
+
+        Returns:
+            The set of corresponding attributes.
+        """
+        ret = FILESYSTEM_NAME_ATTRIBUTES | FILESYSTEM_STAT_ATTRIBUTES
+        if self.m_hash_algorithm:
+            ret = ret | {"hash"}
+        return ret
+
+    def hash(self, path: str) -> str:
+        """
+        Hashes the content of a file.
+
+        Args:
+            path (str): The path to the file.
+
+        Returns:
+            The hexadecimal digest of the file content.
+        """
+        h = hashlib.new(self.m_hash_algorithm)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(FILESYSTEM_HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def make_entry(self, dir_entry: os.DirEntry, needed: set, keep_if: callable) -> dict:
+        """
+        Builds the entry related to a file.
+
+        Args:
+            dir_entry (os.DirEntry): The file.
+            needed (set): The attributes to compute.
+            keep_if (callable): The filter that can be evaluated without
+                stat-ing the file, or ``None``.
+
+        Returns:
+            The corresponding entry, or ``None`` if filtered by ``keep_if``.
+        """
+        entry = {
+            "path": dir_entry.path,
+            "name": dir_entry.name,
+            "extension": os.path.splitext(dir_entry.name)[1][1:],
+        }
+        if keep_if is not None and not keep_if(entry):
+            return None
+        if needed & FILESYSTEM_STAT_ATTRIBUTES:
+            st = dir_entry.stat(follow_symlinks=self.m_follow_symlinks)
+            entry["size"] = st.st_size
+            entry["mtime"] = datetime.datetime.fromtimestamp(st.st_mtime, datetime.UTC)
+        if "hash" in needed and self.m_hash_algorithm:
+            entry["hash"] = self.hash(dir_entry.path)
+        return entry
+
+    def scan(self, dir_name: str, needed: set, keep_if: callable, prune_if: list) -> list:
+        """
+        Scans a directory (non recursively).
+
+        Args:
+            dir_name (str): The path to the directory.
+            needed (set): The attributes to compute.
+            keep_if (callable): The filter that can be evaluated without
+                stat-ing the files, or ``None``.
+            prune_if (list): The conjuncts used to prune the subdirectories.
+
+        Returns:
+            The list of ``(is_dir, value)`` pairs, ordered as returned by
+            ``os.scandir``, where ``value`` is either the path of a subdirectory
+            to scan (if ``is_dir`` is ``True``) or the entry related to a file.
+        """
+        items = list()
+        try:
+            with os.scandir(dir_name) as it:
+                for dir_entry in it:
+                    try:
+                        is_dir = dir_entry.is_dir(follow_symlinks=self.m_follow_symlinks)
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if all(may_contain_matches(p, dir_entry.path) for p in prune_if):
+                            items.append((True, dir_entry.path))
+                    else:
+                        entry = self.make_entry(dir_entry, needed, keep_if)
+                        if entry is not None:
+                            items.append((False, entry))
+        except OSError as e:
+            Log.warning("FilesystemConnector: cannot scan %s: %s" % (dir_name, e))
+        return items
+
+    def walk(self, needed: set, keep_if: callable, prune_if: list) -> iter:
+        """
+        Iterates over the entries related to the files stored in
+        :py:attr:`self.root`.
+
+        Args:
+            needed (set): The attributes to compute.
+            keep_if (callable): The filter that can be evaluated without
+                stat-ing the files, or ``None``.
+            prune_if (list): The conjuncts used to prune the subdirectories.
+
+        Returns:
+            An iterator over the entries.
+        """
+        if self.m_max_workers <= 1:
+            # Depth-first
+            stack = [iter(self.scan(self.m_root, needed, keep_if, prune_if))]
+            while stack:
+                item = next(stack[-1], None)
+                if item is None:
+                    stack.pop()
+                    continue
+                (is_dir, value) = item
+                if is_dir:
+                    stack.append(iter(self.scan(value, needed, keep_if, prune_if)))
+                else:
+                    yield value
+            return
+
+        # Breadth-first, scanning the subdirectories concurrently.
+        executor = ThreadPoolExecutor(max_workers=self.m_max_workers)
+        try:
+            pending = deque([executor.submit(self.scan, self.m_root, needed, keep_if, prune_if)])
+            while pending:
+                for (is_dir, value) in pending.popleft().result():
+                    if is_dir:
+                        pending.append(executor.submit(self.scan, value, needed, keep_if, prune_if))
+                    else:
+                        yield value
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def query_gen(self, query: Query) -> iter:
+        """
+        Handles an input :py:class:`Query` instance and iterates over the
+        matching entries as the directory tree is traversed.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        if query.action != ACTION_READ:
+            raise RuntimeError("FilesystemConnector: Unable to query")
+
+        attributes = self.attributes(query.object)
+        selected = set(query.attributes) & attributes if query.attributes else attributes
+
+        # WHERE: the conjuncts only involving the name of the files are
+        # evaluated before stat-ing the files.
+        early = list()
+        late = list()
+        needed = set(selected)
+        for conjunct in to_conjuncts(query.filters):
+            if isinstance(conjunct, BinaryPredicate):
+                dependencies = find_filters_dependencies(conjunct)
+                if dependencies <= FILESYSTEM_NAME_ATTRIBUTES:
+                    early.append(conjunct)
+                else:
+                    late.append(conjunct)
+                needed |= dependencies
+            else:
+                late.append(conjunct)
+                needed |= FILESYSTEM_STAT_ATTRIBUTES | find_filters_dependencies(conjunct)
+        keep_if = from_conjuncts(early)
+        keep_if_late = from_conjuncts(late)
+
+        entries = self.walk(needed, keep_if, early)
+        if keep_if_late is not None:
+            entries = (entry for entry in entries if keep_if_late(entry))
+
+        # OFFSET, LIMIT
+        start = query.offset if query.offset else 0
+        stop = start + query.limit if query.limit is not None else None
+        for entry in islice(entries, start, stop):
+            # SELECT
+            yield {k: v for (k, v) in entry.items() if k in selected}
+
+    def query(self, query: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query.
+        """
+        super().query(query)
+        return self.answer(query, list(self.query_gen(query)))
+
+
+def find(dir_name: str, **kwargs) -> iter:
     """
     Lists the regular files in a stored in given directory or one of its subdirectories
     (in shell: ``find -type f dir_name``).
 
     Args:
         dir_name (str): A String corresponding to an existing directory.
+        kwargs: Additional parameters passed to :py:class:`FilesystemConnector`.
 
     Returns:
-        A list of strings, each of them corresponding to a file.
-    """
-    filenames = list()
-    files = os.listdir(dir_name)
-    for base_name in files:
-        cur_path = os.path.join(dir_name, base_name)
-        if os.path.isdir(cur_path):
-            filenames += find(cur_path)
-        else:
-            filenames.append(cur_path)
-    return filenames
+        An iterator over the strings, each of them corresponding to a file.
+    """
+    connector = FilesystemConnector(dir_name, **kwargs)
+    for entry in connector.query_gen(Query(attributes=["path"])):
+        yield entry["path"]
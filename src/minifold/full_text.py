@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+"""
+Full-text search over minifold entries, based on an in-memory inverted index.
+
+A full-text query is a string involving:
+
+- words (e.g., ``network``): the entry must contain the word;
+- phrases (e.g., ``"neural network"``): the entry must contain the words, consecutively;
+- prefixes (e.g., ``netw*``): the entry must contain a word starting with this prefix.
+
+The entry must match all the terms of the query. The words are normalized
+using :py:func:`to_canonic_string`, so that the search is neither case nor
+accent sensitive.
+"""
+
+import bisect
+import datetime
+import math
+import re
+from copy import copy
+from .binary_predicate import from_conjuncts, to_conjuncts
+from .connector import Connector
+from .hash import to_hashable
+from .query import Query, ACTION_READ
+from .sort_by import make_sort_key
+from .strings import remove_punctuation, to_canonic_string
+
+# Default BM25 parameters (see FullTextIndex.score).
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Kinds of full-text query terms (see parse_full_text_query).
+TERM_WORD = "word"
+TERM_PHRASE = "phrase"
+TERM_PREFIX = "prefix"
+
+RE_FULL_TEXT_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(value: object) -> list:
+    """
+    Splits a value into normalized words.
+
+    Example:
+        >>> tokenize("Élève, l'école!")
+        ['eleve', 'l', 'ecole']
+        >>> tokenize(["Alice", "Bob Smith"])
+        ['alice', 'bob', 'smith']
+
+    Args:
+        value (object): A string, a list of strings or any value
+            that can be converted to a string.
+
+    Returns:
+        The list of normalized words.
+    """
+    if value is None:
+        return list()
+    if isinstance(value, (list, tuple, set)):
+        return [token for elt in value for token in tokenize(elt)]
+    if not isinstance(value, str):
+        value = str(value)
+    tokens = (to_canonic_string(word) for word in remove_punctuation(value).split())
+    return [token for token in tokens if token]
+
+
+def parse_full_text_query(text: str) -> list:
+    """
+    Parses a full-text query.
+
+    Example:
+        >>> parse_full_text_query('Network "deep learning" optim*')
+        [('word', 'network'), ('phrase', ['deep', 'learning']), ('prefix', 'optim')]
+
+    Args:
+        text (str): The full-text query.
+
+    Returns:
+        The list of ``(kind, value)`` terms, where ``kind`` is
+        :py:data:`TERM_WORD`, :py:data:`TERM_PHRASE` or :py:data:`TERM_PREFIX`.
+    """
+    terms = list()
+    for (phrase, word) in RE_FULL_TEXT_QUERY.findall(text):
+        if word.endswith("*") and len(tokenize(word)) == 1:
+            terms.append((TERM_PREFIX, tokenize(word)[0]))
+            continue
+        tokens = tokenize(phrase if phrase else word)
+        if len(tokens) == 1:
+            terms.append((TERM_WORD, tokens[0]))
+        elif tokens:
+            # A word like "state-of-the-art" is a phrase.
+            terms.append((TERM_PHRASE, tokens))
+    return terms
+
+
+class FullTextIndex:
+    """
+    The :py:class:`FullTextIndex` class is an inverted index mapping each word
+    to its postings, i.e., the documents containing it and the positions
+    of the word in these documents.
+
+    Example:
+        >>> index = FullTextIndex()
+        >>> index.add(0, ["Deep learning for networks"])
+        >>> index.add(1, ["Learning deep networks"])
+        >>> index.search('"deep learning"')
+        [(0, 0.0)]
+        >>> # Both documents match, the shortest one is ranked first.
+        >>> [doc_id for (doc_id, _) in index.search("netw* deep", ranked=True)]
+        [1, 0]
+    """
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Constructor.
+
+        Args:
+            k1 (float): The BM25 term frequency saturation parameter.
+            b (float): The BM25 document length normalization parameter.
+        """
+        self.m_k1 = k1
+        self.m_b = b
+        self.m_postings = dict()    # word -> {doc_id: [positions]}
+        self.m_lengths = dict()     # doc_id -> number of words
+        self.m_words = dict()       # doc_id -> set of words
+        self.m_total_length = 0
+        self.m_vocabulary = None    # Sorted words, built on demand for the prefix queries.
+
+    def __len__(self) -> int:
+        return len(self.m_lengths)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.m_lengths
+
+    def add(self, doc_id: object, values: list):
+        """
+        Indexes a document. If the document is already indexed,
+        it is replaced.
+
+        Args:
+            doc_id (object): The identifier of the document.
+            values (list): The values of the document. A phrase cannot
+                span two values.
+        """
+        if doc_id in self.m_lengths:
+            self.remove(doc_id)
+        words = set()
+        position = 0
+        for value in values:
+            for token in tokenize(value):
+                postings = self.m_postings.get(token)
+                if postings is None:
+                    postings = self.m_postings[token] = dict()
+                    self.m_vocabulary = None
+                postings.setdefault(doc_id, list()).append(position)
+                words.add(token)
+                position += 1
+            # Skip a position, so that phrases do not span two values.
+            position += 1
+        length = position - len(values)
+        self.m_lengths[doc_id] = length
+        self.m_words[doc_id] = words
+        self.m_total_length += length
+
+    def remove(self, doc_id: object):
+        """
+        Removes a document from the index.
+
+        Args:
+            doc_id (object): The identifier of the document.
+        """
+        length = self.m_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.m_total_length -= length
+        for token in self.m_words.pop(doc_id):
+            postings = self.m_postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self.m_postings[token]
+                self.m_vocabulary = None
+
+    def expand_prefix(self, prefix: str) -> list:
+        """
+        Lists the indexed words starting with a given prefix.
+
+        Args:
+            prefix (str): The prefix.
+
+        Returns:
+            The corresponding words.
+        """
+        if self.m_vocabulary is None:
+            self.m_vocabulary = sorted(self.m_postings.keys())
+        vocabulary = self.m_vocabulary
+        ret = list()
+        for i in range(bisect.bisect_left(vocabulary, prefix), len(vocabulary)):
+            if not vocabulary[i].startswith(prefix):
+                break
+            ret.append(vocabulary[i])
+        return ret
+
+    def match_phrase(self, tokens: list) -> set:
+        """
+        Finds the documents containing a phrase.
+
+        Args:
+            tokens (list): The words of the phrase.
+
+        Returns:
+            The set of identifiers of the matching documents.
+        """
+        postings = [self.m_postings.get(token, dict()) for token in tokens]
+        doc_ids = intersect([set(p.keys()) for p in postings])
+        ret = set()
+        for doc_id in doc_ids:
+            positions = [set(p[doc_id]) for p in postings]
+            if any(
+                all(start + i in positions[i] for i in range(1, len(tokens)))
+                for start in postings[0][doc_id]
+            ):
+                ret.add(doc_id)
+        return ret
+
+    def match(self, terms: list) -> tuple:
+        """
+        Finds the documents matching all the terms of a parsed query
+        (see :py:func:`parse_full_text_query`).
+
+        Args:
+            terms (list): The parsed query.
+
+        Returns:
+            A ``(doc_ids, words)`` pair, where ``doc_ids`` is the set of
+            matching documents and ``words`` is the list of indexed words
+            involved in the query.
+        """
+        matches = list()
+        words = list()
+        for (kind, value) in terms:
+            if kind == TERM_WORD:
+                matches.append(set(self.m_postings.get(value, dict()).keys()))
+                words.append(value)
+            elif kind == TERM_PHRASE:
+                matches.append(self.match_phrase(value))
+                words += value
+            elif kind == TERM_PREFIX:
+                expanded = self.expand_prefix(value)
+                matches.append({
+                    doc_id
+                    for word in expanded
+                    for doc_id in self.m_postings[word].keys()
+                })
+                words += expanded
+            else:
+                raise ValueError("Invalid full-text term %s" % kind)
+        if not matches:
+            return (set(self.m_lengths.keys()), words)
+        return (intersect(matches), words)
+
+    def score(self, doc_id: object, words: list) -> float:
+        """
+        Computes the BM25 score of a document.
+
+        Args:
+            doc_id (object): The identifier of the document.
+            words (list): The words of the query.
+
+        Returns:
+            The BM25 score of the document.
+        """
+        n = len(self.m_lengths)
+        average_length = self.m_total_length / n if n else 0
+        length = self.m_lengths[doc_id]
+        norm = self.m_k1 * (
+            1 - self.m_b + self.m_b * (length / average_length if average_length else 0)
+        )
+        ret = 0.0
+        for word in set(words):
+            postings = self.m_postings.get(word, dict())
+            tf = len(postings.get(doc_id, ()))
+            if tf:
+                df = len(postings)
+                idf = math.log((n - df + 0.5) / (df + 0.5) + 1)
+                ret += idf * tf * (self.m_k1 + 1) / (tf + norm)
+        return ret
+
+    def search(self, text: str, ranked: bool = False) -> list:
+        """
+        Searches the documents matching a full-text query.
+
+        Args:
+            text (str): The full-text query (see :py:func:`parse_full_text_query`).
+            ranked (bool): Pass ``True`` to sort the results by decreasing
+                BM25 score, ``False`` to sort them by identifier.
+
+        Returns:
+            The list of ``(doc_id, score)`` pairs. The scores are ``0.0``
+            if ``ranked`` is ``False``.
+        """
+        (doc_ids, words) = self.match(parse_full_text_query(text))
+        if not ranked:
+            return [(doc_id, 0.0) for doc_id in sorted(doc_ids)]
+        ret = [(doc_id, self.score(doc_id, words)) for doc_id in doc_ids]
+        ret.sort(key=lambda pair: (-pair[1], pair[0]))
+        return ret
+
+
+def intersect(sets: list) -> set:
+    """
+    Intersects several sets, starting from the smallest one.
+
+    Args:
+        sets (list): A non-empty list of sets.
+
+    Returns:
+        The intersection of the sets.
+    """
+    sets = sorted(sets, key=len)
+    ret = set(sets[0])
+    for s in sets[1:]:
+        if not ret:
+            break
+        ret &= s
+    return ret
+
+
+class FullTextFilter:
+    """
+    The :py:class:`FullTextFilter` class is a minifold filter matching
+    the entries satisfying a full-text query
+    (see :py:func:`parse_full_text_query`).
+
+    A :py:class:`FullTextIndexConnector` answers it using its index.
+    Elsewhere, it is evaluated on each entry.
+
+    Example:
+        >>> f = FullTextFilter('"deep learning"', ["title"])
+        >>> f({"title": "Deep learning for networks"}), f({"title": "Learning deep networks"})
+        (True, False)
+    """
+    def __init__(self, text: str, attributes: list = None):
+        """
+        Constructor.
+
+        Args:
+            text (str): The full-text query.
+            attributes (list): The searched attributes when the filter is
+                evaluated on an entry, or ``None`` to search every attribute.
+                A :py:class:`FullTextIndexConnector` ignores it and
+                searches its indexed attributes.
+        """
+        self.m_text = text
+        self.m_terms = parse_full_text_query(text)
+        self.m_attributes = attributes
+
+    @property
+    def text(self) -> str:
+        return self.m_text
+
+    @property
+    def terms(self) -> list:
+        return self.m_terms
+
+    def __call__(self, entry: dict) -> bool:
+        """
+        Functor method.
+
+        Args:
+            entry (dict): A minifold entry.
+
+        Returns:
+            ``True`` if ``entry`` is matched by the search,
+            ``False`` otherwise.
+        """
+        index = FullTextIndex()
+        attributes = self.m_attributes if self.m_attributes is not None else entry.keys()
+        index.add(0, [entry.get(attribute) for attribute in attributes])
+        (doc_ids, _) = index.match(self.m_terms)
+        return bool(doc_ids)
+
+    def __str__(self) -> str:
+        return "MATCH(%r)" % self.m_text
+
+
+class FullTextIndexConnector(Connector):
+    """
+    The :py:class:`FullTextIndexConnector` class indexes the entries of
+    its child, so that the :py:class:`FullTextFilter` filters are answered
+    using an inverted index instead of scanning the entries.
+
+    The index is built on the first query. :py:meth:`refresh` updates it
+    incrementally: only the entries added, modified or removed since the
+    last refresh are (re)indexed.
+    """
+    def __init__(
+        self,
+        child: Connector,
+        attributes: list,
+        object: str = "",
+        ranked: bool = True,
+        score_attribute: str = None,
+        lifetime: datetime.timedelta = None,
+        k1: float = BM25_K1,
+        b: float = BM25_B
+    ):
+        """
+        Constructor.
+
+        Args:
+            child (Connector): The child minifold :py:class:`Connector` instance.
+            attributes (list): The indexed attributes.
+            object (str): The indexed collection of the child.
+            ranked (bool): Pass ``True`` to sort the results of a full-text
+                query by decreasing BM25 score (unless the query has a SORT BY).
+            score_attribute (str): The attribute storing the BM25 score of
+                each result, or ``None`` if not needed.
+            lifetime (datetime.timedelta): The maximal age of the index. When
+                reached, the index is refreshed before answering a query.
+                Pass ``None`` to only refresh it using :py:meth:`refresh`.
+            k1 (float): The BM25 term frequency saturation parameter.
+            b (float): The BM25 document length normalization parameter.
+        """
+        super().__init__()
+        self.m_child = child
+        self.m_attributes = list(attributes)
+        self.m_object = object
+        self.m_ranked = ranked
+        self.m_score_attribute = score_attribute
+        self.m_lifetime = lifetime
+        self.m_index = FullTextIndex(k1, b)
+        self.m_entries = dict()             # doc_id -> entry
+        self.m_fingerprints = dict()        # fingerprint -> [doc_id]
+        self.m_next_id = 0
+        self.m_last_refresh = None
+
+    @property
+    def child(self) -> Connector:
+        """
+        Accessor to the child minifold :py:class:`Connector` instance.
+
+        Returns:
+            The child minifold :py:class:`Connector` instance.
+        """
+        return self.m_child
+
+    @property
+    def index(self) -> FullTextIndex:
+        """
+        Accessor to the inverted index.
+
+        Returns:
+            The :py:class:`FullTextIndex` instance.
+        """
+        return self.m_index
+
+    def attributes(self, object: str) -> set:
+        """
+        Lists the available attributes related to a given collection of
+        minifold entries exposed by this :py:class:`FullTextIndexConnector` instance.
+
+        Args:
+            object (str): The name of the collection.
+
+        Returns:
+            The set of corresponding attributes.
+        """
+        ret = set(self.m_child.attributes(self.m_object))
+        if self.m_score_attribute:
+            ret.add(self.m_score_attribute)
+        return ret
+
+    def refresh(self) -> tuple:
+        """
+        Updates the index according to the current entries of the child.
+        The entries are identified by their content, so an entry that
+        has changed is removed from the index and indexed again.
+
+        Returns:
+            The ``(num_added, num_removed)`` pair.
+        """
+        old_fingerprints = self.m_fingerprints
+        self.m_fingerprints = dict()
+        num_added = 0
+        for entry in self.m_child.query_gen(Query(object=self.m_object)):
+            fingerprint = to_hashable(entry)
+            doc_ids = old_fingerprints.get(fingerprint)
+            if doc_ids:
+                doc_id = doc_ids.pop()
+            else:
+                doc_id = self.m_next_id
+                self.m_next_id += 1
+                self.m_entries[doc_id] = entry
+                self.m_index.add(doc_id, [entry.get(attribute) for attribute in self.m_attributes])
+                num_added += 1
+            self.m_fingerprints.setdefault(fingerprint, list()).append(doc_id)
+        num_removed = 0
+        for doc_ids in old_fingerprints.values():
+            for doc_id in doc_ids:
+                self.m_index.remove(doc_id)
+                del self.m_entries[doc_id]
+                num_removed += 1
+        self.m_last_refresh = datetime.datetime.now()
+        return (num_added, num_removed)
+
+    def is_fresh(self) -> bool:
+        """
+        Checks whether the index is up-to-date according to its lifetime.
+
+        Returns:
+            ``True`` if the index does not need to be refreshed,
+            ``False`` otherwise.
+        """
+        if self.m_last_refresh is None:
+            return False
+        if self.m_lifetime is None:
+            return True
+        return datetime.datetime.now() - self.m_last_refresh < self.m_lifetime
+
+    def search(self, q: Query) -> list:
+        """
+        Finds the entries matching the :py:class:`FullTextFilter` filters
+        of a query, using the index. The other filters are not evaluated.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The list of ``(entry, score)`` pairs.
+        """
+        texts = [
+            conjunct.text
+            for conjunct in to_conjuncts(q.filters)
+            if isinstance(conjunct, FullTextFilter)
+        ]
+        if not texts:
+            return [(entry, None) for (_, entry) in sorted(self.m_entries.items())]
+        ranked = self.m_ranked and not q.sort_by
+        results = self.m_index.search(" ".join(texts), ranked or bool(self.m_score_attribute))
+        if not ranked:
+            results.sort()
+        return [(self.m_entries[doc_id], score) for (doc_id, score) in results]
+
+    def query(self, q: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query.
+        """
+        super().query(q)
+        if q.action != ACTION_READ:
+            raise ValueError("Invalid action in query %s" % q)
+        if not self.is_fresh():
+            self.refresh()
+        entries = list()
+        for (entry, score) in self.search(q):
+            if self.m_score_attribute:
+                entry = dict(entry)
+                entry[self.m_score_attribute] = score
+            entries.append(entry)
+        if q.sort_by:
+            (key, reverse) = make_sort_key(q.sort_by)
+            entries.sort(key=key, reverse=reverse)
+
+        # The other filters, OFFSET, LIMIT and SELECT are applied locally.
+        q_local = copy(q)
+        q_local.filters = from_conjuncts([
+            conjunct
+            for conjunct in to_conjuncts(q.filters)
+            if not isinstance(conjunct, FullTextFilter)
+        ])
+        return self.answer(q, self.reshape_entries(q_local, entries))
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+"""
+Fuzzy join, used to reconcile entries coming from several data sources
+(e.g., a same publication retrieved from DBLP and HAL) whose keys
+(e.g., the titles) are similar but not equal.
+
+Comparing every left entry with every right entry is quadratic. Instead,
+the keys are canonized (see :py:func:`to_canonic_string`) and split into
+character n-grams, and only the candidate pairs sharing a block are scored:
+
+- ``"ngram"`` blocking (default) indexes the rarest n-grams of each key
+  (prefix filtering). No pair whose n-gram Jaccard similarity reaches
+  the threshold is missed.
+- ``"minhash"`` blocking hashes the MinHash signature of each key by bands
+  (locality sensitive hashing). It is approximate, but the size of the
+  blocks does not depend on the frequency of the n-grams.
+"""
+
+import math
+import random
+from collections import Counter
+from .connector import Connector
+from .hyperloglog import hash64
+from .join_if import (
+    INNER_JOIN, LEFT_JOIN, RIGHT_JOIN, FULL_OUTER_JOIN,
+    join_mode_to_string, merge_dict
+)
+from .query import Query
+from .strings import to_canonic_string
+
+# Default length of the character n-grams.
+DEFAULT_FUZZY_JOIN_NGRAM_SIZE = 3
+
+# Default similarity threshold.
+DEFAULT_FUZZY_JOIN_THRESHOLD = 0.8
+
+# Default MinHash-LSH parameters: the signatures involve
+# num_bands * rows_per_band hash functions.
+DEFAULT_MINHASH_NUM_BANDS = 16
+DEFAULT_MINHASH_ROWS_PER_BAND = 2
+
+# Modulus of the hash functions used by MinHash (a Mersenne prime).
+MINHASH_PRIME = (1 << 61) - 1
+
+FUZZY_JOIN_BLOCKINGS = {"ngram", "minhash"}
+
+
+def ngrams(s: str, n: int = DEFAULT_FUZZY_JOIN_NGRAM_SIZE) -> set:
+    """
+    Computes the character n-grams of a string.
+
+    Example:
+        >>> sorted(ngrams("minifold", 5))
+        ['ifold', 'inifo', 'minif', 'nifol']
+
+    Args:
+        s (str): The input string.
+        n (int): The length of the n-grams.
+
+    Returns:
+        The set of n-grams of ``s``. If ``s`` is shorter than ``n``,
+        it is its own n-gram.
+    """
+    if len(s) <= n:
+        return {s} if s else set()
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+
+def jaccard(x: set, y: set) -> float:
+    """
+    Computes the Jaccard similarity of two sets.
+
+    Example:
+        >>> jaccard({1, 2, 3}, {2, 3, 4})
+        0.5
+
+    Args:
+        x (set): A set.
+        y (set): A set.
+
+    Returns:
+        The Jaccard similarity, in ``[0, 1]``.
+    """
+    if not x and not y:
+        return 0.0
+    n = len(x & y)
+    return n / (len(x) + len(y) - n)
+
+
+def make_fuzzy_key(key: object, canonize: callable = to_canonic_string) -> callable:
+    """
+    Builds the function extracting the canonical key of an entry.
+
+    Args:
+        key (object): The attribute storing the key, or a function
+            returning the key of an entry. If the key is a list
+            (e.g., a list of authors), its elements are canonized
+            and concatenated.
+        canonize (callable): The function canonizing a string.
+
+    Returns:
+        A function mapping an entry with its canonical key.
+    """
+    get = key if callable(key) else (lambda entry: entry.get(key))
+
+    def fuzzy_key(entry: dict) -> str:
+        value = get(entry)
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return " ".join(canonize(str(elt)) for elt in value)
+        return canonize(str(value))
+
+    return fuzzy_key
+
+
+def ngram_candidates(l_grams: list, r_grams: list, threshold: float) -> iter:
+    """
+    Finds the candidate pairs using prefix filtering: each set of n-grams
+    is indexed by its rarest n-grams, so that two sets whose Jaccard similarity
+    is at least ``threshold`` share at least one indexed n-gram.
+
+    Args:
+        l_grams (list): The n-grams of each left key.
+        r_grams (list): The n-grams of each right key.
+        threshold (float): The Jaccard similarity threshold.
+
+    Returns:
+        An iterator over the ``(i, js)`` pairs, where ``js`` is the set of
+        candidate right indices for the ``i``-th left key.
+    """
+    frequencies = Counter()
+    for grams in l_grams:
+        frequencies.update(grams)
+    for grams in r_grams:
+        frequencies.update(grams)
+
+    def prefix(grams: set) -> list:
+        num_indexed = len(grams) - math.ceil(threshold * len(grams)) + 1
+        return sorted(grams, key=lambda gram: (frequencies[gram], gram))[:num_indexed]
+
+    index = dict()
+    for (j, grams) in enumerate(r_grams):
+        for gram in prefix(grams):
+            index.setdefault(gram, list()).append(j)
+    for (i, grams) in enumerate(l_grams):
+        candidates = set()
+        for gram in prefix(grams):
+            candidates.update(index.get(gram, ()))
+        yield (i, candidates)
+
+
+def minhash_candidates(
+    l_grams: list,
+    r_grams: list,
+    num_bands: int = DEFAULT_MINHASH_NUM_BANDS,
+    rows_per_band: int = DEFAULT_MINHASH_ROWS_PER_BAND,
+    seed: int = 0
+) -> iter:
+    """
+    Finds the candidate pairs using MinHash locality sensitive hashing:
+    two sets are candidates if their MinHash signatures agree on all the
+    rows of at least one band. Two sets whose Jaccard similarity is ``s``
+    are candidates with probability ``1 - (1 - s ** rows_per_band) ** num_bands``.
+
+    Args:
+        l_grams (list): The n-grams of each left key.
+        r_grams (list): The n-grams of each right key.
+        num_bands (int): The number of bands.
+        rows_per_band (int): The number of hash functions per band.
+        seed (int): The seed used to draw the hash functions.
+
+    Returns:
+        An iterator over the ``(i, js)`` pairs, where ``js`` is the set of
+        candidate right indices for the ``i``-th left key.
+    """
+    rng = random.Random(seed)
+    coefficients = [
+        (rng.randrange(1, MINHASH_PRIME), rng.randrange(0, MINHASH_PRIME))
+        for _ in range(num_bands * rows_per_band)
+    ]
+
+    def bands(grams: set) -> list:
+        if not grams:
+            return list()
+        hashes = [hash64(gram) for gram in grams]
+        signature = [
+            min((a * h + b) % MINHASH_PRIME for h in hashes)
+            for (a, b) in coefficients
+        ]
+        return [
+            (k, tuple(signature[k * rows_per_band:(k + 1) * rows_per_band]))
+            for k in range(num_bands)
+        ]
+
+    buckets = dict()
+    for (j, grams) in enumerate(r_grams):
+        for band in bands(grams):
+            buckets.setdefault(band, list()).append(j)
+    for (i, grams) in enumerate(l_grams):
+        candidates = set()
+        for band in bands(grams):
+            candidates.update(buckets.get(band, ()))
+        yield (i, candidates)
+
+
+def fuzzy_join_pairs(
+    l_entries: list,
+    r_entries: list,
+    l_key: object,
+    r_key: object = None,
+    threshold: float = DEFAULT_FUZZY_JOIN_THRESHOLD,
+    canonize: callable = to_canonic_string,
+    n: int = DEFAULT_FUZZY_JOIN_NGRAM_SIZE,
+    blocking: str = "ngram",
+    similarity: callable = None,
+    blocking_threshold: float = None,
+    match_once: bool = True,
+    **kwargs
+) -> list:
+    """
+    Finds the pairs of similar entries. Only the candidate pairs
+    found by the blocking strategy are scored.
+
+    Args:
+        l_entries (list): The left minifold entries.
+        r_entries (list): The right minifold entries.
+        l_key (object): The attribute (or the function, see :py:func:`make_fuzzy_key`)
+            identifying a left entry.
+        r_key (object): The attribute (or the function) identifying
+            a right entry. Defaults to ``l_key``.
+        threshold (float): The minimal similarity of two joined entries.
+        canonize (callable): The function canonizing the keys, e.g.
+            :py:func:`to_canonic_string` (titles) or
+            :py:func:`to_canonic_fullname` (names).
+        n (int): The length of the n-grams.
+        blocking (str): The blocking strategy, ``"ngram"`` or ``"minhash"``.
+        similarity (callable): A function ``similarity(l_key, r_key)`` scoring
+            two canonical keys in ``[0, 1]``. If ``None``, the Jaccard similarity
+            of their n-grams is used.
+        blocking_threshold (float): The n-gram Jaccard similarity threshold used
+            by the ``"ngram"`` blocking. Defaults to ``threshold``. It should be
+            lowered if ``similarity`` is more tolerant than the n-gram
+            Jaccard similarity.
+        match_once (bool): Pass ``True`` to only keep, for each left entry,
+            its most similar right entry.
+        kwargs: The parameters of :py:func:`minhash_candidates`.
+
+    Raises:
+        ValueError: if ``blocking`` is invalid.
+
+    Returns:
+        The list of ``(i, j, score)`` triples, where ``i`` (resp. ``j``)
+        is the index of a left (resp. right) entry.
+    """
+    if blocking not in FUZZY_JOIN_BLOCKINGS:
+        raise ValueError(
+            "Invalid blocking %s, valid values are: %s" % (blocking, sorted(FUZZY_JOIN_BLOCKINGS))
+        )
+    l_fuzzy_key = make_fuzzy_key(l_key, canonize)
+    r_fuzzy_key = make_fuzzy_key(r_key if r_key is not None else l_key, canonize)
+    l_keys = [l_fuzzy_key(entry) for entry in l_entries]
+    r_keys = [r_fuzzy_key(entry) for entry in r_entries]
+    l_grams = [ngrams(key.replace(" ", ""), n) for key in l_keys]
+    r_grams = [ngrams(key.replace(" ", ""), n) for key in r_keys]
+
+    if blocking == "ngram":
+        candidates = ngram_candidates(
+            l_grams, r_grams,
+            threshold if blocking_threshold is None else blocking_threshold
+        )
+    else:
+        candidates = minhash_candidates(l_grams, r_grams, **kwargs)
+
+    ret = list()
+    for (i, js) in candidates:
+        matches = list()
+        for j in sorted(js):
+            score = (
+                jaccard(l_grams[i], r_grams[j]) if similarity is None
+                else similarity(l_keys[i], r_keys[j])
+            )
+            if score >= threshold:
+                matches.append((i, j, score))
+        if match_once and matches:
+            matches = [max(matches, key=lambda match: match[2])]
+        ret += matches
+    return ret
+
+
+def fuzzy_join(
+    l_entries: list,
+    r_entries: list,
+    l_key: object,
+    r_key: object = None,
+    mode: int = INNER_JOIN,
+    score_attribute: str = None,
+    merge: callable = merge_dict,
+    **kwargs
+) -> list:
+    """
+    Joins the entries whose keys are similar.
+
+    Example:
+        >>> dblp = [{"title": "Minifold: a query framework.", "venue": "X"}]
+        >>> hal = [{"title": "MiniFold - A query framework", "hal_id": 1}]
+        >>> fuzzy_join(dblp, hal, "title", threshold=0.7)
+        [{'title': 'MiniFold - A query framework', 'venue': 'X', 'hal_id': 1}]
+
+    Args:
+        l_entries (list): The left minifold entries.
+        r_entries (list): The right minifold entries.
+        l_key (object): The attribute (or the function, see :py:func:`make_fuzzy_key`)
+            identifying a left entry.
+        r_key (object): The attribute (or the function) identifying
+            a right entry. Defaults to ``l_key``.
+        mode (int): The type of join. The valid values are:
+            :py:data:`INNER_JOIN`,
+            :py:data:`LEFT_JOIN`,
+            :py:data:`RIGHT_JOIN`,
+            :py:data:`FULL_OUTER_JOIN`.
+        score_attribute (str): The attribute storing the similarity of
+            the joined entries, or ``None`` if not needed.
+        merge (callable): A function that merges two input dictionaries.
+            Defaults to :py:func:`merge_dict`.
+        kwargs: The parameters of :py:func:`fuzzy_join_pairs`.
+
+    Raises:
+        ValueError: if ``mode`` is invalid.
+
+    Returns:
+        The joined entries. The input entries are not modified.
+    """
+    if mode not in (INNER_JOIN, LEFT_JOIN, RIGHT_JOIN, FULL_OUTER_JOIN):
+        raise ValueError("Invalid mode %s" % mode)
+    pairs = fuzzy_join_pairs(l_entries, r_entries, l_key, r_key, **kwargs)
+
+    l_keys = {k for entry in l_entries for k in entry.keys()}
+    r_keys = {k for entry in r_entries for k in entry.keys()}
+    if score_attribute:
+        l_keys.add(score_attribute)
+        r_keys.add(score_attribute)
+
+    def pad(entry: dict, keys: set) -> dict:
+        ret = dict(entry)
+        for k in keys:
+            ret.setdefault(k, None)
+        return ret
+
+    ret = list()
+    l_matched = set()
+    r_matched = set()
+    for (i, j, score) in pairs:
+        entry = merge(l_entries[i], r_entries[j])
+        if score_attribute:
+            entry[score_attribute] = score
+        ret.append(entry)
+        l_matched.add(i)
+        r_matched.add(j)
+    if mode in (LEFT_JOIN, FULL_OUTER_JOIN):
+        ret += [
+            pad(entry, r_keys)
+            for (i, entry) in enumerate(l_entries)
+            if i not in l_matched
+        ]
+    if mode in (RIGHT_JOIN, FULL_OUTER_JOIN):
+        ret += [
+            pad(entry, l_keys)
+            for (j, entry) in enumerate(r_entries)
+            if j not in r_matched
+        ]
+    return ret
+
+
+class FuzzyJoinConnector(Connector):
+    """
+    The :py:class:`FuzzyJoinConnector` is a minifold connector that joins
+    the entries of two connectors whose keys are similar (see :py:func:`fuzzy_join`).
+    Unlike a :py:class:`JoinIfConnector` with a similarity criterion,
+    it only compares the candidate pairs found by blocking.
+    """
+    def __init__(
+        self,
+        left: Connector,
+        right: Connector,
+        l_key: object,
+        r_key: object = None,
+        mode: int = INNER_JOIN,
+        threshold: float = DEFAULT_FUZZY_JOIN_THRESHOLD,
+        score_attribute: str = None,
+        **kwargs
+    ):
+        """
+        Constructor.
+
+        Args:
+            left (Connector): The left :py:class:`Connector` child.
+            right (Connector): The right :py:class:`Connector` child.
+            l_key (object): The attribute (or the function, see :py:func:`make_fuzzy_key`)
+                identifying a left entry.
+            r_key (object): The attribute (or the function) identifying
+                a right entry. Defaults to ``l_key``.
+            mode (int): The type of join. The valid values are:
+                :py:data:`INNER_JOIN`,
+                :py:data:`LEFT_JOIN`,
+                :py:data:`RIGHT_JOIN`,
+                :py:data:`FULL_OUTER_JOIN`.
+            threshold (float): The minimal similarity of two joined entries.
+            score_attribute (str): The attribute storing the similarity of
+                the joined entries, or ``None`` if not needed.
+            kwargs: The other parameters of :py:func:`fuzzy_join_pairs`
+                (e.g., ``canonize``, ``blocking``, ``similarity``).
+
+        Raises:
+            ValueError: if ``mode`` or the blocking strategy is invalid.
+        """
+        super().__init__()
+        if mode not in (INNER_JOIN, LEFT_JOIN, RIGHT_JOIN, FULL_OUTER_JOIN):
+            raise ValueError("Invalid mode %s" % mode)
+        if kwargs.get("blocking", "ngram") not in FUZZY_JOIN_BLOCKINGS:
+            raise ValueError("Invalid blocking %s" % kwargs["blocking"])
+        self.m_left = left
+        self.m_right = right
+        self.m_l_key = l_key
+        self.m_r_key = r_key
+        self.m_mode = mode
+        self.m_threshold = threshold
+        self.m_score_attribute = score_attribute
+        self.m_kwargs = kwargs
+
+    @property
+    def left(self) -> Connector:
+        """
+        Retrieves the left :py:class:`Connector` child.
+
+        Returns:
+            The left :py:class:`Connector` child.
+        """
+        return self.m_left
+
+    @property
+    def right(self) -> Connector:
+        """
+        Retrieves the right :py:class:`Connector` child.
+
+        Returns:
+            The right :py:class:`Connector` child.
+        """
+        return self.m_right
+
+    @property
+    def mode(self) -> int:
+        """
+        Retrieves the join mode.
+
+        Returns:
+            A value among :py:data:`INNER_JOIN`, :py:data:`LEFT_JOIN`,
+            :py:data:`RIGHT_JOIN`, :py:data:`FULL_OUTER_JOIN`.
+        """
+        return self.m_mode
+
+    @property
+    def threshold(self) -> float:
+        """
+        Retrieves the minimal similarity of two joined entries.
+
+        Returns:
+            The similarity threshold.
+        """
+        return self.m_threshold
+
+    def attributes(self, object: str) -> set:
+        """
+        Lists the available attributes related to a given collection of
+        minifold entries exposed by this :py:class:`FuzzyJoinConnector` instance.
+
+        Args:
+            object (str): The name of the collection.
+
+        Returns:
+            The set of corresponding attributes.
+        """
+        ret = self.m_left.attributes(object) | self.m_right.attributes(object)
+        if self.m_score_attribute:
+            ret.add(self.m_score_attribute)
+        return ret
+
+    def query(self, query: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query.
+        """
+        super().query(query)
+        entries = fuzzy_join(
+            self.m_left.query(query),
+            self.m_right.query(query),
+            self.m_l_key,
+            self.m_r_key,
+            mode=self.m_mode,
+            score_attribute=self.m_score_attribute,
+            threshold=self.m_threshold,
+            **self.m_kwargs
+        )
+        return self.answer(query, entries)
+
+    def __str__(self) -> str:
+        return "FUZZY %s ON %s ~ %s (>= %s)" % (
+            join_mode_to_string(self.m_mode),
+            self.m_l_key,
+            self.m_r_key if self.m_r_key is not None else self.m_l_key,
+            self.m_threshold
+        )
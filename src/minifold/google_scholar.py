@@ -24,26 +24,35 @@ except ImportError as e:
     )
     raise e
 
+import datetime
 import difflib
 import operator
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from .binary_predicate import BinaryPredicate
 from .connector import Connector
 from .download import download
 from .log import Log
 from .query import ACTION_READ, Query
+from .session import get_session
 from .scholar import (
     ScholarConf, ScholarQuerier, ScholarQuery,
     SearchScholarQuery, ScholarSettings, SoupKitchen
 )
 
+# (connect timeout, read timeout) of the requests sent to Google Scholar.
+GOOGLE_SCHOLAR_TIMEOUT = (5.0, 30.0)
 
-def parse_article(s_html: str) -> dict:
+
+def parse_article(s_html) -> dict:
     """
     Parse a "gs_res_ccl_mid" div (wrapping each article) returned by Google Scholar.
 
     Args:
-        s_html (str): The HTML string containing the div.
+        s_html (str|bs4.element.Tag): The HTML string containing the div,
+            or the div itself, if the page has already been parsed.
 
     Returns:
         The dict describing the article, structured as follows:
@@ -92,7 +101,10 @@ def parse_article(s_html: str) -> dict:
         return int(re.search("\\d+", s).group())
 
     entry = dict()
-    soup = BeautifulSoup(s_html, features="lxml")
+    soup = (
+        BeautifulSoup(s_html, features="lxml") if isinstance(s_html, str)
+        else s_html
+    )
 
     # Extract url_title
     div = soup.find(name="div", attrs={"class": "gs_or_ggsm"})
@@ -149,6 +161,46 @@ def parse_article(s_html: str) -> dict:
     return entry
 
 
+def parse_articles(s_html: str) -> list:
+    """
+    Parses a Google Scholar result page. The page is parsed once and
+    each article is extracted in place (see :py:func:`parse_article`).
+
+    Args:
+        s_html (str): An HTML Google Scholar page content.
+
+    Raises:
+        ``RuntimeError`` if the page can't be parsed.
+
+    Returns:
+        The list of dict describing each article of the page.
+    """
+    try:
+        soup = SoupKitchen.make_soup(s_html)
+        soup = soup.find(name="div", attrs={"id": "gs_res_ccl_mid"})
+        return [
+            parse_article(div)
+            for div in soup.findAll(name="div", attrs={"class": "gs_r"})
+        ]
+    except Exception:
+        raise RuntimeError(f"Unable to parse:\n\n{s_html}")
+
+
+def page_url(gs_query: ScholarQuery, start: int = 0) -> str:
+    """
+    Crafts the URL of a page of results of a Google Scholar query.
+
+    Args:
+        gs_query (ScholarQuery): A Google scholar query.
+        start (int): The index of the first result of the page.
+
+    Returns:
+        The URL of the page.
+    """
+    url = gs_query.get_url()
+    return url + "&start=%d" % start if start else url
+
+
 class MinifoldScholarQuerier(ScholarQuerier):
     """
     :py:class`MinifoldScholarQuerier` overloads :py:class:`ScholarQuerier`
@@ -161,6 +213,34 @@ class MinifoldScholarQuerier(ScholarQuerier):
         super().__init__()
         self.articles = list()
 
+    def _get_http_response(self, url: str, log_msg: str = None, err_msg: str = None) -> bytes:
+        """
+        Sends an HTTP request through the process-wide keep-alive session
+        (see :py:class:`SessionManager`) instead of the ``urllib`` opener.
+
+        Args:
+            url (str): The queried URL.
+            log_msg (str): Unused, kept for compatibility with
+                :py:class:`ScholarQuerier`.
+            err_msg (str): The message logged if the request fails.
+
+        Returns:
+            The response payload if successful (i.e., if the server replied
+            with a 2xx status before the timeout), ``None`` otherwise.
+        """
+        try:
+            Log.info("GoogleScholar <-- %s" % url)
+            response = get_session().get(
+                url,
+                headers={"User-Agent": ScholarConf.USER_AGENT},
+                timeout=GOOGLE_SCHOLAR_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            Log.warning("%s: %s" % (err_msg if err_msg else "request failed", e))
+            return None
+
     def parse(self, s_html: str):
         """
         Populates :py:attr:`self.articles` using the HTML Google Scholar page.
@@ -171,42 +251,62 @@ class MinifoldScholarQuerier(ScholarQuerier):
         Raises:
             ``RuntimeError`` if the result can't be fetched from Google scholar.
         """
-        try:
-            soup = SoupKitchen.make_soup(s_html)
-            soup = soup.find(name="div", attrs={"id": "gs_res_ccl_mid"})
-            for div in soup.findAll(name="div", attrs={"class": "gs_r"}):
-                s = div.prettify()
-                entry = parse_article(s)
-                self.articles.append(entry)
-        except Exception:
-            raise RuntimeError(f"Unable to parse:\n\n{s_html}")
+        self.articles.extend(parse_articles(s_html))
 
-    def send_query(self, gs_query: ScholarQuery):
+    def fetch(self, url: str) -> str:
         """
-        Sends a query to Google scholar.
+        Fetches a Google Scholar page.
 
         Args:
-            gs_query (ScholarQuery): A Google scholar query.
+            url (str): The URL of the page.
 
         Raises:
             ``RuntimeError`` if the result can't be fetched from Google scholar.
+
+        Returns:
+            The HTML content of the page.
         """
-        # Network
-        url = gs_query.get_url()
         Log.info("GoogleScholar <-- %s" % url)
 
         # Here, we rely on minifold downloader as it can cache results.
         # s_html = self._get_http_response(url)
         response = download(url)
+        if isinstance(response, Exception):
+            raise RuntimeError(f"Cannot fetch result from Google scholar: {response}")
         s_html = response.text
-
-        # Parsing
-        if s_html:
-            self.parse(s_html)
-            self.articles = list()
-            self.parse(s_html)
-        else:
+        if not s_html:
             raise RuntimeError("Cannot fetch result from Google scholar")
+        return s_html
+
+    def fetch_page(self, gs_query: ScholarQuery, start: int = 0) -> list:
+        """
+        Fetches and parses a page of results of a Google scholar query.
+        Unlike :py:meth:`send_query`, this method does not alter
+        :py:attr:`self.articles` and may be called concurrently.
+
+        Args:
+            gs_query (ScholarQuery): A Google scholar query.
+            start (int): The index of the first result of the page.
+
+        Raises:
+            ``RuntimeError`` if the result can't be fetched from Google scholar.
+
+        Returns:
+            The list of articles of the page.
+        """
+        return parse_articles(self.fetch(page_url(gs_query, start)))
+
+    def send_query(self, gs_query: ScholarQuery):
+        """
+        Sends a query to Google scholar.
+
+        Args:
+            gs_query (ScholarQuery): A Google scholar query.
+
+        Raises:
+            ``RuntimeError`` if the result can't be fetched from Google scholar.
+        """
+        self.articles = self.fetch_page(gs_query)
 
 
 class GoogleScholarConnector(Connector):
@@ -219,17 +319,31 @@ class GoogleScholarConnector(Connector):
     - :py:class:`GoogleScholarConnector`.
 
     """
-    def __init__(self, citation_format: str = ScholarSettings.CITFORM_BIBTEX):
+    def __init__(
+        self,
+        citation_format: str = ScholarSettings.CITFORM_BIBTEX,
+        wait_time: datetime.timedelta = datetime.timedelta(seconds=2),
+        max_workers: int = 4
+    ):
         """
         Constructor.
 
         Args:
             citation_format (str): The citation format.
+            wait_time (datetime.timedelta): Minimal time interval between two
+                Google Scholar queries, to avoid being blocked.
+            max_workers (int): The maximal number of result pages fetched
+                concurrently.
         """
+        super().__init__()
         settings = ScholarSettings()
         settings.set_citation_format(citation_format)
         self.querier = MinifoldScholarQuerier()  # ScholarQuerier()
         self.querier.apply_settings(settings)
+        self.last_query_time = datetime.datetime.now() - wait_time
+        self.wait_time = wait_time
+        self.max_workers = max_workers
+        self.m_lock = threading.Lock()
 
     def attributes(self, object: str) -> set:
         """
@@ -276,6 +390,8 @@ class GoogleScholarConnector(Connector):
             gs_query (ScholarQuery): The Google Scholar query.
             authors (list): Pass an empty list.
         """
+        if p is None:
+            return
         if p.operator == operator.__and__:
             GoogleScholarConnector.filter_to_scholar(p.left, gs_query, authors)
             GoogleScholarConnector.filter_to_scholar(p.right, gs_query, authors)
@@ -364,6 +480,85 @@ class GoogleScholarConnector(Connector):
             # We are renaming an author with his/her real name.
             return ret[0]
 
+    def wait(self):
+        """
+        Waits until the next Google Scholar query is allowed by the rate
+        limitation. This method is thread-safe: concurrent callers are
+        spaced by at least ``self.wait_time``.
+        """
+        with self.m_lock:
+            now = datetime.datetime.now()
+            query_time = max(now, self.last_query_time + self.wait_time)
+            self.last_query_time = query_time
+        wait_time = (query_time - now).total_seconds()
+        if wait_time > 0:
+            Log.info(f"Waiting {wait_time} seconds due to Google Scholar rate limiting")
+            time.sleep(wait_time)
+
+    def fetch_page(self, gs_query: ScholarQuery, start: int = 0) -> list:
+        """
+        Fetches a page of results (according to the rate limitation).
+
+        Args:
+            gs_query (ScholarQuery): A Google scholar query.
+            start (int): The index of the first result of the page.
+
+        Returns:
+            The list of articles of the page.
+        """
+        self.wait()
+        return self.querier.fetch_page(gs_query, start)
+
+    def fetch_pages(self, gs_query: ScholarQuery, offset: int, limit: int) -> list:
+        """
+        Fetches the results of a Google Scholar query from ``offset``.
+        The result pages are fetched concurrently, by waves of
+        ``self.max_workers`` pages (as fast as allowed by ``self.wait_time``),
+        so ``limit`` is not capped by :py:data:`ScholarConf.MAX_PAGE_RESULTS`.
+        The fetching stops at the first incomplete page.
+
+        Args:
+            gs_query (ScholarQuery): A Google scholar query.
+            offset (int): The index of the first fetched result.
+            limit (int): The maximal number of fetched results.
+                Pass ``None`` to fetch a single page.
+
+        Returns:
+            The list of fetched articles.
+        """
+        page_size = ScholarConf.MAX_PAGE_RESULTS
+        if limit is None:
+            return self.fetch_page(gs_query, offset)
+        if limit <= 0:
+            return list()
+        gs_query.set_num_page_results(min(limit, page_size))
+        starts = range(offset, offset + limit, page_size)
+        if len(starts) == 1:
+            return self.fetch_page(gs_query, offset)
+
+        # The pages are fetched by waves of self.max_workers pages, so that
+        # no page is requested beyond the first incomplete page of the
+        # previous wave.
+        ret = list()
+        wave_size = max(1, self.max_workers)
+        with ThreadPoolExecutor(max_workers=wave_size) as executor:
+            for i in range(0, len(starts), wave_size):
+                futures = [
+                    executor.submit(self.fetch_page, gs_query, start)
+                    for start in starts[i:i + wave_size]
+                ]
+                is_last = False
+                for future in futures:
+                    articles = future.result()
+                    ret += articles
+                    if len(articles) < page_size:
+                        # Last page.
+                        is_last = True
+                        break
+                if is_last:
+                    break
+        return ret[:limit]
+
     def query(self, query: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -390,21 +585,21 @@ class GoogleScholarConnector(Connector):
         else:
             raise RuntimeError("Invalid object %r" % query.object)
 
-        # Craft the query
-        if query.limit is not None:
-            gs_query.set_num_page_results(min(query.limit, ScholarConf.MAX_PAGE_RESULTS))
-
         # Doc type.
         gs_query.set_include_citations(False)
         gs_query.set_include_patents(True)
 
-        # Send the query
-        self.querier.send_query(gs_query)
-
-        # Extract results
+        # Send the query. The OFFSET is handled by Google Scholar.
+        reshape_query = query
         if isinstance(self.querier, MinifoldScholarQuerier):
-            entries = self.querier.articles
+            offset = query.offset if query.offset else 0
+            entries = self.fetch_pages(gs_query, offset, query.limit)
+            reshape_query = query.copy()
+            reshape_query.offset = None
         else:
+            if query.limit is not None:
+                gs_query.set_num_page_results(min(query.limit, ScholarConf.MAX_PAGE_RESULTS))
+            self.querier.send_query(gs_query)
             entries = [
                 {k: v[0] for (k, v) in article.attrs.items()}
                 for article in self.querier.articles
@@ -420,5 +615,5 @@ class GoogleScholarConnector(Connector):
                     GoogleScholarConnector.sanitize_author(authors, author)
                     for author in entry["authors"]
                 ]
-        entries = self.reshape_entries(query, entries)
+        entries = self.reshape_entries(reshape_query, entries)
         return self.answer(query, entries)
@@ -4,59 +4,119 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+from itertools import islice
+from .aggregate import Count
 from .connector import Connector
 from .hash import to_hashable
 from .query import Query
 from .values_from_dict import ValuesFromDictFonctor
 
 
-def group_by_impl(functor: ValuesFromDictFonctor, entries: list) -> dict:
+def group_by_impl(functor: ValuesFromDictFonctor, entries: iter, aggregates: dict = None) -> object:
     """
     Implementation details of :func:`group_by`.
 
     Args:
         functor (ValuesFromDictFonctor): The functor allowing to extract
             the values used to form the aggregates.
-        entries (list): A list of minifold entries.
+        entries (iter): An iterable over minifold entries.
+        aggregates (dict): Maps each output attribute with an
+            :py:class:`Aggregate` instance, or ``None``.
 
     Returns:
-        A dictionary where each key identifies an aggregate and is mapped
-        to the corresponding entries.
+        If ``aggregates`` is ``None``, a dictionary where each key identifies
+        an aggregate and is mapped to the corresponding entries.
+        Otherwise, the list of entries (one per group) mapping the
+        grouping attributes and the ``aggregates`` keys to their values.
     """
-    ret = dict()
+    if aggregates is None:
+        ret = dict()
+        for entry in entries:
+            key = functor(entry)
+            if len(key) == 1:
+                (key,) = key
+            ret.setdefault(to_hashable(key), list()).append(entry)
+        return ret
+
+    # Each group is folded into constant-size accumulators in a single pass.
+    functions = list(aggregates.values())
+    groups = dict()
     for entry in entries:
-        key = functor(entry)
-        if len(key) == 1:
-            (key,) = key
-        key = to_hashable(key)
-        if key not in ret.keys():
-            ret[key] = list()
-        ret[key].append(entry)
+        values = functor(entry)
+        key = to_hashable(values)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = (values, [f.init() for f in functions])
+        accs = group[1]
+        for (i, f) in enumerate(functions):
+            accs[i] = f.update(accs[i], entry)
+
+    ret = list()
+    for (values, accs) in groups.values():
+        entry = dict(zip(functor.attributes, values))
+        for (name, f, acc) in zip(aggregates.keys(), functions, accs):
+            entry[name] = f.result(acc)
+        ret.append(entry)
     return ret
 
 
-def group_by(attributes: list, entries: list) -> dict:
+def make_group_by_functor(attributes: list) -> ValuesFromDictFonctor:
+    """
+    Crafts the functor extracting the grouping values of an entry.
+
+    Args:
+        attributes (list): The list of entry keys used to form the aggregates,
+            or a single key.
+
+    Returns:
+        The corresponding :py:class:`ValuesFromDictFonctor` instance.
+    """
+    return ValuesFromDictFonctor([attributes] if isinstance(attributes, str) else list(attributes))
+
+
+def group_by(attributes: list, entries: iter, aggregates: dict = None) -> object:
     """
     Implements the GROUP BY statement for a list of minifold entries.
 
+    Example:
+        >>> from minifold.aggregate import Count, Max
+        >>> entries = [{"a": 1, "y": 2000}, {"a": 1, "y": 2010}, {"a": 2, "y": 2005}]
+        >>> group_by("a", entries, {"n": Count(), "last": Max("y")})
+        [{'a': 1, 'n': 2, 'last': 2010}, {'a': 2, 'n': 1, 'last': 2005}]
+
     Args:
         attributes (list): The list of entry keys used to form the aggregates.
-        entries (list): A list of minifold entries.
+        entries (iter): An iterable over minifold entries.
+        aggregates (dict): Maps each output attribute with an
+            :py:class:`Aggregate` instance (e.g., :py:class:`Count`,
+            :py:class:`Max`...), or ``None``.
 
     Returns:
-        A dictionary where each key identifies an aggregate and is mapped
-        to the corresponding entries.
+        If ``aggregates`` is ``None``, a dictionary where each key identifies
+        an aggregate and is mapped to the corresponding entries.
+        Otherwise, the list of entries (one per group) mapping the
+        grouping attributes and the ``aggregates`` keys to their values.
     """
-    functor = ValuesFromDictFonctor(attributes)
-    return group_by_impl(functor, entries)
+    functor = make_group_by_functor(attributes)
+    return group_by_impl(functor, entries, aggregates)
 
 
 class GroupByConnector(Connector):
     """
     The :py:class:`GroupByConnector` class implements the GROUP BY
     statement in a minifold pipeline.
+
+    Without aggregates, the query is forwarded to the child and the result is
+    a dictionary mapping each group with its entries.
+
+    With aggregates, the child entries are streamed and folded into
+    one accumulator per group and per aggregate. The result is a list of
+    entries (one per group), so that it can be processed by the
+    other connectors (e.g., :py:class:`SortByConnector`, :py:class:`LimitConnector`).
+    In this case, the query filters are forwarded to the child, while
+    the query attributes, offset and limit apply to the groups.
     """
-    def __init__(self, attributes: list, child: Connector):
+    def __init__(self, attributes: list, child: Connector, aggregates: dict = None):
         """
         Constructor.
 
@@ -65,10 +125,13 @@ class GroupByConnector(Connector):
                 the aggregates.
             child (Connector): The child minifold :py:class:`Connector`
                 instance.
+            aggregates (dict): Maps each output attribute with an
+                :py:class:`Aggregate` instance, or ``None``.
         """
         super().__init__()
-        self.m_functor = ValuesFromDictFonctor(attributes)
+        self.m_functor = make_group_by_functor(attributes)
         self.m_child = child
+        self.m_aggregates = aggregates
 
     @property
     def child(self) -> Connector:
@@ -91,7 +154,21 @@ class GroupByConnector(Connector):
         Returns:
             The set of corresponding attributes.
         """
-        return set(self.m_functor.attributes)
+        ret = set(self.m_functor.attributes)
+        if self.m_aggregates:
+            ret |= set(self.m_aggregates.keys())
+        return ret
+
+    @property
+    def aggregates(self) -> dict:
+        """
+        Accessor to the aggregates computed by this :py:class:`GroupByConnector`.
+
+        Returns:
+            The dictionary mapping each output attribute with its
+            :py:class:`Aggregate` instance, or ``None``.
+        """
+        return self.m_aggregates
 
     def query(self, q: Query) -> list:
         """
@@ -104,14 +181,47 @@ class GroupByConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(q)
-        return self.answer(
-            q,
-            group_by_impl(
-                self.m_functor,
-                self.m_child.query(q)
+        if self.m_aggregates is None:
+            return self.answer(
+                q,
+                group_by_impl(
+                    self.m_functor,
+                    self.m_child.query(q)
+                )
             )
+
+        # Only fetch the attributes needed to compute the aggregates.
+        child_attributes = list(self.m_functor.attributes)
+        for f in self.m_aggregates.values():
+            if f.attribute is None and not isinstance(f, Count):
+                # The aggregate needs the whole entries.
+                child_attributes = list()
+                break
+            elif f.attribute is not None and f.attribute not in child_attributes:
+                child_attributes.append(f.attribute)
+        child_query = Query(
+            action=q.action,
+            object=q.object,
+            attributes=child_attributes,
+            filters=q.filters
+        )
+        entries = group_by_impl(
+            self.m_functor,
+            self.m_child.query_gen(child_query),
+            self.m_aggregates
         )
 
+        # OFFSET, LIMIT, SELECT
+        start = q.offset if q.offset else 0
+        stop = start + q.limit if q.limit is not None else None
+        entries = islice(entries, start, stop)
+        if q.attributes:
+            entries = (
+                {k: v for (k, v) in entry.items() if k in q.attributes}
+                for entry in entries
+            )
+        return self.answer(q, list(entries))
+
     def __str__(self) -> str:
         """
         Returns the string representation of this
@@ -121,4 +231,9 @@ class GroupByConnector(Connector):
             The string representation of this
             :py:class:`GroupByConnector` instance
         """
-        return "GROUP BY %s" % ", ".join(self.m_functor.attributes)
+        ret = "GROUP BY %s" % ", ".join(self.m_functor.attributes)
+        if self.m_aggregates:
+            ret += " AGGREGATE %s" % ", ".join(
+                "%s AS %s" % (f, name) for (name, f) in self.m_aggregates.items()
+            )
+        return ret
@@ -23,9 +23,16 @@ It is possible to query a specific researcher using its HAL-ID.
 import email.utils
 import json
 import operator
+import queue
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from itertools import islice
 
 from .binary_predicate import BinaryPredicate, __in__
 from .connector import Connector
+from .count import clip_count
 from .doc_type import DocType
 from .download import download
 from .log import Log
@@ -35,6 +42,12 @@ from .query import Query, ACTION_READ, SORT_ASC
 # Default HAL API queried
 HAL_API_URL = "https://api.archives-ouvertes.fr/search"
 
+# Default number of HAL results per page.
+HAL_PAGE_SIZE = 2000
+
+# HAL attribute used to partition the harvested results.
+HAL_PARTITION_ATTRIBUTE = "producedDateY_i"
+
 # Maps HAL ontology to our ontology
 # Note: this is not an exhaustive list of the attributes returned by HAL.
 HAL_ALIASES = {
@@ -94,7 +107,9 @@ class HalConnector(Connector):
         self,
         map_hal_id: dict = None,
         map_hal_name: dict = None,
-        hal_api_url: str = HAL_API_URL
+        hal_api_url: str = HAL_API_URL,
+        page_size: int = HAL_PAGE_SIZE,
+        max_workers: int = 1
     ):
         """
         Constructor.
@@ -104,6 +119,14 @@ class HalConnector(Connector):
                 researcher names to their corresponding HAL-ID.
             map_hal_name (dict): A dictionary that maps some
                 researcher names to their name in HAL.
+            hal_api_url (str): The URL of the HAL API.
+                Defaults to :py:data:`HAL_API_URL`.
+            page_size (int): The number of HAL results per page.
+                Defaults to :py:data:`HAL_PAGE_SIZE`.
+            max_workers (int): The maximal number of partitions (year ranges)
+                harvested concurrently. Partitioning is only used for queries
+                whose result order does not matter (no ``SORT BY``, ``LIMIT``
+                and ``OFFSET``). Pass ``1`` to disable partitioning.
         """
         super().__init__()
         self.m_api_url = hal_api_url
@@ -114,6 +137,8 @@ class HalConnector(Connector):
             to_canonic_fullname(hal_name): name
             for (name, hal_name) in self.m_map_hal_name.items()
         }
+        self.page_size = page_size
+        self.max_workers = max_workers
 
     def attributes(self, object: str) -> set:
         """
@@ -378,12 +403,24 @@ class HalConnector(Connector):
         """
         return [self.sanitize_entry(entry) for entry in entries]
 
-    def query_to_hal(self, q: Query) -> str:
+    def query_to_hal(
+        self,
+        q: Query,
+        rows: int = None,
+        cursor_mark: str = None,
+        fq: str = None
+    ) -> str:
         """
         Converts a minifold query to a HAL URL query.
 
         Args:
             q (Query): The minifold query.
+            rows (int): The number of requested results. Pass ``None``
+                to derive it from ``q.limit``.
+            cursor_mark (str): The Solr cursor mark of the requested page
+                (``"*"`` for the first page) if the results are fetched
+                using deep paging, ``None`` otherwise.
+            fq (str): An additional HAL filter (e.g., a partition), or ``None``.
 
         Returns:
             The corresponding HAL URL.
@@ -431,26 +468,39 @@ class HalConnector(Connector):
         # WHERE
         if q.filters:
             url_options.append("fq=%s" % HalConnector.binary_predicate_to_hal(q.filters))
+        if fq:
+            url_options.append("fq=%s" % fq)
 
         # OFFSET
-        if q.offset:
-            raise RuntimeError("%s: in query %s: OFFSET is not supported" % (self, q))
+        # Solr forbids "start" when paging with a cursor mark.
+        if q.offset and cursor_mark is None:
+            url_options.append("start=%d" % q.offset)
 
         # LIMIT
         # Hardcoded rows=2000 to guarantee that all publications are fetched.
-        url_options.append("rows=%s" % (int(q.limit) if q.limit else 2000))
+        if rows is None:
+            rows = int(q.limit) if q.limit else HAL_PAGE_SIZE
+        url_options.append("rows=%s" % rows)
 
         # SORT
         if q.sort_by:
-            url_options.append("sort=%s" % ",".join([
+            sort = ",".join([
                 "%s+%s" % (
                     attribute,
                     "asc" if sort_asc == SORT_ASC else "desc"
                 ) for attribute, sort_asc in q.sort_by.items()
-            ]))
+            ])
         else:
             # By default, sort by descending date.
-            url_options.append("sort=submittedDate_tdate+desc")
+            sort = "submittedDate_tdate+desc"
+        if cursor_mark is not None:
+            # Deep paging requires a sort on the unique key.
+            if not q.sort_by or "docid" not in q.sort_by:
+                sort += ",docid+asc"
+            url_options.append(
+                "cursorMark=%s" % urllib.parse.quote(cursor_mark, safe="")
+            )
+        url_options.append("sort=%s" % sort)
 
         # HalConnector expects JSON data.
         url_options.append("wt=%s" % self.format)
@@ -461,6 +511,214 @@ class HalConnector(Connector):
         }
         return q_hal
 
+    def fetch(self, q_hal: str) -> dict:
+        """
+        Sends a HAL query.
+
+        Args:
+            q_hal (str): The HAL URL query.
+
+        Raises:
+            RuntimeError: if HAL does not reply or replies an error.
+
+        Returns:
+            The HAL reply (parsed JSON data).
+        """
+        Log.info("--> HAL: %s" % q_hal)
+        reply = download(q_hal, timeout=(2.0, 7.0))
+        try:
+            data = reply.text
+            if self.m_format == "json":
+                data = json.loads(data)
+                if "response" not in data:  # if "response" is not found, an error has occurred
+                    from pprint import pformat
+                    raise RuntimeError("HAL error:\n%s" % pformat(data))
+            else:
+                raise RuntimeError("Format not implemented: %s" % self.m_format)
+        except Exception as e:
+            raise RuntimeError(
+                "Cannot get reply from %s (status %s)" % (
+                    self.m_api_url,
+                    e
+                )
+            )
+        return data
+
+    def query_pages(self, q: Query, num_rows: int = None, fq: str = None) -> iter:
+        """
+        Fetches the HAL results of a query page by page, using Solr deep
+        paging (``cursorMark``).
+
+        Args:
+            q (Query): The minifold query. ``q.offset`` and ``q.limit``
+                are ignored.
+            num_rows (int): The maximal number of fetched results, or ``None``
+                to fetch every matching results.
+            fq (str): An additional HAL filter (e.g., a partition), or ``None``.
+
+        Returns:
+            An iterator over the pages, each page being a list of entries.
+        """
+        cursor_mark = "*"
+        num_fetched = 0
+        while num_rows is None or num_fetched < num_rows:
+            rows = self.page_size
+            if num_rows is not None:
+                rows = min(rows, num_rows - num_fetched)
+            data = self.fetch(self.query_to_hal(q, rows, cursor_mark, fq))
+            docs = data["response"]["docs"]
+            num_fetched += len(docs)
+            if docs:
+                yield self.sanitize_entries(docs)
+            next_cursor_mark = data.get("nextCursorMark")
+            if len(docs) < rows or next_cursor_mark in (None, cursor_mark):
+                break
+            cursor_mark = next_cursor_mark
+
+    def partitions(self, q: Query) -> list:
+        """
+        Splits a HAL query into partitions (ranges of years) that can be
+        harvested independently, by faceting the results on
+        :py:data:`HAL_PARTITION_ATTRIBUTE`.
+        Consecutive years are gathered so that each partition contains
+        (if possible) at least ``self.page_size`` results.
+
+        Args:
+            q (Query): The minifold query.
+
+        Returns:
+            The list of HAL filters, one per partition. This list
+            is empty if the query fits in a single page.
+        """
+        data = self.fetch(
+            self.query_to_hal(q, rows=0) + (
+                "&facet=true&facet.field=%s&facet.limit=-1"
+                "&facet.mincount=1&facet.missing=true"
+            ) % HAL_PARTITION_ATTRIBUTE
+        )
+        if data["response"].get("numFound", 0) <= self.page_size:
+            return list()
+        counts = data["facet_counts"]["facet_fields"][HAL_PARTITION_ATTRIBUTE]
+        counts = dict(zip(counts[::2], counts[1::2]))
+
+        ret = list()
+        if counts.pop(None, 0):
+            ret.append("-%s:[*%%20TO%%20*]" % HAL_PARTITION_ATTRIBUTE)
+        years = sorted((int(year) for year in counts.keys()), reverse=True)
+        (last, num_results) = (None, 0)
+        for (i, year) in enumerate(years):
+            if last is None:
+                last = year
+            num_results += counts.get(year, counts.get(str(year), 0))
+            if num_results >= self.page_size or i == len(years) - 1:
+                ret.append(
+                    "%s:[%d%%20TO%%20%d]" % (HAL_PARTITION_ATTRIBUTE, year, last)
+                )
+                (last, num_results) = (None, 0)
+        return ret
+
+    def query_partitions(self, q: Query, partitions: list) -> iter:
+        """
+        Harvests concurrently several partitions of a HAL query.
+        The pages are yielded as soon as they arrive.
+
+        Args:
+            q (Query): The minifold query.
+            partitions (list): The HAL filters characterizing each partition,
+                e.g., obtained using :py:meth:`HalConnector.partitions`.
+
+        Returns:
+            An iterator over the pages, each page being a list of entries.
+        """
+        pages = queue.Queue()
+        stop = threading.Event()
+
+        def harvest(fq: str):
+            try:
+                for page in self.query_pages(q, fq=fq):
+                    if stop.is_set():
+                        break
+                    pages.put(page)
+                pages.put(None)
+            except Exception as e:
+                pages.put(e)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for fq in partitions:
+                executor.submit(harvest, fq)
+            num_running = len(partitions)
+            while num_running:
+                page = pages.get()
+                if page is None:
+                    num_running -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def query_gen(self, q: Query) -> iter:
+        """
+        Handles an input :py:class:`Query` instance and iterates over
+        the matching entries, as the HAL pages arrive.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        if q.action != ACTION_READ:
+            return
+        offset = q.offset if q.offset else 0
+        if q.limit is not None and q.limit <= self.page_size:
+            # The results fit in a single page.
+            if q.limit > 0:
+                data = self.fetch(self.query_to_hal(q))
+                yield from self.sanitize_entries(data["response"]["docs"])
+            return
+
+        if (
+            self.max_workers > 1
+            and not q.sort_by and q.limit is None and not offset
+        ):
+            # The order does not matter, harvest the partitions concurrently.
+            partitions = self.partitions(q)
+            if partitions:
+                for page in self.query_partitions(q, partitions):
+                    yield from page
+                return
+
+        # Deep paging. Solr cursors do not support OFFSET, so the first
+        # entries are skipped.
+        num_rows = offset + q.limit if q.limit is not None else None
+        entries = (
+            entry
+            for page in self.query_pages(q, num_rows)
+            for entry in page
+        )
+        yield from islice(entries, offset, None)
+
+    def count(self, q: Query) -> int:
+        """
+        Counts the HAL results of an input :py:class:`Query` instance.
+        A single HAL query is sent (``rows=0``), and the count is
+        retrieved from ``numFound``, so that no document is downloaded.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        q_count = copy(q)
+        q_count.offset = None
+        data = self.fetch(self.query_to_hal(q_count, rows=0))
+        return clip_count(data["response"].get("numFound", 0), q.offset, q.limit)
+
     def query(self, q: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -472,30 +730,4 @@ class HalConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(q)
-        entries = list()
-        if q.action == ACTION_READ:
-            q_hal = self.query_to_hal(q)
-            Log.info("--> HAL: %s" % q_hal)
-            reply = download(q_hal, timeout=(2.0, 7.0))
-            try:
-                data = reply.text
-                if self.m_format == "json":
-                    data = json.loads(data)
-                    try:
-                        entries = self.sanitize_entries(
-                            data["response"]["docs"]
-                        )
-                    except KeyError:  # if "response" is not found, an error has occurred
-                        from pprint import pformat
-                        raise RuntimeError("HAL error:\n%s" % pformat(data))
-                else:
-                    raise RuntimeError("Format not implemented: %s" % self.m_format)
-            except Exception as e:
-                raise RuntimeError(
-                    "Cannot get reply from %s (status %s)" % (
-                        self.m_api_url,
-                        e
-                    )
-                )
-
-        return self.answer(q, entries)
+        return self.answer(q, list(self.query_gen(q)))
@@ -32,3 +32,40 @@ def to_hashable(x: object) -> object:
         ) if isinstance(x, dict)
         else x
     )
+
+
+def to_typed_hashable(x: object) -> object:
+    """
+    Converts an object to an hashable object, tagged by its type.
+    Unlike :py:func:`to_hashable`, equal values of different types
+    (e.g., ``1``, ``1.0`` and ``True``, or a ``list`` and a ``tuple``)
+    are not confused.
+
+    Example:
+        >>> to_typed_hashable(1) == to_typed_hashable(True)
+        False
+        >>> to_typed_hashable([1, 2]) == to_typed_hashable((1, 2))
+        False
+
+    Args:
+        x (object): The input object.
+
+    Returns:
+        The corresponding hashable object.
+    """
+    return (
+        type(x),
+        frozenset(
+            (to_typed_hashable(k), to_typed_hashable(v))
+            for k, v in x.items()
+        ) if isinstance(x, dict)
+        else frozenset(
+            to_typed_hashable(elt)
+            for elt in x
+        ) if isinstance(x, (set, frozenset))
+        else tuple(
+            to_typed_hashable(elt)
+            for elt in x
+        ) if isinstance(x, (list, tuple))
+        else x
+    )
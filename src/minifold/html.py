@@ -302,3 +302,65 @@ except ImportError as e:
         "  PIP: sudo pip3 install --upgrade bs4\n"
     )
     raise e
+
+# ----------------------------------------------------------------------------------
+# Extensions depending on lxml
+# ----------------------------------------------------------------------------------
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+
+    def html_to_text_lxml(s_html: str, blacklist: set = None) -> str:
+        """
+        Converts an HTML page to text, by discarding javascript and css related
+        to the site. This function is a faster alternative to
+        :py:func:`html_to_text`, relying only on ``lxml``.
+
+        Args:
+            s_html (str): A str containing HTML.
+            blacklist (set): A set of string (lowercase) corresponding to HTML tags
+                that must be ignored.
+
+        Returns:
+            The corresponding text.
+        """
+        if blacklist is None:
+            blacklist = HTML_BLACKLIST_TAGS
+        if not s_html or not s_html.strip():
+            return ""
+        try:
+            root = lxml_html.document_fromstring(s_html)
+        except (etree.ParserError, ValueError):
+            return ""
+
+        def is_kept(element) -> bool:
+            return (
+                element is not None
+                and isinstance(element.tag, str)
+                and element.tag.lower() not in blacklist
+            )
+
+        values = list()
+        events = ("start", "end", "comment", "pi")
+        for (event, element) in etree.iterwalk(root, events=events):
+            # The text of an element precedes its children, its tail follows them.
+            # Comments and processing instructions only contribute their tail.
+            if event == "start":
+                (s, parent) = (element.text, element)
+            else:
+                (s, parent) = (element.tail, element.getparent())
+            s = s.strip() if s else None
+            if s and is_kept(parent):
+                values.append(s)
+        s = " ".join(values)
+        return re.sub(r"[\n]+", "\n\n", s)
+
+except ImportError as e:
+    from .log import Log
+    Log.warning(
+        "Please install lxml.\n"
+        "  APT: sudo apt install python3-lxml\n"
+        "  PIP: sudo pip3 install --upgrade lxml\n"
+    )
+    raise e
@@ -7,6 +7,14 @@ from html.parser import HTMLParser
 from .log import Log
 from .entries_connector import EntriesConnector
 
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Number of characters read from the input HTML file at each parsing step.
+DEFAULT_CHUNK_SIZE = 1 << 16
+
 
 class HtmlTableParser(HTMLParser):
     """
@@ -38,9 +46,35 @@ class HtmlTableParser(HTMLParser):
         self.index = 0
         self.entries = output_list
         self.entry = dict()
-        self.value = str()
+        self.values = list()  # Non-empty strings forming the current cell value.
+        self.data = list()    # Raw text fragments read since the last tag.
         self.keep_entry = keep_entry
 
+    @property
+    def value(self) -> str:
+        """
+        Retrieves the value of the cell being parsed.
+
+        Returns:
+            The concatenation of the (stripped) strings read so far in the
+            current cell.
+        """
+        return "".join(self.values)
+
+    def flush_data(self):
+        """
+        Pushes the text read since the last HTML tag to the current cell.
+
+        The text may be split across several :py:meth:`handle_data` calls,
+        e.g., when the HTML content is fed by chunks.
+        Hence it is only stripped once the next tag is reached.
+        """
+        if self.data:
+            data = "".join(self.data).strip()
+            if self.fetch_data and data:
+                self.values.append(data)
+            self.data.clear()
+
     # Inherited abstract method
     def error(self, message: str):
         """
@@ -59,6 +93,7 @@ class HtmlTableParser(HTMLParser):
             tag (str): The HTML tag. _Example:_ ``"td"``.
             attrs (str): The HTML tag attributes.
         """
+        self.flush_data()
         if tag == "td":
             # Enable fetch data
             self.fetch_data = True
@@ -70,9 +105,11 @@ class HtmlTableParser(HTMLParser):
         Args:
             tag (str): The HTML tag. _Example:_ ``"td"``.
         """
+        self.flush_data()
         if tag == "td":  # Push key/value
             # Disable fetch data
             self.fetch_data = False
+            value = self.value
 
             # Push new key/value pair
             key = (
@@ -83,14 +120,14 @@ class HtmlTableParser(HTMLParser):
                 current_value = self.entry[key]
                 if not isinstance(current_value, list):
                     self.entry[key] = [current_value]
-                if self.value:
-                    self.entry[key].append(self.value)
+                if value:
+                    self.entry[key].append(value)
             else:
-                if self.value:
-                    self.entry[key] = self.value
+                if value:
+                    self.entry[key] = value
 
             # Reset key/value pair
-            self.value = str()
+            self.values.clear()
             self.index += 1
         elif tag == "tr":
             # Push entry
@@ -108,12 +145,107 @@ class HtmlTableParser(HTMLParser):
         Args:
             data (str): The HTML data (here, stored in a table cell).
         """
-        data = data.strip()
-        if self.fetch_data and data:
-            self.value += data
+        if self.fetch_data:
+            self.data.append(data)
+
+    def handle_comment(self, data: str):
+        """
+        Callback that handles an HTML comment.
+
+        Args:
+            data (str): The content of the comment.
+        """
+        self.flush_data()
 
 
-def html_table(filename: str, columns: list, keep_entry: bool = None) -> list:
+def html_table_gen(
+    filename: str,
+    columns: list,
+    keep_entry: callable = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> iter:
+    """
+    Iterates over the rows of an HTML table stored in an input file.
+    The file is fed to the parser by chunks, so that large HTML files
+    are processed in bounded memory. Each row is yielded as soon as
+    it is parsed (and kept by ``keep_entry``).
+
+    Args:
+        filename (str): The path to the input HTML file.
+        columns (list): See :py:func:`html_table`.
+        keep_entry (callable): See :py:func:`html_table`.
+        chunk_size (int): The number of characters read at each
+            parsing step. Defaults to :py:data:`DEFAULT_CHUNK_SIZE`.
+
+    Returns:
+        A generator over the corresponding minifold entries.
+    """
+    entries = list()
+    parser = HtmlTableParser(columns, entries, keep_entry)
+    with open(filename, "r") as f:
+        while True:
+            s = f.read(chunk_size)
+            if not s:
+                break
+            parser.feed(s)
+            yield from entries
+            entries.clear()
+    parser.close()
+    yield from entries
+
+
+def html_table_gen_lxml(
+    filename: str,
+    columns: list,
+    keep_entry: callable = None
+) -> iter:
+    """
+    Iterates over the rows of an HTML table stored in an input file
+    using ``lxml``. This is faster than :py:func:`html_table_gen`
+    and each row is discarded from the ``lxml`` tree once processed,
+    so that large HTML files are processed in bounded memory.
+
+    Args:
+        filename (str): The path to the input HTML file.
+        columns (list): See :py:func:`html_table`.
+        keep_entry (callable): See :py:func:`html_table`.
+
+    Raises:
+        ImportError: if ``lxml`` is not installed.
+
+    Returns:
+        A generator over the corresponding minifold entries.
+    """
+    if etree is None:
+        raise ImportError("html_table_gen_lxml: lxml is not installed")
+    for (_, tr) in etree.iterparse(filename, events=("end",), tag="tr", html=True):
+        entry = dict()
+        for (index, td) in enumerate(tr.iter("td")):
+            key = columns[index] if index < len(columns) else columns[-1]
+            value = "".join(s.strip() for s in td.itertext())
+            if key in entry.keys():
+                if not isinstance(entry[key], list):
+                    entry[key] = [entry[key]]
+                if value:
+                    entry[key].append(value)
+            elif value:
+                entry[key] = value
+
+        # Release the rows processed so far.
+        tr.clear()
+        while tr.getprevious() is not None:
+            del tr.getparent()[0]
+
+        if keep_entry is None or keep_entry(entry):
+            yield entry
+
+
+def html_table(
+    filename: str,
+    columns: list,
+    keep_entry: bool = None,
+    use_lxml: bool = False
+) -> list:
     """
     Loads an HTML table from an input file
 
@@ -130,16 +262,19 @@ def html_table(filename: str, columns: list, keep_entry: bool = None) -> list:
             must entry must be kept or discarded. Pass ``None``
             to filter nothing. This is the opportunity to
             discard a header or irrelevant rows.
+        use_lxml (bool): Pass ``True`` to parse the file using ``lxml``
+            (see :py:func:`html_table_gen_lxml`). If ``lxml`` is not installed,
+            the standard parser is used. Defaults to ``False``.
 
     Returns:
         The corresponding list of minifold entries.
     """
-    entries = list()
-    parser = HtmlTableParser(columns, entries, keep_entry)
-    with open(filename, "r") as f:
-        s = f.read()
-        parser.feed(s)
-    return entries
+    if use_lxml and etree is None:
+        Log.warning("html_table: lxml is not installed, using html.parser")
+        use_lxml = False
+    if use_lxml:
+        return list(html_table_gen_lxml(filename, columns, keep_entry))
+    return list(html_table_gen(filename, columns, keep_entry))
 
 
 class HtmlTableConnector(EntriesConnector):
@@ -147,7 +282,13 @@ class HtmlTableConnector(EntriesConnector):
     The :py:class:`HtmlTableConnector` class is a minifold gateway allowing
     to fetch data stored in an HTML table.
     """
-    def __init__(self, filename: str, columns: list, keep_entry: callable = None):
+    def __init__(
+        self,
+        filename: str,
+        columns: list,
+        keep_entry: callable = None,
+        use_lxml: bool = False
+    ):
         """
         Constructor.
 
@@ -164,13 +305,11 @@ class HtmlTableConnector(EntriesConnector):
                 must entry must be kept or discard. Pass None
                 to filter nothing. This is the opportunity to
                 discard a header or irrelevant row.
+            use_lxml (bool): Pass ``True`` to parse the file using ``lxml``.
+                See :py:func:`html_table`. Defaults to ``False``.
         """
-        super().__init__(list())
-        self.m_parser = HtmlTableParser(columns, self.m_entries, keep_entry)
-        with open(filename, "r") as f:
-            s = f.read()
-            self.m_parser.feed(s)
-        super().__init__(self.m_entries)
+        self.m_columns = columns
+        super().__init__(html_table(filename, columns, keep_entry, use_lxml))
 
     def attributes(self, object: str = None) -> set:
         """
@@ -185,4 +324,4 @@ class HtmlTableConnector(EntriesConnector):
         Returns:
             The set of corresponding attributes.
         """
-        return set(self.m_parser.columns)
+        return set(self.m_columns)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+"""
+HyperLogLog sketches, used to approximate the number of distinct values
+of a (possibly huge) stream of values in constant memory.
+
+See also: P. Flajolet, É. Fusy, O. Gandouet, F. Meunier,
+"HyperLogLog: the analysis of a near-optimal cardinality estimation algorithm", 2007.
+"""
+
+import hashlib
+import math
+from .hash import to_hashable
+
+# Bounds of the precision (number of bits used to index the registers).
+HLL_MIN_PRECISION = 4
+HLL_MAX_PRECISION = 18
+
+# Default relative standard error of the sketches.
+DEFAULT_HLL_ERROR = 0.01
+
+
+def error_to_precision(error: float) -> int:
+    """
+    Computes the precision of a HyperLogLog sketch achieving
+    a given relative standard error.
+
+    Example:
+        >>> error_to_precision(0.01)
+        14
+
+    Args:
+        error (float): The relative standard error, in ``]0, 1[``.
+
+    Returns:
+        The corresponding precision.
+    """
+    if not 0 < error < 1:
+        raise ValueError("Invalid error %s, it must be in ]0, 1[" % error)
+    p = math.ceil(math.log2((1.04 / error) ** 2))
+    return min(max(p, HLL_MIN_PRECISION), HLL_MAX_PRECISION)
+
+
+def hash64(x: object) -> int:
+    """
+    Hashes a value on 64 bits. Unlike ``hash``, the hash of a
+    string does not depend on the process, so that the sketches
+    built in different processes can be merged.
+    The hashed bytes are prefixed by a type tag, so that a string
+    and its ``repr`` (e.g., ``"1"`` and ``1``) are not confused.
+
+    Example:
+        >>> hash64(1) == hash64("1")
+        False
+
+    Args:
+        x (object): The hashed value.
+
+    Returns:
+        The corresponding hash.
+    """
+    data = (
+        b"s" + x.encode("utf-8") if isinstance(x, str)
+        else b"r" + repr(to_hashable(x)).encode("utf-8")
+    )
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """
+    The :py:class:`HyperLogLog` class is a sketch estimating the
+    number of distinct values added to it.
+
+    Example:
+        >>> hll = HyperLogLog(error=0.05)
+        >>> for i in range(1000):
+        ...     hll.add(i % 100)
+        >>> abs(len(hll) - 100) <= 10
+        True
+    """
+    def __init__(self, error: float = DEFAULT_HLL_ERROR, precision: int = None):
+        """
+        Constructor.
+
+        Args:
+            error (float): The relative standard error of the estimation.
+            precision (int): The number of bits used to index the registers.
+                If set, ``error`` is ignored. The memory footprint of
+                the sketch is ``2 ** precision`` bytes.
+        """
+        if precision is None:
+            precision = error_to_precision(error)
+        if not HLL_MIN_PRECISION <= precision <= HLL_MAX_PRECISION:
+            raise ValueError("Invalid precision %s" % precision)
+        self.m_precision = precision
+        self.m_registers = bytearray(1 << precision)
+
+    @property
+    def precision(self) -> int:
+        return self.m_precision
+
+    @property
+    def error(self) -> float:
+        """
+        Retrieves the relative standard error of this sketch.
+
+        Returns:
+            The relative standard error.
+        """
+        return 1.04 / math.sqrt(len(self.m_registers))
+
+    def add(self, x: object):
+        """
+        Adds a value to this sketch.
+
+        Args:
+            x (object): The added value.
+        """
+        h = hash64(x)
+        p = self.m_precision
+        i = h >> (64 - p)
+        w = h & ((1 << (64 - p)) - 1)
+        # Position of the leftmost 1-bit among the 64 - p remaining bits.
+        rank = (64 - p) - w.bit_length() + 1
+        if rank > self.m_registers[i]:
+            self.m_registers[i] = rank
+
+    def update(self, values: iter):
+        """
+        Adds several values to this sketch.
+
+        Args:
+            values (iter): The added values.
+        """
+        for x in values:
+            self.add(x)
+
+    def merge(self, other):
+        """
+        Merges another sketch into this sketch. The resulting sketch
+        estimates the number of distinct values of the union.
+
+        Args:
+            other (HyperLogLog): A sketch having the same precision.
+
+        Raises:
+            ValueError: if the sketches have different precisions.
+        """
+        if other.m_precision != self.m_precision:
+            raise ValueError(
+                "Cannot merge sketches of precisions %s and %s" % (
+                    self.m_precision, other.m_precision
+                )
+            )
+        self.m_registers = bytearray(map(max, self.m_registers, other.m_registers))
+
+    def __or__(self, other):
+        """
+        Builds the sketch corresponding to the union of two sketches.
+
+        Args:
+            other (HyperLogLog): A sketch having the same precision.
+
+        Returns:
+            The merged sketch.
+        """
+        ret = HyperLogLog(precision=self.m_precision)
+        ret.m_registers = bytearray(self.m_registers)
+        ret.merge(other)
+        return ret
+
+    def estimate(self) -> float:
+        """
+        Estimates the number of distinct values added to this sketch.
+
+        Returns:
+            The estimated number of distinct values.
+        """
+        m = len(self.m_registers)
+        alpha = (
+            0.673 if m == 16 else
+            0.697 if m == 32 else
+            0.709 if m == 64 else
+            0.7213 / (1 + 1.079 / m)
+        )
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.m_registers)
+        if estimate <= 2.5 * m:
+            # Small range correction (linear counting).
+            num_zeros = self.m_registers.count(0)
+            if num_zeros:
+                estimate = m * math.log(m / num_zeros)
+        return estimate
+
+    def __len__(self) -> int:
+        return round(self.estimate())
@@ -4,15 +4,135 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+import dis
+import operator
+import pickle
+import threading
+import types
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from copy import deepcopy
+from itertools import chain, repeat
+from .binary_predicate import BinaryPredicate
 from .connector import Connector
+from .hash import to_typed_hashable
+from .log import Log
 from .query import Query
 
+# Dependencies inferred for each function (see find_lambda_dependencies).
+# Entries are dropped as soon as the corresponding function is garbage collected.
+LAMBDA_DEPENDENCIES_CACHE = weakref.WeakKeyDictionary()
 
-def find_lambda_dependencies(func: callable) -> set:
+# Default maximal number of results memoized per function (see MemoizedLambda).
+DEFAULT_LAMBDAS_MEMOIZE_SIZE = 10000
+
+# Default number of entries sent at once to a worker (see parallel_lambdas).
+DEFAULT_LAMBDAS_CHUNK_SIZE = 1000
+
+# Placeholder of the missing dependencies in the keys of a MemoizedLambda cache.
+MISSING_VALUE = object()
+
+# Opcodes loading a local variable on the stack (they vary across Python versions).
+LOAD_FAST_OPNAMES = {"LOAD_FAST", "LOAD_FAST_CHECK", "LOAD_FAST_BORROW"}
+
+
+def is_subscript(instruction: dis.Instruction) -> bool:
+    """
+    Tests whether a bytecode instruction implements ``x[y]``.
+
+    Args:
+        instruction (dis.Instruction): A bytecode instruction.
+
+    Returns:
+        ``True`` iff ``instruction`` is a subscript.
+    """
+    return (
+        instruction.opname == "BINARY_SUBSCR"
+        or (instruction.opname == "BINARY_OP" and instruction.argrepr == "[]")
+    )
+
+
+def get_accessed_key(instructions: list, i: int) -> str:
+    """
+    Retrieves the key accessed right after loading the processed entry,
+    assuming the access is of the form ``entry["key"]`` or ``entry.get("key", ...)``.
+
+    Args:
+        instructions (list): The bytecode instructions of a function.
+        i (int): The index of the instruction loading the entry.
+
+    Returns:
+        The accessed key if any, ``None`` otherwise.
+    """
+    following = instructions[i + 1:i + 3]
+    if len(following) < 2:
+        return None
+    (a, b) = following
+    if a.opname == "LOAD_CONST" and isinstance(a.argval, str) and is_subscript(b):
+        return a.argval
+    if (
+        a.opname in ("LOAD_METHOD", "LOAD_ATTR") and a.argval == "get"
+        and b.opname == "LOAD_CONST" and isinstance(b.argval, str)
+    ):
+        return b.argval
+    return None
+
+
+def find_lambda_dependencies_static(func: callable) -> set:
     """
     Infers the keys needed by a function processing a dictionary
-    to not trigger :py:class:`KeyError` exception.
+    by inspecting its bytecode. Unlike :py:func:`find_lambda_dependencies_probe`,
+    the function is never called.
+
+    The inference only succeeds if every use of the processed dictionary
+    is of the form ``entry["key"]`` or ``entry.get("key", ...)``, where
+    ``"key"`` is a string literal.
+
+    Example:
+        >>> sorted(find_lambda_dependencies_static(lambda e: e["a"] + e.get("b", 0)))
+        ['a', 'b']
+        >>> find_lambda_dependencies_static(lambda e: len(e)) is None
+        True
+
+    Args:
+        func (callable): A function taking a dictionary in parameter.
+
+    Returns:
+        The keys needed by ``func`` if they can be inferred, ``None`` otherwise.
+    """
+    if not isinstance(func, types.FunctionType):
+        return None
+    code = func.__code__
+    if code.co_argcount < 1:
+        return None
+    param = code.co_varnames[0]
+    if param in code.co_cellvars:
+        # The dictionary is captured by a nested function.
+        return None
+    instructions = list(dis.get_instructions(code))
+    ret = set()
+    for (i, instruction) in enumerate(instructions):
+        if instruction.opcode not in dis.haslocal:
+            continue
+        names = instruction.argval if isinstance(instruction.argval, tuple) else (instruction.argval,)
+        if param not in names:
+            continue
+        key = (
+            get_accessed_key(instructions, i) if instruction.opname in LOAD_FAST_OPNAMES
+            else None
+        )
+        if key is None:
+            return None
+        ret.add(key)
+    return ret
+
+
+def find_lambda_dependencies_probe(func: callable) -> set:
+    """
+    Infers the keys needed by a function processing a dictionary
+    by calling it on a dictionary, initially empty, until it
+    no more raises :py:class:`KeyError`.
 
     Args:
         func (callable): A function taking a dictionary in parameter.
@@ -25,7 +145,10 @@ def find_lambda_dependencies(func: callable) -> set:
         try:
             _ = func(entry)
         except KeyError as e:
-            needed_key = e.args[0]
+            needed_key = e.args[0] if e.args else None
+            if needed_key in entry:
+                # The KeyError does not come from entry.
+                break
             entry[needed_key] = None
             continue
         except Exception:
@@ -34,6 +157,97 @@ def find_lambda_dependencies(func: callable) -> set:
     return set(entry.keys())
 
 
+def find_lambda_dependencies(func: callable) -> set:
+    """
+    Infers the keys needed by a function processing a dictionary
+    to not trigger :py:class:`KeyError` exception.
+
+    The bytecode of ``func`` is inspected (see :py:func:`find_lambda_dependencies_static`).
+    If it is not conclusive, ``func`` is probed
+    (see :py:func:`find_lambda_dependencies_probe`).
+    The result is cached as long as ``func`` is alive.
+
+    Args:
+        func (callable): A function taking a dictionary in parameter.
+
+    Returns:
+        The keys needed by ``func`` to process a dictionary.
+    """
+    try:
+        return set(LAMBDA_DEPENDENCIES_CACHE[func])
+    except (KeyError, TypeError):
+        pass
+    ret = find_lambda_dependencies_static(func)
+    if ret is None:
+        ret = find_lambda_dependencies_probe(func)
+    try:
+        LAMBDA_DEPENDENCIES_CACHE[func] = frozenset(ret)
+    except TypeError:
+        # func cannot be weakly referenced.
+        pass
+    return ret
+
+
+def find_filters_dependencies(filters: object) -> set:
+    """
+    Infers the keys needed to evaluate a minifold filter.
+
+    Example:
+        >>> p = BinaryPredicate(BinaryPredicate("a", "==", 1), "||", lambda e: e["b"])
+        >>> sorted(find_filters_dependencies(p))
+        ['a', 'b']
+
+    Args:
+        filters (object): A minifold filter, i.e., ``None``, a
+            :py:class:`BinaryPredicate` instance or a function taking a dictionary
+            in parameter (see :py:func:`find_lambda_dependencies`).
+
+    Returns:
+        The keys needed by ``filters``.
+    """
+    if filters is None:
+        return set()
+    if isinstance(filters, BinaryPredicate):
+        if filters.operator in [operator.__or__, operator.__and__, operator.__xor__]:
+            return (
+                find_filters_dependencies(filters.left)
+                | find_filters_dependencies(filters.right)
+            )
+        return {filters.left}
+    return find_lambda_dependencies(filters)
+
+
+def find_filters_dependencies_static(filters: object) -> set:
+    """
+    Infers the keys needed to evaluate a minifold filter, without
+    probing its functions (see :py:func:`find_lambda_dependencies_static`).
+
+    Example:
+        >>> p = BinaryPredicate(BinaryPredicate("a", "==", 1), "||", lambda e: e["b"])
+        >>> sorted(find_filters_dependencies_static(p))
+        ['a', 'b']
+        >>> find_filters_dependencies_static(lambda e: len(e)) is None
+        True
+
+    Args:
+        filters (object): A minifold filter, i.e., ``None``, a
+            :py:class:`BinaryPredicate` instance or a function taking a dictionary
+            in parameter.
+
+    Returns:
+        The keys needed by ``filters``, or ``None`` if they cannot be inferred.
+    """
+    if filters is None:
+        return set()
+    if isinstance(filters, BinaryPredicate):
+        if filters.operator in [operator.__or__, operator.__and__, operator.__xor__]:
+            left = find_filters_dependencies_static(filters.left)
+            right = find_filters_dependencies_static(filters.right)
+            return left | right if left is not None and right is not None else None
+        return {filters.left}
+    return find_lambda_dependencies_static(filters)
+
+
 def find_lambdas_dependencies(map_lambdas: dict) -> dict:
     """
     Infers the keys needed by several functions that outputs a specific
@@ -55,6 +269,134 @@ def find_lambdas_dependencies(map_lambdas: dict) -> dict:
     }
 
 
+class MemoizedLambda:
+    """
+    The :py:class:`MemoizedLambda` class wraps a function processing an entry,
+    so that its results are cached according to the values of its dependencies.
+    This is useful for expensive derived attributes whose inputs are repeated
+    across the entries.
+
+    The dependencies must cover every key read by the function, otherwise
+    a stale result may be returned. The cached results are shared by the
+    entries having the same dependency values (compared with their type,
+    so that, e.g., ``1`` and ``True`` are not confused). If the dependencies
+    are unknown, the results are cached according to the whole entry.
+
+    Example:
+        >>> f = MemoizedLambda(lambda e: e["a"] ** 2)
+        >>> [f({"a": a}) for a in [1, 2, 1, 1]]
+        [1, 4, 1, 1]
+        >>> (f.hits, f.misses)
+        (2, 2)
+    """
+    def __init__(
+        self,
+        func: callable,
+        dependencies: set = None,
+        max_size: int = DEFAULT_LAMBDAS_MEMOIZE_SIZE
+    ):
+        """
+        Constructor.
+
+        Args:
+            func (callable): A function taking a dictionary in parameter.
+            dependencies (set): The keys needed by ``func``. If ``None``,
+                they are inferred using :py:func:`find_lambda_dependencies_static`.
+                Probing cannot detect every use of the entry, so if the bytecode
+                analysis is not conclusive, the whole entry is used.
+            max_size (int): The maximal number of cached results. When reached,
+                the least recently used result is evicted. Pass ``None``
+                for an unbounded cache.
+        """
+        self.m_func = func
+        if dependencies is None:
+            dependencies = find_lambda_dependencies_static(func)
+        self.m_dependencies = sorted(dependencies) if dependencies is not None else None
+        self.m_max_size = max_size
+        self.m_cache = OrderedDict()
+        self.m_lock = threading.Lock()
+        self.m_hits = 0
+        self.m_misses = 0
+
+    @property
+    def func(self) -> callable:
+        """
+        Retrieves the wrapped function.
+
+        Returns:
+            The wrapped function.
+        """
+        return self.m_func
+
+    @property
+    def hits(self) -> int:
+        """
+        Retrieves the number of results served from the cache.
+
+        Returns:
+            The number of cache hits.
+        """
+        return self.m_hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Retrieves the number of results computed by the wrapped function.
+
+        Returns:
+            The number of cache misses.
+        """
+        return self.m_misses
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self.m_lock:
+            self.m_cache.clear()
+
+    def __getstate__(self) -> dict:
+        # The cache and the lock are not shipped to the worker processes.
+        state = self.__dict__.copy()
+        del state["m_cache"]
+        del state["m_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.m_cache = OrderedDict()
+        self.m_lock = threading.Lock()
+
+    def __call__(self, entry: dict) -> object:
+        """
+        Applies the wrapped function to an entry, or retrieves
+        the corresponding cached result.
+
+        Args:
+            entry (dict): The processed entry.
+
+        Returns:
+            The result of the wrapped function.
+        """
+        # The dependencies may be optional (e.g., entry.get("key")).
+        key = to_typed_hashable(
+            entry if self.m_dependencies is None
+            else [entry.get(k, MISSING_VALUE) for k in self.m_dependencies]
+        )
+        with self.m_lock:
+            if key in self.m_cache:
+                self.m_cache.move_to_end(key)
+                self.m_hits += 1
+                return self.m_cache[key]
+        ret = self.m_func(entry)
+        with self.m_lock:
+            self.m_misses += 1
+            self.m_cache[key] = ret
+            if self.m_max_size is not None and len(self.m_cache) > self.m_max_size:
+                self.m_cache.popitem(last=False)
+        return ret
+
+
 def lambdas(map_lambdas: dict, entries: list, attributes: set = None) -> list:
     """
     Be sure that the result is deterministic without regards each
@@ -68,6 +410,30 @@ def lambdas(map_lambdas: dict, entries: list, attributes: set = None) -> list:
         ...     "y": lambda e: 10 + e["y"]
         ... } # not OK because e["y"] is ambiguous.
     """
+    for _ in lambdas_gen(map_lambdas, entries, attributes):
+        pass
+    return entries
+
+
+def lambdas_gen(map_lambdas: dict, entries: iter, attributes: set = None) -> iter:
+    """
+    Iterates over minifold entries and computes their lambda attributes
+    on-the-fly (see :py:func:`lambdas`).
+
+    Example:
+        >>> list(lambdas_gen({"y": lambda e: 2 * e["x"]}, iter([{"x": 1}, {"x": 2}])))
+        [{'x': 1, 'y': 2}, {'x': 2, 'y': 4}]
+
+    Args:
+        map_lambdas (dict): A dictionary that maps each computed
+            attribute with a function processing an input entry.
+        entries (iter): The minifold entries, updated in place.
+        attributes (set): The attributes of interest, or ``None``
+            to compute every attribute of ``map_lambdas``.
+
+    Returns:
+        An iterator over the updated entries.
+    """
     attrs = set(map_lambdas.keys())
     if attributes:
         attrs &= set(attributes)
@@ -78,6 +444,124 @@ def lambdas(map_lambdas: dict, entries: list, attributes: set = None) -> list:
                     entry[attr] = func(entry)
                 except KeyError:
                     entry[attr] = None
+        yield entry
+
+
+def apply_lambdas_chunk(map_lambdas: dict, entries: list) -> list:
+    """
+    Applies the :py:func:`lambdas` function to a chunk of entries.
+    This is the task run by the workers of :py:func:`parallel_lambdas`.
+
+    Args:
+        map_lambdas (dict): A dictionary that maps key
+            (existing or new) key attributes with a function
+            processing an input entry.
+        entries (list): The processed entries.
+
+    Returns:
+        For each input entry, the dictionary of the computed attributes.
+    """
+    lambdas(map_lambdas, entries)
+    return [
+        {attr: entry[attr] for attr in map_lambdas.keys()}
+        for entry in entries
+    ]
+
+
+def parallel_lambdas(
+    map_lambdas: dict,
+    entries: list,
+    attributes: set = None,
+    map_dependencies: dict = None,
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_LAMBDAS_CHUNK_SIZE,
+    use_processes: bool = True
+) -> list:
+    """
+    Parallel version of the :py:func:`lambdas` function, for CPU-bound functions.
+    The entries are split into chunks processed by a pool of workers. If the keys
+    needed by the functions are known (i.e., given by ``map_dependencies`` or
+    inferred by :py:func:`find_lambda_dependencies_static`), each entry is restricted
+    to these keys before being sent to a worker. The computed attributes are merged
+    back into the input entries.
+
+    If the functions cannot be pickled (e.g., ``lambda`` functions), the chunks
+    are processed by a pool of threads instead of a pool of processes.
+
+    Example:
+        >>> from operator import itemgetter
+        >>> parallel_lambdas({"b": itemgetter("a")}, [{"a": 1}, {"a": 2}], max_workers=2)
+        [{'a': 1, 'b': 1}, {'a': 2, 'b': 2}]
+
+    Args:
+        map_lambdas (dict): A dictionary that maps key
+            (existing or new) key attributes with a function
+            processing an input entry.
+        entries (list): The processed entries.
+        attributes (set): The attributes to be computed. If ``None``,
+            every function of ``map_lambdas`` is applied.
+        map_dependencies (dict): A dictionary that maps each key of
+            ``map_lambdas`` with the keys needed by the corresponding function.
+            It must be exhaustive, as the other keys are not sent to the workers.
+            If ``None``, it is inferred from the bytecode of the functions, and the
+            whole entries are sent if it cannot be inferred.
+        max_workers (int): The number of workers. If ``None``, it is chosen
+            by the executor. If lower or equal to ``1``, the entries are processed
+            serially by the current thread.
+        chunk_size (int): The number of entries sent at once to a worker.
+        use_processes (bool): Pass ``True`` to use a pool of processes if possible,
+            ``False`` to use a pool of threads.
+
+    Returns:
+        The processed entries.
+    """
+    if max_workers is not None and max_workers <= 1:
+        return lambdas(map_lambdas, entries, attributes)
+    entries = entries if isinstance(entries, list) else list(entries)
+    map_applied = {
+        attr: func
+        for (attr, func) in map_lambdas.items()
+        if not attributes or attr in attributes
+    }
+    if not map_applied or not entries:
+        return entries
+    if map_dependencies is None:
+        map_dependencies = dict()
+    needed_attributes = set()
+    for (attr, func) in map_applied.items():
+        dependencies = map_dependencies.get(attr)
+        if dependencies is None:
+            # Probing cannot detect every use of the entry (e.g., entry.get(...)
+            # or len(entry)), so only the bytecode analysis is trusted here.
+            dependencies = find_lambda_dependencies_static(
+                func.func if isinstance(func, MemoizedLambda) else func
+            )
+        if dependencies is None:
+            # The entries are sent as is.
+            needed_attributes = None
+            break
+        needed_attributes |= set(dependencies)
+
+    executor_class = ThreadPoolExecutor
+    if use_processes:
+        try:
+            pickle.dumps(map_applied)
+            executor_class = ProcessPoolExecutor
+        except Exception as e:
+            Log.info("parallel_lambdas: Cannot pickle the functions (%s), using threads" % e)
+
+    chunks = (
+        [
+            {k: entry[k] for k in needed_attributes if k in entry}
+            for entry in entries[i:i + chunk_size]
+        ] if needed_attributes is not None
+        else [dict(entry) for entry in entries[i:i + chunk_size]]
+        for i in range(0, len(entries), chunk_size)
+    )
+    with executor_class(max_workers=max_workers) as executor:
+        results = executor.map(apply_lambdas_chunk, repeat(map_applied), chunks)
+        for (entry, values) in zip(entries, chain.from_iterable(results)):
+            entry.update(values)
     return entries
 
 
@@ -87,7 +571,17 @@ class LambdasConnector(Connector):
     in the middle of a minifold pipeline. It allows to craft or reshape a flow
     of minifold entries on-the-fly.
     """
-    def __init__(self, map_lambdas: dict, child: Connector, map_dependencies: dict = None):
+    def __init__(
+        self,
+        map_lambdas: dict,
+        child: Connector,
+        map_dependencies: dict = None,
+        memoize: object = False,
+        memoize_size: int = DEFAULT_LAMBDAS_MEMOIZE_SIZE,
+        max_workers: int = 1,
+        chunk_size: int = DEFAULT_LAMBDAS_CHUNK_SIZE,
+        use_processes: bool = True
+    ):
         """
         Constructor.
 
@@ -97,17 +591,56 @@ class LambdasConnector(Connector):
                 processing an input entry.
             child (Connector): The child minifold :py:class:`Connector`
                 instance.
+            map_dependencies (dict): A dictionary that maps each key of
+                ``map_lambdas`` with the keys needed by the corresponding function.
+                If ``None``, it is inferred using :py:func:`find_lambdas_dependencies`.
+            memoize (object): ``True`` to memoize every function of ``map_lambdas``,
+                or the collection of attributes whose function must be memoized
+                (see :py:class:`MemoizedLambda`).
+            memoize_size (int): The maximal number of results memoized per function.
+                When the functions run in worker processes, each worker
+                memoizes its own chunk.
+            max_workers (int): The number of workers computing the attributes.
+                If greater than ``1``, see :py:func:`parallel_lambdas`.
+            chunk_size (int): The number of entries sent at once to a worker.
+            use_processes (bool): Pass ``True`` to use a pool of processes if possible,
+                ``False`` to use a pool of threads.
         """
         # Ensure there is no cyclic dependency (see lambdas())
         super().__init__()
         self.m_child = child
-        self.m_map_lambdas = map_lambdas
+
+        # The workers and the memoized functions only trust the dependencies
+        # given by the user (see parallel_lambdas and MemoizedLambda).
+        self.m_given_dependencies = map_dependencies
 
         # If no attribute dependency is provided, use find_lambda_dependencies heuristic.
         self.m_map_dependencies = map_dependencies \
             if map_dependencies is not None \
             else find_lambdas_dependencies(map_lambdas)
 
+        memoized_attributes = (
+            set(map_lambdas.keys()) if memoize is True
+            else set(memoize) if memoize
+            else set()
+        )
+        self.m_map_lambdas = {
+            attr: (
+                MemoizedLambda(
+                    func,
+                    # The probed dependencies are not trusted (see MemoizedLambda).
+                    self.m_given_dependencies.get(attr)
+                    if self.m_given_dependencies is not None else None,
+                    memoize_size
+                ) if attr in memoized_attributes
+                else func
+            )
+            for (attr, func) in map_lambdas.items()
+        }
+        self.m_max_workers = max_workers
+        self.m_chunk_size = chunk_size
+        self.m_use_processes = use_processes
+
     @property
     def child(self) -> Connector:
         """
@@ -147,23 +680,21 @@ class LambdasConnector(Connector):
             ret |= needed_attributes
         return ret
 
-    def query(self, q: Query) -> list:
+    def child_query(self, q: Query) -> Query:
         """
-        Handles an input :py:class:`Query` instance.
+        Builds the :py:class:`Query` instance forwarded to the child.
 
         Args:
-            query (Query): The handled query.
+            q (Query): The handled query.
 
         Returns:
-            The list of entries matching the input query.
+            The query forwarded to the child.
         """
-
-        super().query(q)
         q_child = deepcopy(q)
 
         if q.attributes or q.filters:
             where_attributes = self.find_needed_attributes(
-                find_lambda_dependencies(q.filters)
+                find_filters_dependencies(q.filters)
             )
 
             if q.attributes:
@@ -187,14 +718,53 @@ class LambdasConnector(Connector):
                 # As a sequel, the child node may return entries that could be filtered
                 # thanks to the self.reshape_entries method.
                 q_child.filters = None
+        return q_child
 
-        entries = self.reshape_entries(
-            q,
-            lambdas(
+    def query_gen(self, q: Query) -> iter:
+        """
+        Iterates over the entries matching an input :py:class:`Query` instance.
+        The lambda attributes are computed on-the-fly, unless several workers
+        are used (see :py:func:`parallel_lambdas`).
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        if self.m_max_workers > 1:
+            return super().query_gen(q)
+        entries = lambdas_gen(
+            self.m_map_lambdas,
+            self.m_child.query_gen(self.child_query(q)),
+            q.attributes
+        )
+        return self.reshape_entries_gen(q, entries)
+
+    def query(self, q: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query.
+        """
+
+        super().query(q)
+        if self.m_max_workers > 1:
+            entries = parallel_lambdas(
                 self.m_map_lambdas,
-                self.child.query(q_child),
-                q.attributes
+                self.child.query(self.child_query(q)),
+                q.attributes,
+                self.m_given_dependencies,
+                max_workers=self.m_max_workers,
+                chunk_size=self.m_chunk_size,
+                use_processes=self.m_use_processes
             )
-        )
+            entries = self.reshape_entries(q, entries)
+        else:
+            entries = list(self.query_gen(q))
 
         return self.answer(q, entries)
@@ -17,11 +17,106 @@ except ImportError as e:
     raise e
 
 import operator
+import queue
+import threading
+from contextlib import contextmanager
+from itertools import islice
 from .connector import Connector
 from .query import Query, ACTION_READ
 from .binary_predicate import BinaryPredicate
 from .log import Log
 
+# Default number of entries per page in LDAP paged searches (RFC 2696).
+DEFAULT_LDAP_PAGE_SIZE = 500
+
+
+class LdapConnectionPool:
+    """
+    The :py:class:`LdapConnectionPool` class is a (small) pool of bound
+    LDAP connections, so that concurrent queries do not share
+    the same :py:class:`ldap3.Connection`.
+    """
+    def __init__(self, connect: callable, size: int = 1):
+        """
+        Constructor.
+
+        Args:
+            connect (callable): A function returning a new bound
+                :py:class:`ldap3.Connection`.
+            size (int): The maximal number of connections.
+        """
+        assert size > 0
+        self.m_connect = connect
+        self.m_size = size
+        self.m_connections = list()
+        self.m_idle = queue.LifoQueue()
+        self.m_lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """
+        Retrieves the maximal number of connections of this pool.
+
+        Returns:
+            The maximal number of connections.
+        """
+        return self.m_size
+
+    def acquire(self) -> Connection:
+        """
+        Retrieves an idle connection. A new connection is established
+        if none is idle and if the pool is not full. Otherwise, this
+        method blocks until a connection is released.
+
+        Returns:
+            The acquired connection.
+        """
+        try:
+            return self.m_idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.m_lock:
+            is_full = len(self.m_connections) >= self.m_size
+            if not is_full:
+                connection = self.m_connect()
+                self.m_connections.append(connection)
+        return self.m_idle.get() if is_full else connection
+
+    def release(self, connection: Connection):
+        """
+        Gives back a connection to this pool.
+
+        Args:
+            connection (Connection): A connection obtained using
+                :py:meth:`LdapConnectionPool.acquire`.
+        """
+        self.m_idle.put(connection)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager acquiring (and then releasing) a connection.
+
+        Example:
+            >>> with pool.connection() as connection:  # doctest: +SKIP
+            ...     connection.search(...)
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """
+        Unbinds every connection of this pool.
+        """
+        with self.m_lock:
+            for connection in self.m_connections:
+                connection.unbind()
+            self.m_connections.clear()
+            self.m_idle = queue.LifoQueue()
+
 
 class LdapConnector(Connector):
     def __init__(
@@ -29,7 +124,9 @@ class LdapConnector(Connector):
         ldap_host: str,
         ldap_user: str = None,
         ldap_password: str = None,
-        ldap_use_ssl: bool = None
+        ldap_use_ssl: bool = None,
+        page_size: int = DEFAULT_LDAP_PAGE_SIZE,
+        pool_size: int = 1
     ):
         """
         Constructor.
@@ -40,16 +137,47 @@ class LdapConnector(Connector):
             ldap_password (str): The LDAP password of ``ldap_user``.
             ldap_use_ssl (bool): Pass ``True`` if the connection to the server must
                 be established using SSL, ``False`` or ``None`` otherwise.
+            page_size (int): The number of entries per page of the
+                LDAP paged searches. Defaults to :py:data:`DEFAULT_LDAP_PAGE_SIZE`.
+            pool_size (int): The maximal number of LDAP connections used
+                to handle concurrent queries. Defaults to ``1``.
         """
         super().__init__()
         self.m_server = Server(ldap_host, use_ssl=ldap_use_ssl, get_info=ALL)
-        self.m_connection = Connection(self.m_server, ldap_user, ldap_password)
-        self.m_connection.bind()
+        self.m_user = ldap_user
+        self.m_password = ldap_password
+        self.m_page_size = page_size
+        self.m_attributes = None
+        self.m_pool = LdapConnectionPool(self.connect, pool_size)
+        self.m_connection = self.m_pool.acquire()
+        self.m_pool.release(self.m_connection)
+
+    def connect(self) -> Connection:
+        """
+        Establishes a new bound connection to the LDAP server.
+
+        Returns:
+            The corresponding :py:class:`ldap3.Connection` instance.
+        """
+        connection = Connection(self.m_server, self.m_user, self.m_password)
+        connection.bind()
+        return connection
+
+    @property
+    def page_size(self) -> int:
+        """
+        Retrieves the number of entries per page of the LDAP paged searches.
+
+        Returns:
+            The page size.
+        """
+        return self.m_page_size
 
     def attributes(self, object: str) -> set:
         """
         Lists the available attributes related to a given collection of
         minifold entries exposed by this :py:class:`LdapConnector` instance.
+        The attributes are read from the server schema once and then cached.
 
         Args:
             object (str): The name of the collection.
@@ -57,7 +185,12 @@ class LdapConnector(Connector):
         Returns:
             The set of corresponding attributes.
         """
-        return {str(key) for key in self.m_connection.server.schema.attribute_types.keys()}
+        if self.m_attributes is None:
+            self.m_attributes = frozenset(
+                str(key)
+                for key in self.m_connection.server.schema.attribute_types.keys()
+            )
+        return set(self.m_attributes)
 
     def __enter__(self):
         """
@@ -70,7 +203,7 @@ class LdapConnector(Connector):
         """
         Method called when leaving a ``with LdapConnector(...):`` block.
         """
-        self.m_connection.unbind()
+        self.m_pool.close()
 
     @staticmethod
     def operator_to_ldap(op) -> str:
@@ -184,58 +317,84 @@ class LdapConnector(Connector):
                 sane = True
         return d if sane else dict()
 
-    def query(self, q: Query) -> list:
+    def query_gen(self, q: Query) -> iter:
         """
-        Handles an input :py:class:`Query` instance.
+        Handles an input :py:class:`Query` instance and iterates over the
+        matching entries. The entries are fetched page by page
+        (RFC 2696 paged search) using a connection of the pool.
 
         Args:
-            query (Query): The handled query.
+            q (Query): The handled query.
 
         Returns:
-            The list of entries matching the input query.
+            An iterator over the entries matching the input query.
         """
-        super().query(q)
-        entries = list()
-
-        if q.action == ACTION_READ:
-            if len(q.attributes) == 0:
-                attributes = ALL_ATTRIBUTES
-            else:
-                attributes = q.attributes
+        if q.action != ACTION_READ:
+            raise RuntimeError("Not implemented")
 
-            if q.filters is None:
-                keep_if = "(objectClass=*)"
-            else:
-                keep_if = LdapConnector.operand_to_ldap(q.filters)
+        if len(q.attributes) == 0:
+            attributes = ALL_ATTRIBUTES
+        else:
+            attributes = list(set(q.attributes) & self.attributes(q.object))
 
+        if q.filters is None:
+            keep_if = "(objectClass=*)"
+        else:
+            keep_if = LdapConnector.operand_to_ldap(q.filters)
+
+        # OFFSET, LIMIT
+        if q.limit == 0:
+            return
+        start = q.offset if q.offset else 0
+        stop = start + q.limit if q.limit is not None else None
+        page_size = min(self.page_size, stop) if stop is not None else self.page_size
+
+        Log.info(
+            "--> LDAP: dn = %s filter = %s attributes = %s" % (
+                q.object,
+                keep_if,
+                attributes
+            )
+        )
+        with self.m_pool.connection() as connection:
             try:
-                if attributes != ALL_ATTRIBUTES:
-                    attributes = set(attributes) & self.attributes(q.object)
-                Log.info(
-                    "--> LDAP: dn = %s filter = %s attributes = %s" % (
-                        q.object,
-                        keep_if,
-                        attributes
-                    )
-                )
-                self.m_connection.search(
+                responses = connection.extend.standard.paged_search(
                     q.object,
                     keep_if,
                     search_scope=SUBTREE,
-                    attributes=attributes
+                    attributes=attributes,
+                    paged_size=page_size,
+                    generator=True
                 )
-            except LDAPInvalidFilterError as e:
-                Log.error("LdapConnector::query: Invalid filter: %s" % keep_if)
-                raise e
-
-            for entry in self.m_connection.response:
-                entry = LdapConnector.sanitize_dict(entry["raw_attributes"])
-                if len(entry) > 0:
+                raw_entries = (
+                    response["raw_attributes"]
+                    for response in responses
+                    if "raw_attributes" in response
+                )
+                entries = (
+                    entry
+                    for entry in map(LdapConnector.sanitize_dict, raw_entries)
+                    if len(entry) > 0
+                )
+                for entry in islice(entries, start, stop):
                     # Fix missing keys
                     if len(q.attributes) > 0:
                         for missing_key in (set(q.attributes) - set(entry.keys())):
                             entry[missing_key] = None
-                    entries.append(dict(entry))
-        else:
-            raise RuntimeError("Not implemented")
-        return self.answer(q, entries)
+                    yield dict(entry)
+            except LDAPInvalidFilterError as e:
+                Log.error("LdapConnector::query: Invalid filter: %s" % keep_if)
+                raise e
+
+    def query(self, q: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query.
+        """
+        super().query(q)
+        return self.answer(q, list(self.query_gen(q)))
@@ -4,6 +4,7 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+from itertools import islice
 from .connector import Connector
 from .query import Query
 
@@ -79,6 +80,19 @@ class LimitConnector(Connector):
         """
         return self.m_lim
 
+    def query_gen(self, q: Query) -> iter:
+        """
+        Iterates over the entries matching an input :py:class:`Query` instance.
+        The child entries beyond the limit are not fetched.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        return islice(self.m_child.query_gen(q), self.m_lim)
+
     def query(self, q: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -90,10 +104,17 @@ class LimitConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(q)
-        return self.answer(
-            q,
-            limit(
-                self.m_child.query(q),
-                self.m_lim
-            )
-        )
+        return self.answer(q, list(self.query_gen(q)))
+
+    def count(self, q: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        n = self.m_child.count(q)
+        return n if self.m_lim is None else min(n, self.m_lim)
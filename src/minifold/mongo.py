@@ -4,14 +4,15 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
-from .binary_predicate import BinaryPredicate
+import operator
+from itertools import islice
+from .binary_predicate import BinaryPredicate, __in__
 from .connector import Connector
-from .query import Query, ACTION_READ
-from .where import where
+from .query import Query, ACTION_READ, SORT_ASC
 
 
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, ASCENDING, DESCENDING
 except ImportError as e:
     from .log import Log
     Log.warning(
@@ -22,19 +23,42 @@ except ImportError as e:
     raise e
 
 
+# Maps minifold operators to the corresponding Mongo operators.
+MONGO_COMPARISON_OPERATORS = {
+    operator.__eq__: "$eq",
+    operator.__gt__: "$gt",
+    operator.__ge__: "$gte",
+    operator.__lt__: "$lt",
+    operator.__le__: "$lte",
+}
+
+MONGO_LOGICAL_OPERATORS = {
+    operator.__and__: "$and",
+    operator.__or__: "$or",
+}
+
+
 class MongoConnector(Connector):
     """
     The :py:class:`MongoConnector` is a minifold gateway allowing
     to manipulate data stored in a Mongo database.
+
+    The filters (if they are :py:class:`BinaryPredicate` instances),
+    the SORT BY, OFFSET and LIMIT clauses are evaluated by the Mongo server.
+    The other filters (e.g., lambdas) are evaluated locally.
     """
-    def __init__(self, mongo_url: str, db_name: str):
+    def __init__(self, mongo_url: str, db_name: str, batch_size: int = None):
         """
         Constructor.
 
         Args:
             mongo_url (str): The URL of the mongo database.
             db_name (str): The name of the queried database.
+            batch_size (int): The number of documents returned by each batch
+                of the Mongo cursors. Pass ``None`` to use the server default.
         """
+        super().__init__()
+        self.batch_size = batch_size
         self.client = self.connect(mongo_url)
         self.db_name = db_name
         self.use_database(db_name)
@@ -74,6 +98,156 @@ class MongoConnector(Connector):
 
         return set()
 
+    @staticmethod
+    def binary_predicate_to_mongo(p: BinaryPredicate) -> dict:
+        """
+        Converts a :py:class:`BinaryPredicate` to the corresponding Mongo
+        query document.
+
+        Args:
+            p (BinaryPredicate): A :py:class:`BinaryPredicate` instance.
+
+        Raises:
+            ValueError: if ``p`` cannot be translated to a Mongo query document.
+
+        Returns:
+            The corresponding Mongo query document.
+        """
+        if not isinstance(p, BinaryPredicate):
+            raise ValueError("binary_predicate_to_mongo: %r is not a BinaryPredicate" % p)
+        if p.operator in MONGO_LOGICAL_OPERATORS:
+            return {
+                MONGO_LOGICAL_OPERATORS[p.operator]: [
+                    MongoConnector.binary_predicate_to_mongo(p.left),
+                    MongoConnector.binary_predicate_to_mongo(p.right)
+                ]
+            }
+        if not isinstance(p.left, str):
+            raise ValueError("binary_predicate_to_mongo: the left operand of %s must be a string" % p)
+        if p.operator in MONGO_COMPARISON_OPERATORS:
+            return {p.left: {MONGO_COMPARISON_OPERATORS[p.operator]: p.right}}
+        elif p.operator == operator.__ne__:
+            # In minifold, a missing attribute never satisfies "!="
+            return {p.left: {"$ne": p.right, "$exists": True}}
+        elif p.operator == __in__:
+            return {p.left: {"$in": list(p.right)}}
+        elif p.operator == operator.__contains__ and not isinstance(p.right, str):
+            # "CONTAINS" on a string means "substring", which is not translated.
+            return {p.left: {"$elemMatch": {"$eq": p.right}}}
+        raise ValueError("binary_predicate_to_mongo: unsupported operator in %s" % p)
+
+    @staticmethod
+    def sort_by_to_mongo(sort_by: dict) -> list:
+        """
+        Converts the SORT BY part of a :py:class:`Query` to the corresponding
+        Mongo sort specification.
+
+        Args:
+            sort_by (dict): The SORT BY part of a :py:class:`Query` instance.
+
+        Returns:
+            The corresponding list of ``(attribute, direction)`` pairs.
+        """
+        return [
+            (attribute, ASCENDING if sort_asc == SORT_ASC else DESCENDING)
+            for (attribute, sort_asc) in sort_by.items()
+        ]
+
+    def query_gen(self, query: Query) -> iter:
+        """
+        Handles an input :py:class:`Query` instance and iterates over the
+        matching documents as they are returned by the Mongo cursor.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        assert self.db is not None
+        if query.action != ACTION_READ:
+            raise RuntimeError("MongoConnector::query: Unable to query")
+        if query.limit == 0:
+            # For Mongo, limit=0 means no limit.
+            return
+
+        # WHERE
+        keep_if = None
+        mongo_filter = dict()
+        if query.filters:
+            try:
+                mongo_filter = MongoConnector.binary_predicate_to_mongo(query.filters)
+            except ValueError:
+                keep_if = query.filters
+
+        # SELECT (the projection is applied locally if the filter is evaluated locally)
+        projection = {
+            attr: 1
+            for attr in query.attributes
+        } if query.attributes and keep_if is None else None
+
+        cursor = self.db[query.object].find(mongo_filter, projection)
+
+        # SORT BY
+        if query.sort_by:
+            cursor = cursor.sort(MongoConnector.sort_by_to_mongo(query.sort_by))
+        if self.batch_size:
+            cursor = cursor.batch_size(self.batch_size)
+
+        if keep_if is None:
+            # OFFSET, LIMIT
+            if query.offset:
+                cursor = cursor.skip(query.offset)
+            if query.limit is not None:
+                cursor = cursor.limit(query.limit)
+            yield from cursor
+        else:
+            # OFFSET and LIMIT must be applied after the filtering.
+            entries = (entry for entry in cursor if keep_if(entry))
+            start = query.offset if query.offset else 0
+            stop = start + query.limit if query.limit is not None else None
+            for entry in islice(entries, start, stop):
+                if query.attributes:
+                    entry = {
+                        k: v
+                        for (k, v) in entry.items()
+                        if k in query.attributes or k == "_id"
+                    }
+                yield entry
+
+    def count(self, query: Query) -> int:
+        """
+        Counts the documents matching an input :py:class:`Query` instance.
+        If the filters can be translated to Mongo, the documents are counted
+        by the Mongo server (``count_documents``), otherwise they are streamed
+        and counted locally.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        assert self.db is not None
+        if query.action != ACTION_READ:
+            raise RuntimeError("MongoConnector::count: Unable to query")
+        try:
+            mongo_filter = (
+                MongoConnector.binary_predicate_to_mongo(query.filters) if query.filters
+                else dict()
+            )
+        except ValueError:
+            return super().count(query)
+        if query.limit == 0:
+            # For Mongo, limit=0 means no limit.
+            return 0
+        kwargs = dict()
+        if query.offset:
+            kwargs["skip"] = query.offset
+        if query.limit is not None:
+            kwargs["limit"] = query.limit
+        return self.db[query.object].count_documents(mongo_filter, **kwargs)
+
     def query(self, query: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -85,26 +259,4 @@ class MongoConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(query)
-        ret = list()
-        assert self.db
-        if query.action == ACTION_READ:
-            ret = list(
-                self.db[query.object].find(
-                    {},
-                    {
-                        attr: 1
-                        for attr in query.attributes
-                    } if query.attributes else None
-                )
-                .limit(query.limit if query.limit else 0)
-                .skip(query.offset if query.offset else 0)
-            )
-            if not query.filters:
-                pass
-            elif isinstance(query.filters, BinaryPredicate):
-                raise RuntimeError("MongoConnector::query: Not yet implemented")
-            else:
-                return where(ret, query.filters)
-        else:
-            raise RuntimeError("MongoConnector::query: Unable to query")
-        return self.answer(query, ret)
+        return self.answer(query, list(self.query_gen(query)))
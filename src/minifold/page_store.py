@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+"""
+The :py:class:`PageStore` class is a persistent, content-addressed store of
+downloaded pages. It allows several queries (and several query plans) to
+reuse both the downloaded pages and the text extracted from them.
+
+The store is a directory containing:
+
+- ``index.sqlite``: a SQLite database mapping each URL to the digest
+  (SHA-256) of its body and to its validators (ETag, Last-Modified),
+  and storing the (compressed) extracted texts;
+- ``bodies/``: the zlib-compressed bodies, one file per digest.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import partial
+
+from .cache import DEFAULT_CACHE_STORAGE_BASE_DIR
+from .download import DEFAULT_TIMEOUT, download
+from .filesystem import check_writable_directory, mkdir
+from .log import Log
+
+try:
+    import requests
+except ImportError as e:
+    Log.warning(
+        "Please install requests.\n"
+        "  APT: sudo apt install python3-requests\n"
+        "  PIP: sudo pip3 install --upgrade requests\n"
+    )
+    raise e
+
+# Default directory of the page store.
+DEFAULT_PAGE_STORE_DIR = os.path.join(DEFAULT_CACHE_STORAGE_BASE_DIR, "page_store")
+
+# Default maximal size (in bytes) of the page store.
+DEFAULT_PAGE_STORE_MAX_SIZE = 1 << 30
+
+
+def callable_name(f: callable) -> str:
+    """
+    Crafts a name identifying a function, e.g., to identify the
+    texts extracted by this function in a :py:class:`PageStore`.
+
+    Example:
+        >>> from functools import partial
+        >>> callable_name(partial(int, base=16))
+        'builtins.int(base=16)'
+
+    Args:
+        f (callable): A function, possibly a :py:class:`functools.partial` instance.
+
+    Returns:
+        The corresponding name.
+    """
+    if isinstance(f, partial):
+        args = [repr(arg) for arg in f.args] + [
+            "%s=%s" % (k, callable_name(v) if callable(v) else repr(v))
+            for (k, v) in sorted(f.keywords.items())
+        ]
+        return "%s(%s)" % (callable_name(f.func), ", ".join(args))
+    return "%s.%s" % (
+        getattr(f, "__module__", None),
+        getattr(f, "__qualname__", type(f).__name__)
+    )
+
+
+class PageStore:
+    """
+    The :py:class:`PageStore` class is a disk-backed, content-addressed
+    store of downloaded pages. Each URL is mapped to the SHA-256 digest of
+    its body, so that identical bodies are stored once. The bodies and
+    the extracted texts are compressed and stored separately.
+
+    The pages are revalidated using conditional requests (``ETag``,
+    ``Last-Modified``) and the least recently used bodies are evicted once
+    the store exceeds its maximal size.
+
+    See also the ``store`` parameter of :py:class:`DownloadConnector`.
+    """
+    def __init__(
+        self,
+        directory: str = None,
+        max_size: int = DEFAULT_PAGE_STORE_MAX_SIZE,
+        compression_level: int = 6
+    ):
+        """
+        Constructor.
+
+        Args:
+            directory (str): The directory of the store. Pass ``None``
+                to use :py:data:`DEFAULT_PAGE_STORE_DIR`.
+            max_size (int): The maximal size (in bytes) of the stored
+                (compressed) bodies and texts.
+            compression_level (int): The zlib compression level.
+        """
+        self.m_directory = directory if directory else DEFAULT_PAGE_STORE_DIR
+        self.m_max_size = max_size
+        self.m_compression_level = compression_level
+        mkdir(os.path.join(self.m_directory, "bodies"))
+        check_writable_directory(self.m_directory)
+        self.m_lock = threading.RLock()
+        self.m_connection = sqlite3.connect(
+            os.path.join(self.m_directory, "index.sqlite"),
+            check_same_thread=False
+        )
+        with self.m_connection:
+            self.m_connection.executescript("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    status_code INTEGER,
+                    headers TEXT,
+                    encoding TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched REAL
+                );
+                CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest);
+                CREATE TABLE IF NOT EXISTS bodies (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS bodies_last_access ON bodies (last_access);
+                CREATE TABLE IF NOT EXISTS texts (
+                    digest TEXT NOT NULL,
+                    extractor TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (digest, extractor)
+                );
+            """)
+        # The size of the store is computed once, and then maintained on each write.
+        (size_bodies,) = self.m_connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM bodies"
+        ).fetchone()
+        (size_texts,) = self.m_connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM texts"
+        ).fetchone()
+        self.m_size = size_bodies + size_texts
+
+    @property
+    def directory(self) -> str:
+        """
+        Retrieves the directory of this :py:class:`PageStore` instance.
+
+        Returns:
+            The directory of the store.
+        """
+        return self.m_directory
+
+    @property
+    def max_size(self) -> int:
+        """
+        Retrieves the maximal size (in bytes) of this :py:class:`PageStore` instance.
+
+        Returns:
+            The maximal size of the store.
+        """
+        return self.m_max_size
+
+    @property
+    def size(self) -> int:
+        """
+        Retrieves the size (in bytes) of the data stored in
+        this :py:class:`PageStore` instance.
+
+        Returns:
+            The size of the (compressed) bodies and texts.
+        """
+        return self.m_size
+
+    def stored_size(self, query: str, params: tuple) -> int:
+        """
+        Retrieves the size of the rows of the index matching a query.
+
+        Args:
+            query (str): A ``SELECT size FROM ...`` SQL query.
+            params (tuple): The parameters of the query.
+
+        Returns:
+            The total size of the matching rows.
+        """
+        return sum(size for (size,) in self.m_connection.execute(query, params))
+
+    def body_path(self, digest: str) -> str:
+        """
+        Retrieves the path of the file storing a body.
+
+        Args:
+            digest (str): The digest of the body.
+
+        Returns:
+            The corresponding path.
+        """
+        return os.path.join(self.m_directory, "bodies", digest[:2], digest + ".zz")
+
+    def digest(self, url: str) -> str:
+        """
+        Retrieves the digest of the body stored for a given URL.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            The digest of the body, or ``None`` if ``url`` is not stored.
+        """
+        with self.m_lock:
+            row = self.m_connection.execute(
+                "SELECT digest FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, url: str) -> bool:
+        """
+        Checks whether a page is stored.
+
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            ``True`` iff the page related to ``url`` is stored.
+        """
+        return self.digest(url) is not None
+
+    def put(self, url: str, response: requests.Response) -> str:
+        """
+        Stores a downloaded page.
+
+        Args:
+            url (str): The URL of the page.
+            response (requests.Response): The corresponding HTTP response.
+
+        Returns:
+            The digest of the body.
+        """
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.body_path(digest)
+        with self.m_lock:
+            if not os.path.exists(path):
+                data = zlib.compress(content, self.m_compression_level)
+                mkdir(os.path.dirname(path))
+                tmp_path = "%s.%d.tmp" % (path, threading.get_ident())
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                size = len(data)
+            else:
+                size = os.path.getsize(path)
+            now = time.time()
+            with self.m_connection:
+                old_size = self.stored_size("SELECT size FROM bodies WHERE digest = ?", (digest,))
+                self.m_connection.execute(
+                    "INSERT OR REPLACE INTO bodies (digest, size, last_access) VALUES (?, ?, ?)",
+                    (digest, size, now)
+                )
+                self.m_size += size - old_size
+                self.m_connection.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        url,
+                        digest,
+                        response.status_code,
+                        json.dumps(dict(response.headers)),
+                        response.encoding,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        now
+                    )
+                )
+            self.evict()
+        return digest
+
+    def get(self, url: str) -> requests.Response:
+        """
+        Retrieves a stored page.
+
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            The corresponding :py:class:`requests.Response` instance,
+            or ``None`` if the page is not stored.
+        """
+        with self.m_lock:
+            row = self.m_connection.execute(
+                "SELECT digest, status_code, headers, encoding FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            (digest, status_code, headers, encoding) = row
+            try:
+                with open(self.body_path(digest), "rb") as f:
+                    content = zlib.decompress(f.read())
+            except (OSError, zlib.error) as e:
+                Log.warning("PageStore: cannot read %s (%s): %s" % (url, digest, e))
+                return None
+            with self.m_connection:
+                self.m_connection.execute(
+                    "UPDATE bodies SET last_access = ? WHERE digest = ?",
+                    (time.time(), digest)
+                )
+        response = requests.Response()
+        response.url = url
+        response.status_code = status_code
+        response.headers = requests.structures.CaseInsensitiveDict(json.loads(headers))
+        response.encoding = encoding
+        response._content = content
+        return response
+
+    def revalidation_headers(self, url: str) -> dict:
+        """
+        Crafts the HTTP headers needed to revalidate a stored page.
+
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            The ``If-None-Match`` and ``If-Modified-Since`` headers (if any).
+        """
+        with self.m_lock:
+            row = self.m_connection.execute(
+                "SELECT etag, last_modified FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        headers = dict()
+        if row:
+            (etag, last_modified) = row
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def download(self, url: str, timeout: tuple = DEFAULT_TIMEOUT, **kwargs) -> object:
+        """
+        Downloads a page, unless the stored copy is still valid
+        (conditional request). This method can be passed to
+        :py:func:`downloads_gen` (see the ``download`` parameter).
+
+        Args:
+            url (str): The URL of the page.
+            timeout (tuple): A ``(float, float)`` tuple corresponding to the
+                (connect timeout, read timeout).
+            kwargs: See :py:func:`download`.
+
+        Returns:
+            The corresponding :py:class:`requests.Response` instance.
+            If the request fails, the stored copy (if any), the
+            corresponding :py:class:`Exception` otherwise.
+        """
+        headers = self.revalidation_headers(url)
+        response = download(url, timeout=timeout, headers=headers, use_cache=False, **kwargs)
+        if isinstance(response, Exception):
+            stored = self.get(url)
+            return stored if stored is not None else response
+        if response.status_code == 304:
+            stored = self.get(url)
+            if stored is not None:
+                return stored
+            # The page has been evicted in the meantime.
+            response = download(url, timeout=timeout, use_cache=False, **kwargs)
+            if isinstance(response, Exception):
+                return response
+        if response.status_code == 200:
+            self.put(url, response)
+        return response
+
+    def text(self, url: str, extractor: object) -> str:
+        """
+        Retrieves the text extracted from a stored page.
+
+        Args:
+            url (str): The URL of the page.
+            extractor (object): The extraction function, or its name
+                (see :py:func:`callable_name`).
+
+        Returns:
+            The extracted text if stored, ``None`` otherwise.
+        """
+        if callable(extractor):
+            extractor = callable_name(extractor)
+        with self.m_lock:
+            row = self.m_connection.execute(
+                "SELECT texts.data FROM pages JOIN texts ON pages.digest = texts.digest "
+                "WHERE pages.url = ? AND texts.extractor = ?",
+                (url, extractor)
+            ).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def put_text(self, url: str, extractor: object, text: str):
+        """
+        Stores the text extracted from a stored page.
+
+        Args:
+            url (str): The URL of the page.
+            extractor (object): The extraction function, or its name
+                (see :py:func:`callable_name`).
+            text (str): The extracted text.
+        """
+        if callable(extractor):
+            extractor = callable_name(extractor)
+        digest = self.digest(url)
+        if digest is None:
+            return
+        data = zlib.compress(text.encode("utf-8"), self.m_compression_level)
+        with self.m_lock:
+            with self.m_connection:
+                old_size = self.stored_size(
+                    "SELECT size FROM texts WHERE digest = ? AND extractor = ?",
+                    (digest, extractor)
+                )
+                self.m_connection.execute(
+                    "INSERT OR REPLACE INTO texts VALUES (?, ?, ?, ?)",
+                    (digest, extractor, len(data), data)
+                )
+                self.m_size += len(data) - old_size
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used bodies (and the related pages and texts)
+        until the size of this :py:class:`PageStore` instance fits its maximal size.
+        """
+        with self.m_lock:
+            if self.m_size <= self.m_max_size:
+                return
+            # The bodies are iterated by increasing last access (see bodies_last_access).
+            rows = self.m_connection.execute(
+                "SELECT digest, size FROM bodies ORDER BY last_access"
+            )
+            digests = list()
+            for (digest, body_size) in rows:
+                if self.m_size <= self.m_max_size:
+                    break
+                digests.append(digest)
+                self.m_size -= body_size + self.stored_size(
+                    "SELECT size FROM texts WHERE digest = ?", (digest,)
+                )
+            with self.m_connection:
+                for digest in digests:
+                    for table in ["pages", "bodies", "texts"]:
+                        self.m_connection.execute(
+                            "DELETE FROM %s WHERE digest = ?" % table, (digest,)
+                        )
+                    try:
+                        os.remove(self.body_path(digest))
+                    except OSError:
+                        pass
+
+    def close(self):
+        """
+        Closes the index of this :py:class:`PageStore` instance.
+        """
+        with self.m_lock:
+            self.m_connection.close()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+"""
+Pipelined execution of a minifold query plan.
+
+By default, the connectors of a query plan run in lockstep in the
+calling thread: each entry is pulled through every stage before the
+next one is fetched. A :py:class:`PipelineConnector` runs its child
+stage in a dedicated thread (or process), so that it produces entries
+while the parent stages consume the previous ones. For instance,
+an I/O-bound source may overlap with CPU-bound transforms:
+
+.. code-block:: python
+
+    # The download runs in its own thread, the lambdas in the calling thread.
+    LambdasConnector(map_lambdas, PipelineConnector(DownloadConnector(...)))
+
+The stages are connected by a bounded queue: a fast producer blocks
+once ``queue_size`` chunks of entries are pending (backpressure),
+hence the memory footprint does not depend on the number of entries.
+The exceptions raised by the producer are re-raised by the consumer.
+If the consumer stops iterating (e.g., because of a LIMIT), the
+producer is cancelled and its query is closed.
+"""
+
+import multiprocessing
+import pickle
+import queue
+import threading
+from .connector import Connector
+from .log import Log
+from .query import Query
+
+# Default maximal number of pending chunks between two stages.
+DEFAULT_PIPELINE_QUEUE_SIZE = 16
+
+# Default maximal number of entries per chunk.
+DEFAULT_PIPELINE_CHUNK_SIZE = 64
+
+# Delay (in seconds) between two checks of the cancellation of a stage.
+PIPELINE_POLL_INTERVAL = 0.1
+
+# Delay (in seconds) granted to a producer process to stop once cancelled.
+PIPELINE_JOIN_TIMEOUT = 1.0
+
+
+def put_or_cancel(out: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """
+    Puts an item in a bounded queue, waiting until a slot is available
+    or the stage is cancelled.
+
+    Args:
+        out (queue.Queue): The queue (a ``multiprocessing.Queue``
+            if the stage runs in a dedicated process).
+        item (object): The item.
+        stop (threading.Event): The event set when the stage is cancelled.
+
+    Returns:
+        ``True`` if the item has been put, ``False`` if the stage
+        has been cancelled.
+    """
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=PIPELINE_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def produce(
+    connector: Connector,
+    q: Query,
+    out: queue.Queue,
+    stop: threading.Event,
+    chunk_size: int = DEFAULT_PIPELINE_CHUNK_SIZE,
+    to_picklable: bool = False
+):
+    """
+    Runs a pipeline stage, i.e., iterates over the entries of a
+    :py:class:`Connector` and puts them in a queue.
+
+    The entries are sent by chunks of at most ``chunk_size`` entries,
+    to amortize the synchronization cost. A partial chunk is sent
+    as soon as the consumer waits for entries. The chunks are
+    followed by ``None`` (end of the stream) or by the raised exception.
+
+    Args:
+        connector (Connector): The connector run by this stage.
+        q (Query): The query handled by ``connector``.
+        out (queue.Queue): The bounded queue.
+        stop (threading.Event): The event set when the stage is cancelled.
+        chunk_size (int): The maximal number of entries per chunk.
+        to_picklable (bool): Pass ``True`` if the exceptions must
+            be picklable (i.e., if the stage runs in a dedicated process).
+    """
+    entries = None
+    try:
+        entries = connector.query_gen(q)
+        chunk = list()
+        for entry in entries:
+            chunk.append(entry)
+            if len(chunk) >= chunk_size or out.empty():
+                if not put_or_cancel(out, chunk, stop):
+                    return
+                chunk = list()
+        if chunk and not put_or_cancel(out, chunk, stop):
+            return
+        put_or_cancel(out, None, stop)
+    except Exception as e:
+        if to_picklable:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError("%s: %s" % (type(e).__name__, e))
+        put_or_cancel(out, e, stop)
+    finally:
+        # Release the resources of the child query (cursors, sessions...)
+        close = getattr(entries, "close", None)
+        if close:
+            close()
+        if stop.is_set() and to_picklable:
+            # Do not wait for the consumer to read the pending chunks.
+            out.cancel_join_thread()
+
+
+class PipelineConnector(Connector):
+    """
+    The :py:class:`PipelineConnector` class runs its child in a dedicated
+    thread (or process), connected to the calling stage by a bounded queue.
+    See the :py:mod:`minifold.pipeline` module.
+
+    Example:
+        >>> from minifold import EntriesConnector, Query, WhereConnector
+        >>> connector = WhereConnector(
+        ...     PipelineConnector(EntriesConnector([{"a": i} for i in range(5)])),
+        ...     lambda e: e["a"] % 2 == 0
+        ... )
+        >>> connector.query(Query())
+        [{'a': 0}, {'a': 2}, {'a': 4}]
+    """
+    def __init__(
+        self,
+        child: Connector,
+        queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE,
+        chunk_size: int = DEFAULT_PIPELINE_CHUNK_SIZE,
+        use_processes: bool = False
+    ):
+        """
+        Constructor.
+
+        Args:
+            child (Connector): The child minifold :py:class:`Connector`
+                instance, run in a dedicated thread (or process).
+            queue_size (int): The maximal number of pending chunks. At most
+                ``queue_size * chunk_size`` entries are buffered.
+            chunk_size (int): The maximal number of entries per chunk.
+            use_processes (bool): Pass ``True`` to run the child in a dedicated
+                process, e.g., if it is CPU-bound. The child connector and
+                its entries must then be picklable.
+        """
+        super().__init__()
+        if queue_size < 1:
+            raise ValueError("Invalid queue_size %s, it must be positive" % queue_size)
+        if chunk_size < 1:
+            raise ValueError("Invalid chunk_size %s, it must be positive" % chunk_size)
+        self.m_child = child
+        self.m_queue_size = queue_size
+        self.m_chunk_size = chunk_size
+        self.m_use_processes = use_processes
+
+    @property
+    def child(self) -> Connector:
+        """
+        Accessor to the child minifold :py:class:`Connector` instance.
+
+        Returns:
+            The child minifold :py:class:`Connector` instance.
+        """
+        return self.m_child
+
+    @property
+    def queue_size(self) -> int:
+        """
+        Accessor to the maximal number of pending chunks.
+
+        Returns:
+            The maximal number of pending chunks.
+        """
+        return self.m_queue_size
+
+    @property
+    def chunk_size(self) -> int:
+        """
+        Accessor to the maximal number of entries per chunk.
+
+        Returns:
+            The maximal number of entries per chunk.
+        """
+        return self.m_chunk_size
+
+    def attributes(self, object: str) -> set:
+        """
+        Lists the available attributes related to a given collection of
+        minifold entries exposed by this :py:class:`PipelineConnector` instance.
+
+        Args:
+            object (str): The name of the collection.
+
+        Returns:
+            The set of corresponding attributes.
+        """
+        return self.m_child.attributes(object)
+
+    def start(self, q: Query) -> tuple:
+        """
+        Starts the stage running the child.
+
+        Args:
+            q (Query): The query handled by the child.
+
+        Returns:
+            A ``(worker, out, stop)`` tuple, where ``worker`` is the
+            thread (or process) running the child, ``out`` the queue
+            it feeds, and ``stop`` the event cancelling it.
+        """
+        if self.m_use_processes:
+            try:
+                pickle.dumps(self.m_child)
+                ctx = multiprocessing.get_context()
+                out = ctx.Queue(self.m_queue_size)
+                stop = ctx.Event()
+                worker = ctx.Process(
+                    target=produce,
+                    args=(self.m_child, q, out, stop, self.m_chunk_size, True),
+                    daemon=True
+                )
+                worker.start()
+                return (worker, out, stop)
+            except (pickle.PicklingError, AttributeError, TypeError) as e:
+                Log.info("%r: cannot run the child in a process (%s), using a thread" % (self, e))
+        out = queue.Queue(self.m_queue_size)
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=produce,
+            args=(self.m_child, q, out, stop, self.m_chunk_size),
+            daemon=True
+        )
+        worker.start()
+        return (worker, out, stop)
+
+    def query_gen(self, q: Query) -> iter:
+        """
+        Iterates over the entries matching an input :py:class:`Query` instance,
+        while the child produces the next ones.
+
+        Args:
+            q (Query): The handled query.
+
+        Raises:
+            RuntimeError: if the child stage stopped unexpectedly.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        (worker, out, stop) = self.start(q)
+        try:
+            while True:
+                try:
+                    item = out.get(timeout=PIPELINE_POLL_INTERVAL)
+                except queue.Empty:
+                    if worker.is_alive():
+                        continue
+                    try:
+                        # The last items may have been sent just before the worker exited.
+                        item = out.get(timeout=PIPELINE_POLL_INTERVAL)
+                    except queue.Empty:
+                        raise RuntimeError("%r: the child stage stopped unexpectedly" % self)
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield from item
+        finally:
+            # Cancel the producer if the consumer stops early.
+            stop.set()
+            if isinstance(worker, multiprocessing.process.BaseProcess):
+                worker.join(PIPELINE_JOIN_TIMEOUT)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+                out.close()
+
+    def query(self, q: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query.
+        """
+        super().query(q)
+        return self.answer(q, list(self.query_gen(q)))
+
+    def count(self, q: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+        The count is delegated to the child.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        return self.m_child.count(q)
@@ -59,15 +59,28 @@ def proxy_disable():
     proxy.clear()
 
 
-def make_session() -> requests.Session:
+def make_session(pool_connections: int = None, pool_maxsize: int = None) -> requests.Session:
     """
     Creates a :py:class:`requests.Session` instance according to
     the :py:class:`Proxy` singleton.
 
+    Args:
+        pool_connections (int): The number of connection pools (i.e., of hosts)
+            cached by the session. Pass ``None`` to use the ``requests`` default.
+        pool_maxsize (int): The maximal number of connections kept alive
+            per host. Pass ``None`` to use the ``requests`` default.
+
     Returns:
         The corresponding :py:class:`requests.Session` instance.
     """
     session = requests.Session()
+    if pool_connections or pool_maxsize:
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections or requests.adapters.DEFAULT_POOLSIZE,
+            pool_maxsize=pool_maxsize or requests.adapters.DEFAULT_POOLSIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
     proxy = Proxy()
     if proxy:
         Log.info("Setting proxy = %s" % proxy)
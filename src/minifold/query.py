@@ -50,7 +50,8 @@ class Query:
         filters: object = None,
         offset: int = None,
         limit: int = None,
-        sort_by: dict = None
+        sort_by: dict = None,
+        values: object = None
     ):
         """
         Constructor.
@@ -80,6 +81,11 @@ class Query:
                 It maps each attributes to be sorted with the corresponding
                 sorting order (:py:data:`SORT_ASC` or :py:data:`SORT_DESC`).
                 In SQL this corresponds to the SORT BY statement.
+            values (object): The data written by the query, or ``None``
+                if not needed. For :py:data:`ACTION_CREATE`, this is the list of
+                inserted entries (in SQL, the VALUES of an INSERT statement).
+                For :py:data:`ACTION_UPDATE`, this is a dictionary mapping each
+                updated attribute with its new value (in SQL, the SET clause).
         """
         self.m_action = action
         self.m_object = object
@@ -90,6 +96,7 @@ class Query:
         self.m_offset = offset
         self.m_limit = limit
         self.m_sort_by = sort_by if sort_by else dict()
+        self.m_values = values
 
     def copy(self):
         """
@@ -148,6 +155,14 @@ class Query:
     def sort_by(self, value: dict):
         self.m_sort_by = value
 
+    @property
+    def values(self) -> object:
+        return self.m_values
+
+    @values.setter
+    def values(self, value: object):
+        self.m_values = value
+
     @property
     def object(self) -> str:
         return self.m_object
@@ -4,7 +4,8 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
-from copy import deepcopy
+import operator
+from copy import copy
 from .binary_predicate import BinaryPredicate
 from .dict_util import reverse_dict
 from .connector import Connector
@@ -100,6 +101,54 @@ def rename(mapping: dict, entries: list) -> list:
     return entries
 
 
+def renamed_entry(d: dict, mapping: dict) -> dict:
+    """
+    Builds a copy of a dictionary in which several keys are replaced.
+    Unlike :py:func:`rename_entry`, the input dictionary is not modified
+    and the keys keep their order.
+
+    Example:
+        >>> renamed_entry({"a": 1, "b": 2, "c": 3}, {"a": "A", "b": "B"})
+        {'A': 1, 'B': 2, 'c': 3}
+
+    Args:
+        d (dict): The input dictionary.
+        mapping (dict): A dictionary mapping each key to
+            be replaced by the new corresponding key.
+
+    Returns:
+        The renamed dictionary.
+    """
+    return {mapping.get(k, k): v for (k, v) in d.items()}
+
+
+def renamed(mapping: dict, entries: iter) -> iter:
+    """
+    Iterates over copies of minifold entries in which several keys are replaced.
+    Unlike :py:func:`rename`, the input entries are not modified.
+
+    Example:
+        >>> list(renamed({"a": "A"}, [{"a": 1, "b": 2}, {"a": 10, "b": 20}]))
+        [{'A': 1, 'b': 2}, {'A': 10, 'b': 20}]
+
+    Args:
+        mapping (dict): A dictionary mapping each key to
+            be replaced by the new corresponding key.
+        entries (iter): The input minifold entries.
+
+    Returns:
+        An iterator over the renamed entries.
+    """
+    if not mapping:
+        # Nothing to rename, still do not expose the input entries.
+        return (dict(entry) for entry in entries)
+    get = mapping.get
+    return (
+        {get(k, k): v for (k, v) in entry.items()}
+        for entry in entries
+    )
+
+
 # TODO minifold.searchSearchFilter is not supported
 def rename_filters(filters: object, mapping: dict):
     """
@@ -173,6 +222,83 @@ def rename_query(q: Query, mapping: dict) -> Query:
     return q_renamed
 
 
+def renamed_filters(filters: object, mapping: dict) -> object:
+    """
+    Rename the keys involved in a minifold filter (see :py:class:`BinaryPredicate`).
+    Unlike :py:func:`rename_filters`, the input filter is not modified: only the
+    predicates involving a renamed key are rebuilt, the others are shared.
+    Only the attributes (i.e., the left operands of the comparisons) are renamed.
+    A function filter is wrapped so that it processes the entries with
+    the original keys.
+
+    Example:
+        >>> p = BinaryPredicate(BinaryPredicate("A", "<=", 1), "&&", BinaryPredicate("b", "==", "A"))
+        >>> print(renamed_filters(p, {"A": "a"}))
+        a <= 1 AND b == A
+
+    Args:
+        filters (object): The minifold filter.
+        mapping (dict): A dictionary mapping each key to
+            be replaced by the new corresponding key.
+
+    Returns:
+        The renamed filter.
+    """
+    if filters is None or not mapping:
+        return filters
+    elif isinstance(filters, BinaryPredicate):
+        if filters.operator in [operator.__or__, operator.__and__, operator.__xor__]:
+            left = renamed_filters(filters.left, mapping)
+            right = renamed_filters(filters.right, mapping)
+        else:
+            left = mapping.get(filters.left, filters.left) if isinstance(filters.left, str) else filters.left
+            right = filters.right
+        if left is filters.left and right is filters.right:
+            return filters
+        return BinaryPredicate(left, filters.operator, right)
+    elif callable(filters):
+        reverse_mapping = reverse_dict(mapping)
+        return lambda entry: filters(renamed_entry(entry, reverse_mapping))
+    else:
+        raise RuntimeError("renamed_filters: unsupported type %s: filters = %s" % (type(filters), filters))
+
+
+def renamed_query(q: Query, mapping: dict) -> Query:
+    """
+    Rename some attributes involved in a :py:class:`Query` instance.
+    Unlike :py:func:`rename_query`, the input query is not modified:
+    the returned query is a shallow copy in which only the renamed parts
+    are rebuilt.
+
+    Example:
+        >>> q = Query(attributes=["A", "b"], sort_by={"A": True})
+        >>> q_renamed = renamed_query(q, {"A": "a"})
+        >>> q_renamed.attributes, q_renamed.sort_by
+        (['a', 'b'], {'a': True})
+        >>> q.attributes
+        ['A', 'b']
+
+    Args:
+        q (Query); A py:class:`Query` instance.
+        mapping (dict): A dictionary mapping each key to
+            be replaced by the new corresponding key.
+
+    Returns:
+        The renamed minifold query.
+    """
+    q_renamed = copy(q)
+    if not mapping:
+        return q_renamed
+    q_renamed.attributes = [mapping.get(attribute, attribute) for attribute in q.attributes]
+    q_renamed.filters = renamed_filters(q.filters, mapping)
+    q_renamed.sort_by = rename_sort_by(q.sort_by, mapping)
+    if isinstance(q.values, dict):
+        q_renamed.values = renamed_entry(q.values, mapping)
+    elif isinstance(q.values, list):
+        q_renamed.values = list(renamed(mapping, q.values))
+    return q_renamed
+
+
 class RenameConnector(Connector):
     """
     The :py:class:`RenameConnector` class wraps the :py:func:`rename` function
@@ -212,6 +338,21 @@ class RenameConnector(Connector):
             for attribute in self.m_child.attributes(object)
         }
 
+    def query_gen(self, q: Query) -> iter:
+        """
+        Iterates over the entries matching an input :py:class:`Query` instance.
+        The child entries are not modified: each entry is renamed into a new dictionary.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        assert self.child is not None
+        q_renamed = renamed_query(q, self.map_qr)
+        return renamed(self.map_rq, self.child.query_gen(q_renamed))
+
     def query(self, q: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -223,15 +364,21 @@ class RenameConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(q)
+        return self.answer(q, list(self.query_gen(q)))
+
+    def count(self, q: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+        The count is delegated to the child.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
         assert self.child is not None
-        q_renamed = rename_query(deepcopy(q), self.map_qr)
-        return self.answer(
-            q,
-            rename(
-                self.map_rq,
-                self.child.query(q_renamed)
-            )
-        )
+        return self.child.count(renamed_query(q, self.map_qr))
 
     @property
     def child(self):
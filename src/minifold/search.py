@@ -5,6 +5,7 @@
 # https://github.com/nokia/minifold
 
 import re
+from functools import lru_cache
 from .where import where
 
 
@@ -86,6 +87,23 @@ def lower_case_contains(x: str, y: str) -> bool:
     return x.lower() in y.lower()
 
 
+@lru_cache(maxsize=1024)
+def compile_word_regex(word: str, ignore_case: bool = True) -> re.Pattern:
+    """
+    Compiles (once) the regular expression used by :py:func:`contains_words`.
+
+    Args:
+        word (str): The searched word.
+        ignore_case (bool): Pass `True` if the search is not case sensitive,
+            ``False`` otherwise.
+
+    Returns:
+        The compiled regular expression.
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    return re.compile("\\b(%s)\\b" % word, flags)
+
+
 def contains_words(word: str, sentence: str, ignore_case: bool = True):
     """
     Checks whether a word is contained in a string (e.g., a sentence).
@@ -106,10 +124,7 @@ def contains_words(word: str, sentence: str, ignore_case: bool = True):
         ``True`` if ``word`` has been found in ``sentence``,
         ``False`` otherwise.
     """
-    pattern = ".*\\b(%s)\\b.*" % word
-    flags = re.IGNORECASE if ignore_case else 0
-    regex = re.compile(pattern, flags)
-    return bool(regex.match(sentence))
+    return compile_word_regex(word, ignore_case).search(sentence) is not None
 
 
 class SearchFilter:
@@ -67,27 +67,63 @@ class SelectConnector(Connector):
         """
         return self.m_child
 
-    def query(self, query: Query) -> list:
+    def child_query(self, query: Query) -> Query:
         """
-        Handles an input :py:class:`Query` instance.
+        Builds the :py:class:`Query` instance forwarded to the child.
 
         Args:
             query (Query): The handled query.
 
         Returns:
-            The list of entries matching the input query.
+            The query forwarded to the child.
         """
-        super().query(query)
         q = query.copy()
         q.attributes = [
             attribute
             for attribute in q.attributes
             if attribute in self.m_attributes
         ]
-        return self.answer(
-            query,
-            select(
-                self.m_child.query(q),
-                self.m_attributes
-            )
+        return q
+
+    def query_gen(self, query: Query) -> iter:
+        """
+        Iterates over the entries matching an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        attributes = self.m_attributes
+        return (
+            {k: entry[k] for k in attributes}
+            for entry in self.m_child.query_gen(self.child_query(query))
         )
+
+    def query(self, query: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query.
+        """
+        super().query(query)
+        return self.answer(query, list(self.query_gen(query)))
+
+    def count(self, query: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+        The selected attributes do not change the count, hence it is
+        delegated to the child.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        return self.m_child.count(query)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import threading
+from .proxy import Proxy, make_session
+from .request_cache import install_cache, requests_cache
+from .singleton import Singleton
+
+try:
+    import requests
+except ImportError as e:
+    from .log import Log
+    Log.warning(
+        "Please install requests.\n"
+        "  APT: sudo apt install python3-requests\n"
+        "  PIP: sudo pip3 install --upgrade requests\n"
+    )
+    raise e
+
+# Default number of hosts for which a connection pool is kept.
+DEFAULT_POOL_CONNECTIONS = 32
+
+# Default number of keep-alive connections per host.
+DEFAULT_POOL_MAXSIZE = 32
+
+
+class SessionManager(metaclass=Singleton):
+    """
+    The :py:class:`SessionManager` singleton hands out process-wide
+    keep-alive :py:class:`requests.Session` instances, so that
+    consecutive HTTP queries reuse the same TCP/TLS connections.
+
+    - There is one session per cache file. The cache is installed
+      (see :py:func:`install_cache`) once, when the corresponding
+      session is created. An additional session bypasses the cache.
+    - The proxy settings are refreshed from the :py:class:`Proxy`
+      singleton each time a session is handed out.
+    - The number of connections kept alive per host can be tuned
+      using :py:meth:`SessionManager.set_pool_size`.
+
+    >>> session = SessionManager().session()
+    >>> session is SessionManager().session()
+    True
+    """
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+    ):
+        """
+        Constructor.
+
+        Args:
+            pool_connections (int): The number of hosts for which a
+                connection pool is kept.
+            pool_maxsize (int): The default number of keep-alive connections
+                per host.
+        """
+        self.m_pool_connections = pool_connections
+        self.m_pool_maxsize = pool_maxsize
+        self.m_host_pool_sizes = dict()
+        self.m_sessions = dict()
+        self.m_lock = threading.Lock()
+
+    @staticmethod
+    def mount_host(session: requests.Session, host: str, pool_maxsize: int):
+        """
+        Sets the number of keep-alive connections of a session for a given host.
+
+        Args:
+            session (requests.Session): The session.
+            host (str): The host (e.g., ``"dblp.org"`` or ``"localhost:8000"``).
+            pool_maxsize (int): The number of keep-alive connections for ``host``.
+        """
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize
+        )
+        for protocol in ["http", "https"]:
+            session.mount("%s://%s/" % (protocol, host), adapter)
+
+    def set_pool_size(self, host: str, pool_maxsize: int):
+        """
+        Sets the number of keep-alive connections for a given host.
+
+        Args:
+            host (str): The host (e.g., ``"dblp.org"`` or ``"localhost:8000"``).
+            pool_maxsize (int): The number of keep-alive connections for ``host``.
+        """
+        with self.m_lock:
+            self.m_host_pool_sizes[host] = pool_maxsize
+            for session in self.m_sessions.values():
+                SessionManager.mount_host(session, host, pool_maxsize)
+
+    def session(self, cache_filename: str = None, use_cache: bool = True) -> requests.Session:
+        """
+        Retrieves the session related to a given cache.
+
+        Args:
+            cache_filename (str): The path to the cache to use.
+                Pass ``None`` to use the default cache.
+            use_cache (bool): Pass ``False`` to get a session that
+                does not cache the HTTP responses. In this case,
+                ``cache_filename`` is ignored.
+
+        Returns:
+            The corresponding :py:class:`requests.Session` instance.
+        """
+        key = (cache_filename if use_cache else None, use_cache)
+        with self.m_lock:
+            session = self.m_sessions.get(key)
+            if session is None:
+                if use_cache:
+                    install_cache(cache_filename)
+                    session = make_session(self.m_pool_connections, self.m_pool_maxsize)
+                else:
+                    with requests_cache.disabled():
+                        session = make_session(self.m_pool_connections, self.m_pool_maxsize)
+                for (host, pool_maxsize) in self.m_host_pool_sizes.items():
+                    SessionManager.mount_host(session, host, pool_maxsize)
+                self.m_sessions[key] = session
+            proxy = Proxy()
+            if session.proxies != proxy:
+                session.proxies.clear()
+                session.proxies.update(proxy)
+        return session
+
+    def close(self):
+        """
+        Closes every session handed out so far.
+        """
+        with self.m_lock:
+            for session in self.m_sessions.values():
+                session.close()
+            self.m_sessions.clear()
+
+
+def get_session(cache_filename: str = None, use_cache: bool = True) -> requests.Session:
+    """
+    Retrieves a process-wide keep-alive session.
+    See :py:meth:`SessionManager.session`.
+
+    Args:
+        cache_filename (str): The path to the cache to use.
+            Pass ``None`` to use the default cache.
+        use_cache (bool): Pass ``False`` to get a session that
+            does not cache the HTTP responses.
+
+    Returns:
+        The corresponding :py:class:`requests.Session` instance.
+    """
+    return SessionManager().session(cache_filename, use_cache)
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+"""
+Memory-mapped columnar snapshots of minifold entries.
+
+A snapshot is a directory storing each attribute (column) of a list of
+entries in flat files:
+
+- ``meta.json``: the number of entries and the description of each column;
+- ``<column>.status``: one byte per entry (:py:data:`STATUS_MISSING`,
+  :py:data:`STATUS_VALUE` or :py:data:`STATUS_NONE`);
+- ``<column>.values``: the values of the numeric columns (fixed-width array),
+  or the codes of the string columns;
+- ``<column>.data`` and ``<column>.offsets``: the string dictionary of the
+  string columns, or the pickled values of the other columns.
+
+The files are memory-mapped and the entries are decoded on access,
+so loading a snapshot is near-instant and the processes serving the
+same snapshot share the page cache.
+"""
+
+import json
+import mmap
+import os
+import pickle
+import sys
+from array import array
+from collections.abc import Sequence
+from .entries_connector import EntriesConnector
+from .filesystem import mkdir
+from .log import Log
+from .query import Query, ACTION_READ
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_META_FILENAME = "meta.json"
+
+# Status of an attribute for a given entry.
+STATUS_MISSING = 0  # The entry has no such key
+STATUS_VALUE = 1    # The entry maps the key to a value
+STATUS_NONE = 2     # The entry maps the key to None
+
+# Maps each column type to the typecode of its ".values" array.
+COLUMN_TYPECODES = {
+    "bool": "B",
+    "int": "q",
+    "float": "d",
+    "str": "I",  # Codes in the string dictionary
+}
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def infer_column_type(values: list) -> str:
+    """
+    Infers the type of a column.
+
+    Example:
+        >>> infer_column_type([1, 2, None])
+        'int'
+        >>> infer_column_type([1, 2.0])
+        'pickle'
+
+    Args:
+        values (list): The values (except ``None``) of the column.
+
+    Returns:
+        A value in ``{"bool", "int", "float", "str", "pickle"}``.
+    """
+    types = {type(value) for value in values if value is not None}
+    if types == {bool}:
+        return "bool"
+    elif types == {int}:
+        if all(INT64_MIN <= value <= INT64_MAX for value in values if value is not None):
+            return "int"
+    elif types == {float}:
+        return "float"
+    elif types == {str}:
+        return "str"
+    return "pickle"
+
+
+def save_snapshot(entries: list, directory: str):
+    """
+    Saves a list of entries in a snapshot.
+
+    Args:
+        entries (list): A list of minifold entries.
+        directory (str): The directory of the snapshot.
+    """
+    columns = dict()
+    for entry in entries:
+        for key in entry.keys():
+            columns.setdefault(key, None)
+
+    mkdir(directory)
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "num_entries": len(entries),
+        "columns": list(),
+    }
+    for (i, column) in enumerate(columns.keys()):
+        prefix = os.path.join(directory, "column_%d" % i)
+        status = bytes(
+            STATUS_MISSING if column not in entry
+            else STATUS_NONE if entry[column] is None
+            else STATUS_VALUE
+            for entry in entries
+        )
+        values = [entry.get(column) for entry in entries]
+        column_type = infer_column_type(values)
+        with open(prefix + ".status", "wb") as f:
+            f.write(status)
+        if column_type in {"bool", "int", "float"}:
+            default = False if column_type == "bool" else 0
+            with open(prefix + ".values", "wb") as f:
+                array(
+                    COLUMN_TYPECODES[column_type],
+                    (default if value is None else value for value in values)
+                ).tofile(f)
+        else:
+            if column_type == "str":
+                # String dictionary
+                codes = dict()
+                for value in values:
+                    if value is not None:
+                        codes.setdefault(value, len(codes))
+                with open(prefix + ".values", "wb") as f:
+                    array(
+                        COLUMN_TYPECODES[column_type],
+                        (0 if value is None else codes[value] for value in values)
+                    ).tofile(f)
+                blobs = (value.encode("utf-8") for value in codes.keys())
+            else:
+                blobs = (
+                    pickle.dumps(value)
+                    for (value, s) in zip(values, status)
+                    if s == STATUS_VALUE
+                )
+            offsets = array("q", [0])
+            with open(prefix + ".data", "wb") as f:
+                for blob in blobs:
+                    f.write(blob)
+                    offsets.append(offsets[-1] + len(blob))
+            with open(prefix + ".offsets", "wb") as f:
+                offsets.tofile(f)
+        meta["columns"].append({"name": column, "type": column_type, "prefix": "column_%d" % i})
+
+    # The metadata are written last: a snapshot without metadata is incomplete.
+    with open(os.path.join(directory, SNAPSHOT_META_FILENAME), "w") as f:
+        json.dump(meta, f, indent=4)
+
+
+def is_snapshot(directory: str) -> bool:
+    """
+    Checks whether a directory contains a (complete) snapshot.
+
+    Args:
+        directory (str): The directory of the snapshot.
+
+    Returns:
+        ``True`` iff ``directory`` contains a snapshot.
+    """
+    return os.path.exists(os.path.join(directory, SNAPSHOT_META_FILENAME))
+
+
+class SnapshotColumn:
+    """
+    :py:class:`SnapshotColumn` decodes on access the values of a column
+    of a :py:class:`Snapshot`.
+    """
+    def __init__(self, snapshot, name: str, column_type: str, prefix: str):
+        """
+        Constructor.
+
+        Args:
+            snapshot (Snapshot): The :py:class:`Snapshot` owning this column.
+            name (str): The name of the column.
+            column_type (str): The type of the column (see :py:func:`infer_column_type`).
+            prefix (str): The path prefix of the files storing the column.
+        """
+        self.m_name = name
+        self.m_type = column_type
+        self.m_status = snapshot.map(prefix + ".status", "B")
+        self.m_values = (
+            snapshot.map(prefix + ".values", COLUMN_TYPECODES[column_type])
+            if column_type in COLUMN_TYPECODES else None
+        )
+        if column_type in {"str", "pickle"}:
+            self.m_data = snapshot.map(prefix + ".data", "B")
+            self.m_offsets = snapshot.map(prefix + ".offsets", "q")
+        if column_type == "pickle":
+            # Index of each value in the pickled values.
+            self.m_ranks = None
+
+    @property
+    def name(self) -> str:
+        return self.m_name
+
+    @property
+    def type(self) -> str:
+        return self.m_type
+
+    def blob(self, j: int) -> memoryview:
+        """
+        Retrieves the ``j``-th blob of the data of this column.
+
+        Args:
+            j (int): The index of the blob.
+
+        Returns:
+            The corresponding bytes.
+        """
+        return self.m_data[self.m_offsets[j]:self.m_offsets[j + 1]]
+
+    def status(self, i: int) -> int:
+        """
+        Retrieves the status of this column for an entry.
+
+        Args:
+            i (int): The index of the entry.
+
+        Returns:
+            :py:data:`STATUS_MISSING`, :py:data:`STATUS_VALUE` or :py:data:`STATUS_NONE`.
+        """
+        return self.m_status[i]
+
+    def value(self, i: int) -> object:
+        """
+        Decodes the value of this column for an entry.
+        The entry must have a value for this column
+        (see :py:meth:`SnapshotColumn.status`).
+
+        Args:
+            i (int): The index of the entry.
+
+        Returns:
+            The decoded value.
+        """
+        if self.m_type == "bool":
+            return bool(self.m_values[i])
+        elif self.m_type in {"int", "float"}:
+            return self.m_values[i]
+        elif self.m_type == "str":
+            return str(self.blob(self.m_values[i]), "utf-8")
+        else:
+            if self.m_ranks is None:
+                # The pickled values are only stored for the STATUS_VALUE entries.
+                ranks = array("q")
+                rank = 0
+                for status in self.m_status:
+                    ranks.append(rank)
+                    rank += status == STATUS_VALUE
+                self.m_ranks = ranks
+            return pickle.loads(self.blob(self.m_ranks[i]))
+
+    def __getitem__(self, i: int) -> object:
+        status = self.m_status[i]
+        return self.value(i) if status == STATUS_VALUE else None
+
+
+class Snapshot(Sequence):
+    """
+    :py:class:`Snapshot` is a read-only sequence of minifold entries,
+    memory-mapped from a snapshot directory (see :py:func:`save_snapshot`).
+    Entries are decoded on access.
+    """
+    def __init__(self, directory: str):
+        """
+        Constructor.
+
+        Args:
+            directory (str): The directory of the snapshot.
+
+        Raises:
+            ValueError: if the snapshot is not supported.
+        """
+        self.m_directory = directory
+        self.m_maps = list()
+        with open(os.path.join(directory, SNAPSHOT_META_FILENAME)) as f:
+            meta = json.load(f)
+        if meta["version"] != SNAPSHOT_VERSION:
+            raise ValueError("Snapshot [%s]: unsupported version %s" % (directory, meta["version"]))
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError("Snapshot [%s]: unsupported byte order %s" % (directory, meta["byteorder"]))
+        self.m_num_entries = meta["num_entries"]
+        self.m_columns = {
+            column["name"]: SnapshotColumn(self, column["name"], column["type"], column["prefix"])
+            for column in meta["columns"]
+        }
+
+    def map(self, filename: str, typecode: str) -> memoryview:
+        """
+        Memory-maps a file of this snapshot.
+
+        Args:
+            filename (str): The name of the file.
+            typecode (str): The typecode of the items stored in the file
+                (see the ``array`` module).
+
+        Returns:
+            The corresponding ``memoryview``.
+        """
+        with open(os.path.join(self.m_directory, filename), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files can't be mapped.
+                return memoryview(array(typecode))
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.m_maps.append(m)
+        view = memoryview(m)
+        return view if typecode == "B" else view.cast(typecode)
+
+    def close(self):
+        """
+        Unmaps the files of this snapshot.
+        """
+        self.m_columns = dict()
+        for m in self.m_maps:
+            try:
+                m.close()
+            except BufferError:
+                # Some values are still referenced, the garbage collector
+                # will unmap the file.
+                pass
+        self.m_maps = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def directory(self) -> str:
+        return self.m_directory
+
+    @property
+    def columns(self) -> dict:
+        """
+        Retrieves the columns of this snapshot.
+
+        Returns:
+            A dict mapping each attribute with its :py:class:`SnapshotColumn`.
+        """
+        return self.m_columns
+
+    def __len__(self) -> int:
+        return self.m_num_entries
+
+    def entry(self, i: int, attributes: list = None) -> dict:
+        """
+        Decodes an entry.
+
+        Args:
+            i (int): The index of the entry.
+            attributes (list): The decoded attributes. Pass ``None``
+                to decode all of them.
+
+        Returns:
+            The decoded entry.
+        """
+        columns = (
+            self.m_columns.values() if attributes is None
+            else (self.m_columns[a] for a in attributes if a in self.m_columns)
+        )
+        entry = dict()
+        for column in columns:
+            status = column.status(i)
+            if status == STATUS_VALUE:
+                entry[column.name] = column.value(i)
+            elif status == STATUS_NONE:
+                entry[column.name] = None
+        return entry
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.entry(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Snapshot index out of range")
+        return self.entry(i)
+
+
+def load_snapshot(directory: str) -> Snapshot:
+    """
+    Loads a snapshot.
+
+    Args:
+        directory (str): The directory of the snapshot.
+
+    Returns:
+        The corresponding :py:class:`Snapshot` instance.
+    """
+    return Snapshot(directory)
+
+
+def cache_to_snapshot(cache_filename: str, directory: str, load_cache: callable = pickle.load, read_mode: str = "rb"):
+    """
+    Converts a cache (e.g., a :py:class:`PickleCachedConnector` or a
+    :py:class:`JsonCachedConnector` cache) to a snapshot.
+
+    Args:
+        cache_filename (str): The path to the cache.
+        directory (str): The directory of the snapshot.
+        load_cache (callable): The function loading the cache
+            (e.g., ``pickle.load`` or ``json.load``).
+        read_mode (str): ``"rb"`` (binary cache) or ``"r"`` (text-based cache).
+    """
+    with open(cache_filename, read_mode) as f:
+        entries = load_cache(f)
+    save_snapshot(entries, directory)
+
+
+def snapshot_to_cache(directory: str, cache_filename: str, save_cache: callable = pickle.dump, write_mode: str = "wb"):
+    """
+    Converts a snapshot to a cache (e.g., a :py:class:`PickleCachedConnector`
+    or a :py:class:`JsonCachedConnector` cache).
+
+    Args:
+        directory (str): The directory of the snapshot.
+        cache_filename (str): The path to the cache.
+        save_cache (callable): The function saving the cache
+            (e.g., ``pickle.dump`` or ``json.dump``).
+        write_mode (str): ``"wb"`` (binary cache) or ``"w"`` (text-based cache).
+    """
+    with Snapshot(directory) as snapshot:
+        entries = list(snapshot)
+    if os.path.dirname(cache_filename):
+        mkdir(os.path.dirname(cache_filename))
+    with open(cache_filename, write_mode) as f:
+        save_cache(entries, f)
+
+
+def pickle_to_snapshot(cache_filename: str, directory: str):
+    """
+    Converts a pickle cache to a snapshot.
+    See :py:func:`cache_to_snapshot`.
+    """
+    cache_to_snapshot(cache_filename, directory, pickle.load, "rb")
+
+
+def json_to_snapshot(cache_filename: str, directory: str):
+    """
+    Converts a JSON cache to a snapshot.
+    See :py:func:`cache_to_snapshot`.
+    """
+    cache_to_snapshot(cache_filename, directory, json.load, "r")
+
+
+def snapshot_to_pickle(directory: str, cache_filename: str):
+    """
+    Converts a snapshot to a pickle cache.
+    See :py:func:`snapshot_to_cache`.
+    """
+    snapshot_to_cache(directory, cache_filename, pickle.dump, "wb")
+
+
+def snapshot_to_json(directory: str, cache_filename: str):
+    """
+    Converts a snapshot to a JSON cache.
+    See :py:func:`snapshot_to_cache`.
+    """
+    snapshot_to_cache(directory, cache_filename, json.dump, "w")
+
+
+class SnapshotConnector(EntriesConnector):
+    """
+    The :py:class:`SnapshotConnector` class is an :py:class:`EntriesConnector`
+    serving the entries of a :py:class:`Snapshot`. The entries are decoded
+    lazily, and only the queried attributes are decoded when possible.
+    """
+    def __init__(self, directory: str, load_entries: callable = None):
+        """
+        Constructor.
+
+        Args:
+            directory (str): The directory of the snapshot.
+            load_entries (callable): A function called to populate the
+                snapshot if it does not exist yet, or ``None``.
+        """
+        if not is_snapshot(directory) and load_entries:
+            Log.info("%s: Saving data into snapshot [%s]" % (type(self), directory))
+            save_snapshot(load_entries(), directory)
+        snapshot = Snapshot(directory)
+        Log.info("%s: Loaded %d entries from [%s]" % (type(self), len(snapshot), directory))
+        # Bypass EntriesConnector.__init__, which would decode every entry.
+        super(EntriesConnector, self).__init__()
+        self.m_keys = set(snapshot.columns.keys())
+        self.m_entries = snapshot
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.m_entries.close()
+
+    def query(self, query: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input Query.
+        """
+        if query.action != ACTION_READ or query.filters is not None:
+            return super().query(query)
+
+        # Without filter, only the selected entries and attributes are decoded.
+        snapshot = self.m_entries
+        start = query.offset if query.offset else 0
+        stop = len(snapshot) if query.limit is None else min(start + query.limit, len(snapshot))
+        attributes = (
+            [a for a in query.attributes if a in self.m_keys] if query.attributes
+            else list(snapshot.columns.keys())
+        )
+        ret = list()
+        for i in range(start, stop):
+            entry = snapshot.entry(i, attributes)
+            for attribute in attributes:
+                entry.setdefault(attribute, None)
+            ret.append(entry)
+        return self.answer(query, ret)
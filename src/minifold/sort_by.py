@@ -4,73 +4,264 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+import heapq
+import json
+import pickle
+import tempfile
+from itertools import islice
 from .connector import Connector
-from .query import Query
+from .query import Query, SORT_ASC, SORT_DESC
 from .values_from_dict import ValuesFromDictFonctor
 
 
-def sort_by_impl(
-    functor: ValuesFromDictFonctor,
-    entries: list,
-    desc: bool = True
-) -> list:
+class PickleRunCodec:
+    """
+    Serializes the sorted runs spilled by :py:func:`external_sort`
+    using ``pickle`` (supports any picklable value).
     """
-    Implementation details of :func:`sort_by`.
+    binary = True
+
+    @staticmethod
+    def dump(entries: iter, f):
+        for entry in entries:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(f) -> iter:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+class JsonRunCodec:
+    """
+    Serializes the sorted runs spilled by :py:func:`external_sort`
+    using JSON lines (only supports JSON values).
+    """
+    binary = False
+
+    @staticmethod
+    def dump(entries: iter, f):
+        for entry in entries:
+            f.write(json.dumps(entry))
+            f.write("\n")
+
+    @staticmethod
+    def load(f) -> iter:
+        for line in f:
+            yield json.loads(line)
+
+
+# Maps each codec name with the corresponding class.
+SORT_RUN_CODECS = {
+    "pickle": PickleRunCodec,
+    "json": JsonRunCodec,
+}
+
+
+class MixedOrderKey:
+    """
+    Sorting key mixing ascending and descending orders, used when
+    the sorted values can't be negated (e.g., strings).
+    """
+    __slots__ = ("values", "orders")
+
+    def __init__(self, values: tuple, orders: tuple):
+        """
+        Constructor.
+
+        Args:
+            values (tuple): The values extracted from an entry.
+            orders (tuple): The order (:py:data:`SORT_ASC` or :py:data:`SORT_DESC`)
+                of each value.
+        """
+        self.values = values
+        self.orders = orders
+
+    def __eq__(self, other) -> bool:
+        # Needed by heapq.merge to break ties using the order of the runs.
+        return self.values == other.values
+
+    def __lt__(self, other) -> bool:
+        for (a, b, order) in zip(self.values, other.values, self.orders):
+            if a == b:
+                continue
+            return a < b if order == SORT_ASC else b < a
+        return False
+
+
+def make_sort_key(attributes: object, desc: bool = False) -> tuple:
+    """
+    Crafts the key function used to sort entries.
 
     Args:
-        functor (ValuesFromDictFonctor): The functor allowing to extract
-            the values used to sort the entries.
-        entries (list): A list of minifold entries.
-        desc (bool): Pass ``True`` to sort by ascending order,
-            ``False`` otherwise.
+        attributes (object): The list of entry keys used to sort, or a dictionary
+            mapping each of these keys with its order (:py:data:`SORT_ASC` or
+            :py:data:`SORT_DESC`), formatted like :py:attr:`Query.sort_by`.
+        desc (bool): Pass ``True`` to sort by descending order. Ignored if
+            ``attributes`` is a dictionary.
 
     Returns:
-        The sorted entries, with respect to ``functor``.
+        A ``(key, reverse)`` pair, that can be passed to ``sorted``
+        and ``heapq.merge``.
     """
-    return sorted(entries, key=functor, reverse=desc)
+    if not isinstance(attributes, dict):
+        return (ValuesFromDictFonctor(attributes), desc)
+    functor = ValuesFromDictFonctor(list(attributes.keys()))
+    orders = tuple(attributes.values())
+    if all(order == SORT_ASC for order in orders):
+        return (functor, False)
+    elif all(order == SORT_DESC for order in orders):
+        return (functor, True)
+    return (lambda entry: MixedOrderKey(functor(entry), orders), False)
+
+
+def external_sort(
+    entries: iter,
+    key: callable,
+    reverse: bool = False,
+    max_run_size: int = None,
+    codec: str = "pickle",
+    temp_dir: str = None
+) -> iter:
+    """
+    Sorts entries, possibly larger than the memory. The input entries are
+    split in runs of ``max_run_size`` entries. Each run is sorted and spilled
+    into a temporary file, then the runs are merged. The sort is stable.
+
+    Args:
+        entries (iter): An iterable over minifold entries.
+        key (callable): The key function (see ``sorted``).
+        reverse (bool): Pass ``True`` to sort by descending order.
+        max_run_size (int): The maximal number of entries sorted in memory,
+            or ``None`` to sort all the entries in memory.
+        codec (str): The serialization of the spilled runs
+            (a key of :py:data:`SORT_RUN_CODECS`).
+        temp_dir (str): The directory storing the spilled runs, or ``None``
+            to use the default temporary directory.
+
+    Returns:
+        An iterator over the sorted entries.
+    """
+    if max_run_size is None:
+        yield from sorted(entries, key=key, reverse=reverse)
+        return
+
+    codec = SORT_RUN_CODECS[codec]
+    entries = iter(entries)
+    runs = list()
+    try:
+        while True:
+            run = sorted(islice(entries, max_run_size), key=key, reverse=reverse)
+            if not runs and len(run) < max_run_size:
+                # The entries fit in memory.
+                yield from run
+                return
+            if not run:
+                break
+            f = tempfile.TemporaryFile(
+                mode="w+b" if codec.binary else "w+",
+                dir=temp_dir
+            )
+            runs.append(f)
+            codec.dump(run, f)
+            del run
+        for f in runs:
+            f.seek(0)
+        # heapq.merge is stable: ties are yielded in the order of the runs.
+        yield from heapq.merge(
+            *[codec.load(f) for f in runs],
+            key=key,
+            reverse=reverse
+        )
+    finally:
+        for f in runs:
+            f.close()
 
 
 def sort_by(
-    attributes: list,
-    entries: list,
-    desc: bool = False
+    attributes: object,
+    entries: iter,
+    desc: bool = False,
+    **kwargs
 ) -> list:
     """
     Sorts a list of minifold entries.
 
+    Example:
+        >>> from minifold.query import SORT_ASC, SORT_DESC
+        >>> sort_by({"a": SORT_ASC, "b": SORT_DESC}, [{"a": 1, "b": "x"}, {"a": 0, "b": "y"}, {"a": 1, "b": "z"}])
+        [{'a': 0, 'b': 'y'}, {'a': 1, 'b': 'z'}, {'a': 1, 'b': 'x'}]
+
     Args:
-        attributes (list): The list of entry keys used to sort.
-        entries (list): A list of minifold entries.
+        attributes (object): The list of entry keys used to sort, or a dictionary
+            mapping each of these keys with its order (see :py:func:`make_sort_key`).
+        entries (iter): An iterable over minifold entries.
         desc (bool): Pass ``True`` to sort by ascending order,
             ``False`` otherwise.
+        kwargs: Parameters passed to :py:func:`external_sort`
+            (e.g., ``max_run_size``, ``codec``).
 
     Returns:
         The sorted entries, with respect to ``functor``.
     """
-    functor = ValuesFromDictFonctor(attributes)
-    return sort_by_impl(functor, entries, desc)
+    (key, reverse) = make_sort_key(attributes, desc)
+    return list(external_sort(entries, key, reverse, **kwargs))
 
 
 class SortByConnector(Connector):
     """
     The :py:class:`SortByConnector` class implements the SORT BY
     statement in a minifold pipeline.
+
+    If the number of entries exceeds ``max_run_size``, sorted runs are
+    spilled into temporary files and merged (see :py:func:`external_sort`).
     """
-    def __init__(self, attributes: list, child: Connector, desc: bool = False):
+    def __init__(
+        self,
+        attributes: object,
+        child: Connector,
+        desc: bool = False,
+        max_run_size: int = None,
+        codec: str = "pickle",
+        temp_dir: str = None
+    ):
         """
         Constructor.
 
         Args:
-            attributes (list): The list of entry keys used to sort.
+            attributes (object): The list of entry keys used to sort, or a dictionary
+                mapping each of these keys with its order (:py:data:`SORT_ASC` or
+                :py:data:`SORT_DESC`), formatted like :py:attr:`Query.sort_by`.
             child (Connector): The child minifold :py:class:`Connector`
                 instance.
-        desc (bool): Pass ``True`` to sort by ascending order,
-            ``False`` otherwise.
+            desc (bool): Pass ``True`` to sort by ascending order,
+                ``False`` otherwise.
+            max_run_size (int): The maximal number of entries sorted in memory,
+                or ``None`` to sort all the entries in memory.
+            codec (str): The serialization of the spilled runs
+                (a key of :py:data:`SORT_RUN_CODECS`).
+            temp_dir (str): The directory storing the spilled runs, or ``None``
+                to use the default temporary directory.
         """
         super().__init__()
-        self.m_functor = ValuesFromDictFonctor(attributes)
+        if codec not in SORT_RUN_CODECS:
+            raise ValueError("Invalid codec %r, valid codecs are %s" % (codec, sorted(SORT_RUN_CODECS.keys())))
+        self.m_functor = ValuesFromDictFonctor(
+            list(attributes.keys()) if isinstance(attributes, dict) else attributes
+        )
+        (self.m_key, self.m_reverse) = make_sort_key(attributes, desc)
+        self.m_orders = (
+            list(attributes.values()) if isinstance(attributes, dict)
+            else [SORT_DESC if desc else SORT_ASC] * len(self.m_functor.attributes)
+        )
         self.m_child = child
         self.m_desc = desc
+        self.m_max_run_size = max_run_size
+        self.m_codec = codec
+        self.m_temp_dir = temp_dir
 
     def attributes(self, object: str) -> set:
         """
@@ -107,6 +298,26 @@ class SortByConnector(Connector):
         """
         return self.m_desc
 
+    def query_gen(self, q: Query) -> iter:
+        """
+        Handles an input :py:class:`Query` instance and iterates over
+        the sorted entries.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        return external_sort(
+            self.m_child.query_gen(q),
+            self.m_key,
+            self.m_reverse,
+            self.m_max_run_size,
+            self.m_codec,
+            self.m_temp_dir
+        )
+
     def query(self, q: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -118,14 +329,20 @@ class SortByConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(q)
-        return self.answer(
-            q,
-            sort_by_impl(
-                self.m_functor,
-                self.m_child.query(q),
-                self.m_desc
-            )
-        )
+        return self.answer(q, list(self.query_gen(q)))
+
+    def count(self, q: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+        Sorting does not change the count, hence it is delegated to the child.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        return self.m_child.count(q)
 
     def __str__(self) -> str:
         """
@@ -136,7 +353,13 @@ class SortByConnector(Connector):
             The string representation of this
             :py:class:`SortByConnector` instance
         """
-        return "SORT BY %s %s" % (
-            ", ".join(self.m_functor.attributes),
-            "DESC" if self.desc else "ASC"
+        orders = set(self.m_orders)
+        if len(orders) <= 1:
+            return "SORT BY %s %s" % (
+                ", ".join(self.m_functor.attributes),
+                "DESC" if self.m_reverse else "ASC"
+            )
+        return "SORT BY %s" % ", ".join(
+            "%s %s" % (attribute, "ASC" if order == SORT_ASC else "DESC")
+            for (attribute, order) in zip(self.m_functor.attributes, self.m_orders)
         )
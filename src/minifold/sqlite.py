@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import operator
+import sqlite3
+import threading
+from itertools import islice
+from .binary_predicate import BinaryPredicate, __in__, from_conjuncts, to_conjuncts
+from .connector import Connector
+from .count import clip_count
+from .lambdas import find_filters_dependencies_static
+from .query import (
+    ACTION_CREATE, ACTION_DELETE, ACTION_READ, ACTION_UPDATE,
+    Query, SORT_ASC, action_to_str
+)
+
+# Number of rows fetched (resp. written) per batch by the SqliteConnector.
+DEFAULT_SQLITE_BATCH_SIZE = 1000
+
+# Attribute storing the SQLite rowid when the rows are filtered locally.
+SQLITE_ROWID = "_minifold_rowid"
+
+# Maps minifold operators to the corresponding SQL operators.
+SQL_COMPARISON_OPERATORS = {
+    operator.__gt__: ">",
+    operator.__ge__: ">=",
+    operator.__lt__: "<",
+    operator.__le__: "<=",
+}
+
+SQL_LOGICAL_OPERATORS = {
+    operator.__and__: "AND",
+    operator.__or__: "OR",
+}
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Quotes an SQL identifier (e.g., a table or a column name).
+
+    Example:
+        >>> print(quote_identifier('my "table'))
+        "my ""table"
+
+    Args:
+        name (str): The identifier.
+
+    Returns:
+        The quoted identifier.
+    """
+    return '"%s"' % name.replace('"', '""')
+
+
+class SqliteConnector(Connector):
+    """
+    The :py:class:`SqliteConnector` is a minifold gateway allowing
+    to manipulate data stored in a SQLite database.
+
+    The attributes (i.e., the selected columns), the filters (or the part
+    of the filters made of :py:class:`BinaryPredicate` instances that can be
+    translated to SQL), the SORT BY, OFFSET and LIMIT clauses are evaluated
+    by SQLite. The other filters (e.g., lambdas) are evaluated locally.
+
+    The connection may be used by several threads (e.g., if the
+    connector runs in a :py:class:`PipelineConnector`): each access
+    to the connection is serialized by :py:attr:`self.lock`.
+    """
+    def __init__(self, filename: str, batch_size: int = DEFAULT_SQLITE_BATCH_SIZE):
+        """
+        Constructor.
+
+        Args:
+            filename (str): The path to the SQLite database
+                (or ``":memory:"``).
+            batch_size (int): The number of rows fetched (resp. written)
+                per batch.
+        """
+        super().__init__()
+        self.m_filename = filename
+        self.m_batch_size = batch_size
+        self.m_lock = threading.RLock()
+        self.m_connection = self.connect(filename)
+
+    def connect(self, filename: str) -> sqlite3.Connection:
+        """
+        Connects to a SQLite database. The connection is not bound
+        to the calling thread (see :py:attr:`self.lock`).
+
+        Args:
+            filename (str): The path to the SQLite database.
+
+        Returns:
+            The corresponding :py:class:`sqlite3.Connection` instance.
+        """
+        return sqlite3.connect(filename, check_same_thread=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        with self.m_lock:
+            self.m_connection.close()
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        Retrieves the lock serializing the accesses to the connection.
+
+        Returns:
+            The :py:class:`threading.RLock` instance.
+        """
+        return self.m_lock
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Retrieves the connection to the SQLite database.
+
+        Returns:
+            The :py:class:`sqlite3.Connection` instance.
+        """
+        return self.m_connection
+
+    @property
+    def batch_size(self) -> int:
+        """
+        Retrieves the number of rows fetched (resp. written) per batch.
+
+        Returns:
+            The batch size.
+        """
+        return self.m_batch_size
+
+    def columns(self, object: str) -> list:
+        """
+        Lists the columns of a table.
+
+        Args:
+            object (str): The name of the table.
+
+        Returns:
+            The list of column names, in the table order.
+        """
+        with self.m_lock:
+            cursor = self.connection.execute(
+                "PRAGMA table_info(%s)" % quote_identifier(object)
+            )
+            return [row[1] for row in cursor.fetchall()]
+
+    def attributes(self, object: str) -> set:
+        """
+        Lists the available attributes related to a given collection of
+        minifold entries exposed by this :py:class:`SqliteConnector` instance.
+
+        Args:
+            object (str): The name of the table.
+
+        Returns:
+            The set of corresponding attributes.
+        """
+        return set(self.columns(object))
+
+    @staticmethod
+    def binary_predicate_to_sql(p: BinaryPredicate) -> tuple:
+        """
+        Converts a :py:class:`BinaryPredicate` to the corresponding
+        parameterized SQL condition.
+
+        Example:
+            >>> SqliteConnector.binary_predicate_to_sql(
+            ...     BinaryPredicate(BinaryPredicate("a", "<=", 10), "||", BinaryPredicate("b", "IN", (2, 3)))
+            ... )
+            ('("a" <= ?) OR ("b" IN (?, ?))', [10, 2, 3])
+
+        Args:
+            p (BinaryPredicate): A :py:class:`BinaryPredicate` instance.
+
+        Raises:
+            ValueError: if ``p`` cannot be translated to SQL.
+
+        Returns:
+            A ``(sql, parameters)`` pair, where ``sql`` is the SQL condition
+            and ``parameters`` the list of values bound to its placeholders.
+        """
+        if not isinstance(p, BinaryPredicate):
+            raise ValueError("binary_predicate_to_sql: %r is not a BinaryPredicate" % p)
+        if p.operator in SQL_LOGICAL_OPERATORS:
+            (sql_left, params_left) = SqliteConnector.binary_predicate_to_sql(p.left)
+            (sql_right, params_right) = SqliteConnector.binary_predicate_to_sql(p.right)
+            return (
+                "(%s) %s (%s)" % (sql_left, SQL_LOGICAL_OPERATORS[p.operator], sql_right),
+                params_left + params_right
+            )
+        if not isinstance(p.left, str):
+            raise ValueError("binary_predicate_to_sql: the left operand of %s must be a string" % p)
+        column = quote_identifier(p.left)
+        if p.operator in SQL_COMPARISON_OPERATORS:
+            return ("%s %s ?" % (column, SQL_COMPARISON_OPERATORS[p.operator]), [p.right])
+        elif p.operator == operator.__eq__:
+            # "IS" also matches NULL with None.
+            return ("%s %s ?" % (column, "IS" if p.right is None else "="), [p.right])
+        elif p.operator == operator.__ne__:
+            # Like in python, NULL differs from any non-NULL value.
+            return ("%s IS NOT ?" % column, [p.right])
+        elif p.operator == __in__:
+            values = list(p.right)
+            if not values:
+                return ("0", list())
+            return ("%s IN (%s)" % (column, ", ".join("?" * len(values))), values)
+        elif p.operator == operator.__contains__ and isinstance(p.right, str):
+            # "CONTAINS" on a string means "substring".
+            return ("instr(%s, ?) > 0" % column, [p.right])
+        raise ValueError("binary_predicate_to_sql: unsupported operator in %s" % p)
+
+    @staticmethod
+    def filters_to_sql(filters: object) -> tuple:
+        """
+        Splits a minifold filter into the conjuncts evaluated by SQLite
+        and the ones evaluated locally.
+
+        Args:
+            filters (object): A minifold filter or ``None``.
+
+        Returns:
+            A ``(sql, parameters, keep_if)`` tuple, where ``sql`` is the SQL
+            condition (``None`` if no conjunct can be translated), ``parameters``
+            the list of values bound to its placeholders, and ``keep_if``
+            the filter to apply locally (``None`` if not needed).
+        """
+        sql_conditions = list()
+        parameters = list()
+        local_conjuncts = list()
+        for conjunct in to_conjuncts(filters):
+            try:
+                (sql, params) = SqliteConnector.binary_predicate_to_sql(conjunct)
+                sql_conditions.append("(%s)" % sql)
+                parameters += params
+            except ValueError:
+                local_conjuncts.append(conjunct)
+        return (
+            " AND ".join(sql_conditions) if sql_conditions else None,
+            parameters,
+            from_conjuncts(local_conjuncts)
+        )
+
+    @staticmethod
+    def sort_by_to_sql(sort_by: dict) -> str:
+        """
+        Converts the SORT BY part of a :py:class:`Query` to the corresponding
+        ORDER BY clause.
+
+        Args:
+            sort_by (dict): The SORT BY part of a :py:class:`Query` instance.
+
+        Returns:
+            The corresponding ORDER BY clause.
+        """
+        return "ORDER BY " + ", ".join(
+            "%s %s" % (quote_identifier(attribute), "ASC" if sort_asc == SORT_ASC else "DESC")
+            for (attribute, sort_asc) in sort_by.items()
+        )
+
+    def fetch(self, sql: str, parameters: list) -> iter:
+        """
+        Runs a SELECT statement and streams the resulting rows
+        by batches of ``self.batch_size`` rows.
+
+        Args:
+            sql (str): The SELECT statement.
+            parameters (list): The values bound to the placeholders of ``sql``.
+
+        Returns:
+            An iterator over the corresponding entries.
+        """
+        # The lock is not held while the entries are yielded.
+        with self.m_lock:
+            cursor = self.connection.execute(sql, parameters)
+        try:
+            keys = [description[0] for description in cursor.description]
+            while True:
+                with self.m_lock:
+                    rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(keys, row))
+        finally:
+            with self.m_lock:
+                cursor.close()
+
+    def select(self, query: Query, with_rowid: bool = False) -> iter:
+        """
+        Streams the entries matching the WHERE, SORT BY, OFFSET and LIMIT
+        clauses of a :py:class:`Query`. If ``query.attributes`` is set, only
+        the corresponding columns and the ones needed by the filters evaluated
+        locally are selected.
+
+        Args:
+            query (Query): The handled query.
+            with_rowid (bool): Pass ``True`` to retrieve the ``rowid``
+                of each row (see :py:data:`SQLITE_ROWID`).
+
+        Returns:
+            An iterator over the matching entries.
+        """
+        (where, parameters, keep_if) = SqliteConnector.filters_to_sql(query.filters)
+        columns = "*"
+        if query.attributes:
+            needed_columns = find_filters_dependencies_static(keep_if)
+            if needed_columns is not None:
+                needed_columns |= set(query.attributes)
+                # The missing attributes must not be selected: SQLite would
+                # interpret their quoted names as string literals.
+                columns = ", ".join(
+                    quote_identifier(column)
+                    for column in self.columns(query.object)
+                    if column in needed_columns
+                ) or "NULL"
+        sql = "SELECT %s%s FROM %s" % (
+            "rowid AS %s, " % quote_identifier(SQLITE_ROWID) if with_rowid else "",
+            columns,
+            quote_identifier(query.object)
+        )
+        if where:
+            sql += " WHERE " + where
+        if query.sort_by:
+            sql += " " + SqliteConnector.sort_by_to_sql(query.sort_by)
+
+        if keep_if is None:
+            # OFFSET, LIMIT
+            if query.limit is not None or query.offset:
+                sql += " LIMIT ? OFFSET ?"
+                parameters += [
+                    query.limit if query.limit is not None else -1,
+                    query.offset if query.offset else 0
+                ]
+            yield from self.fetch(sql, parameters)
+        else:
+            # OFFSET and LIMIT must be applied after the filtering.
+            entries = (entry for entry in self.fetch(sql, parameters) if keep_if(entry))
+            start = query.offset if query.offset else 0
+            stop = start + query.limit if query.limit is not None else None
+            yield from islice(entries, start, stop)
+
+    def query_gen(self, query: Query) -> iter:
+        """
+        Handles an input :py:class:`Query` instance and iterates over the
+        matching rows as they are fetched from the SQLite cursor.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        if query.action != ACTION_READ:
+            raise RuntimeError(
+                "SqliteConnector.query_gen: %s not supported" % action_to_str(query.action)
+            )
+        entries = self.select(query)
+        if not query.attributes:
+            yield from entries
+        else:
+            # Strip the columns needed by the local filters, add the missing attributes.
+            for entry in entries:
+                yield {
+                    attribute: entry.get(attribute)
+                    for attribute in query.attributes
+                }
+
+    def count(self, query: Query) -> int:
+        """
+        Counts the rows matching an input :py:class:`Query` instance.
+        If the filters can be translated to SQL, the rows are counted
+        by SQLite (``SELECT COUNT(*)``), otherwise they are streamed
+        and counted locally.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        if query.action != ACTION_READ:
+            raise RuntimeError(
+                "SqliteConnector.count: %s not supported" % action_to_str(query.action)
+            )
+        (where, parameters, keep_if) = SqliteConnector.filters_to_sql(query.filters)
+        if keep_if is not None:
+            return super().count(query)
+        sql = "SELECT COUNT(*) FROM %s" % quote_identifier(query.object)
+        if where:
+            sql += " WHERE " + where
+        with self.m_lock:
+            cursor = self.connection.execute(sql, parameters)
+            try:
+                (n,) = cursor.fetchone()
+            finally:
+                cursor.close()
+        return clip_count(n, query.offset, query.limit)
+
+    def insert(self, query: Query):
+        """
+        Inserts the entries stored in ``query.values``.
+        Entries are inserted by batches of ``self.batch_size`` rows.
+
+        Args:
+            query (Query): The handled ``INSERT`` query.
+        """
+        table = quote_identifier(query.object)
+        batch = list()
+        keys = None
+
+        def flush():
+            if batch:
+                self.connection.executemany(
+                    "INSERT INTO %s (%s) VALUES (%s)" % (
+                        table,
+                        ", ".join(quote_identifier(key) for key in keys),
+                        ", ".join("?" * len(keys))
+                    ),
+                    batch
+                )
+                batch.clear()
+
+        with self.m_lock, self.connection:
+            for entry in query.values if query.values else list():
+                entry_keys = tuple(entry.keys())
+                if entry_keys != keys or len(batch) == self.batch_size:
+                    flush()
+                    keys = entry_keys
+                batch.append(tuple(entry.values()))
+            flush()
+
+    def update(self, query: Query):
+        """
+        Updates the entries matching ``query.filters`` according
+        to ``query.values``.
+
+        Args:
+            query (Query): The handled ``UPDATE`` query.
+        """
+        if not query.values:
+            return
+        assignments = ", ".join(
+            "%s = ?" % quote_identifier(attribute)
+            for attribute in query.values.keys()
+        )
+        values = list(query.values.values())
+        self.write(
+            query,
+            "UPDATE %s SET %s" % (quote_identifier(query.object), assignments),
+            values
+        )
+
+    def delete(self, query: Query):
+        """
+        Deletes the entries matching ``query.filters``.
+
+        Args:
+            query (Query): The handled ``DELETE`` query.
+        """
+        self.write(query, "DELETE FROM %s" % quote_identifier(query.object), list())
+
+    def write(self, query: Query, sql: str, parameters: list):
+        """
+        Runs an ``UPDATE`` or ``DELETE`` statement on the rows matching
+        ``query.filters``. If the filters can't be fully translated to SQL,
+        the matching rows are selected, filtered locally, and the statement
+        is applied to their ``rowid`` by batches of ``self.batch_size`` rows.
+
+        Args:
+            query (Query): The handled query.
+            sql (str): The statement, without its WHERE clause.
+            parameters (list): The values bound to the placeholders of ``sql``.
+        """
+        (where, where_parameters, keep_if) = SqliteConnector.filters_to_sql(query.filters)
+        with self.m_lock, self.connection:
+            if keep_if is None:
+                if where:
+                    sql += " WHERE " + where
+                self.connection.execute(sql, parameters + where_parameters)
+            else:
+                select_query = Query(object=query.object, filters=query.filters)
+                rowids = [
+                    entry[SQLITE_ROWID]
+                    for entry in list(self.select(select_query, with_rowid=True))
+                ]
+                sql += " WHERE rowid = ?"
+                for i in range(0, len(rowids), self.batch_size):
+                    self.connection.executemany(
+                        sql,
+                        (parameters + [rowid] for rowid in rowids[i:i + self.batch_size])
+                    )
+
+    def query(self, query: Query) -> list:
+        """
+        Handles an input :py:class:`Query` instance.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The list of entries matching the input query. The write
+            queries (``INSERT``, ``UPDATE``, ``DELETE``) return an empty list.
+        """
+        super().query(query)
+        if query.action == ACTION_READ:
+            ret = list(self.query_gen(query))
+        elif query.action == ACTION_CREATE:
+            self.insert(query)
+            ret = list()
+        elif query.action == ACTION_UPDATE:
+            self.update(query)
+            ret = list()
+        elif query.action == ACTION_DELETE:
+            self.delete(query)
+            ret = list()
+        else:
+            raise RuntimeError("SqliteConnector.query: invalid action %s" % query.action)
+        return self.answer(query, ret)
@@ -6,13 +6,17 @@
 # https://github.com/nokia/minifold
 
 import datetime
+import os
+import pickle
+from .cache import DEFAULT_CACHE_STORAGE_BASE_DIR
 from .connector import Connector
+from .filesystem import check_writable_directory, mkdir
+from .log import Log
 from .query import ACTION_READ, Query
 
 try:
     import tweepy
 except ImportError as e:
-    from .log import Log
     Log.warning(
         "Please install requests-cache.\n"
         "  APT: sudo apt install python3-tweepy\n"
@@ -20,6 +24,12 @@ except ImportError as e:
     )
     raise e
 
+# Maximal number of tweets returned by a Twitter timeline request.
+TWITTER_PAGE_SIZE = 200
+
+# Default directory storing the timelines fetched in incremental mode.
+DEFAULT_TWITTER_STORE_DIR = os.path.join(DEFAULT_CACHE_STORAGE_BASE_DIR, "twitter")
+
 
 def tweet_to_dict(tweet) -> dict:
     """
@@ -93,6 +103,12 @@ class TwitterConnector(Connector):
     """
     The :py:class:`TwitterConnector` is a gateway minifold allowing
     to fetch tweets from Twitter.
+
+    In incremental mode, the tweets of each timeline (``"self"``,
+    ``"feed"``) are stored locally. Each query only fetches the
+    tweets posted since the last query (``since_id``), and the older
+    tweets (``max_id``) only if the local timeline is too short to
+    answer the query.
     """
     def __init__(
         self,
@@ -100,7 +116,10 @@ class TwitterConnector(Connector):
         consumer_key: str,
         consumer_secret: str,
         access_token: str,
-        access_token_secret: str
+        access_token_secret: str,
+        incremental: bool = False,
+        store_dir: str = None,
+        page_size: int = TWITTER_PAGE_SIZE
     ):
         """
         Constructor.
@@ -111,6 +130,10 @@ class TwitterConnector(Connector):
             consumer_secret (str): The Twitter secret.
             access_token (str): The Twitter access token.
             access_token_secret: The Twitter access token secret.
+            incremental (bool): Pass ``True`` to enable the incremental mode.
+            store_dir (str): The directory storing the timelines in incremental mode.
+                Defaults to :py:data:`DEFAULT_TWITTER_STORE_DIR`.
+            page_size (int): The maximal number of tweets fetched per API call.
         """
         super().__init__()
         self.twitter_id = twitter_id
@@ -118,6 +141,9 @@ class TwitterConnector(Connector):
         self.consumer_secret = consumer_secret
         self.access_token = access_token
         self.access_token_secret = access_token_secret
+        self.incremental = incremental
+        self.store_dir = store_dir if store_dir else DEFAULT_TWITTER_STORE_DIR
+        self.page_size = min(page_size, TWITTER_PAGE_SIZE)
         self.api = None
         self.connect()
 
@@ -151,6 +177,139 @@ class TwitterConnector(Connector):
         auth.set_access_token(self.access_token, self.access_token_secret)
         self.api = tweepy.API(auth)
 
+    def fetch(
+        self,
+        object: str,
+        since_id: int = None,
+        max_id: int = None,
+        limit: int = None
+    ) -> iter:
+        """
+        Fetches the tweets of a timeline, from the newest to the oldest,
+        using a ``max_id`` cursor pagination.
+
+        Args:
+            object (str): The timeline, either ``"self"`` or ``"feed"``.
+            since_id (int): Only fetches the tweets newer than this ID, if set.
+            max_id (int): Only fetches the tweets older or equal to this ID, if set.
+            limit (int): The maximal number of fetched tweets, or ``None``
+                to fetch the whole timeline.
+
+        Returns:
+            An iterator over the ``(id, entry)`` pairs.
+        """
+        if object == "self":
+            timeline = self.api.user_timeline
+        elif object == "feed":
+            timeline = self.api.home_timeline
+        else:
+            raise ValueError(f"Invalid object '{object}'")
+
+        num_fetched = 0
+        while limit is None or num_fetched < limit:
+            count = self.page_size if limit is None else min(self.page_size, limit - num_fetched)
+            kwargs = {"id": self.twitter_id, "tweet_mode": "extended", "count": count}
+            if since_id is not None:
+                kwargs["since_id"] = since_id
+            if max_id is not None:
+                kwargs["max_id"] = max_id
+            tweets = timeline(**kwargs)
+            if not tweets:
+                break
+            for tweet in tweets:
+                yield (tweet.id, tweet_to_dict(tweet))
+            num_fetched += len(tweets)
+            max_id = min(tweet.id for tweet in tweets) - 1
+
+    def store_filename(self, object: str) -> str:
+        """
+        Crafts the path of the file storing a timeline in incremental mode.
+
+        Args:
+            object (str): The timeline, either ``"self"`` or ``"feed"``.
+
+        Returns:
+            The path of the pickle file.
+        """
+        return os.path.join(self.store_dir, f"{self.twitter_id}_{object}.pkl")
+
+    def load_timeline(self, object: str) -> dict:
+        """
+        Loads a timeline stored in incremental mode.
+
+        Args:
+            object (str): The timeline, either ``"self"`` or ``"feed"``.
+
+        Returns:
+            A dict ``{"tweets": list, "complete": bool}`` where
+            ``"tweets"`` lists the ``(id, entry)`` pairs, from the newest
+            to the oldest, and ``"complete"`` is ``True`` iff the oldest
+            tweet of the timeline has been fetched.
+        """
+        filename = self.store_filename(object)
+        if os.path.exists(filename):
+            with open(filename, "rb") as f:
+                return pickle.load(f)
+        return {"tweets": list(), "complete": False}
+
+    def save_timeline(self, object: str, timeline: dict):
+        """
+        Saves a timeline in incremental mode.
+
+        Args:
+            object (str): The timeline, either ``"self"`` or ``"feed"``.
+            timeline (dict): The timeline, see :py:meth:`load_timeline`.
+        """
+        mkdir(self.store_dir)
+        check_writable_directory(self.store_dir)
+        filename = self.store_filename(object)
+        with open(filename + ".tmp", "wb") as f:
+            pickle.dump(timeline, f)
+        os.replace(filename + ".tmp", filename)
+
+    def sync(self, object: str, num_tweets: int = None) -> list:
+        """
+        Synchronizes a local timeline: fetches the tweets posted since
+        the last synchronization and, if the local timeline contains
+        less than ``num_tweets`` tweets, the older tweets.
+
+        Args:
+            object (str): The timeline, either ``"self"`` or ``"feed"``.
+            num_tweets (int): The minimal number of tweets needed, or ``None``
+                to fetch the whole timeline.
+
+        Returns:
+            The entries of the local timeline, from the newest to the oldest.
+        """
+        timeline = self.load_timeline(object)
+        tweets = timeline["tweets"]
+        modified = False
+
+        # Newer tweets
+        if tweets:
+            since_id = tweets[0][0]
+            newer = list(self.fetch(object, since_id=since_id))
+            if newer:
+                tweets = newer + tweets
+                modified = True
+        else:
+            timeline["complete"] = False
+
+        # Older tweets
+        if not timeline["complete"] and (num_tweets is None or len(tweets) < num_tweets):
+            max_id = tweets[-1][0] - 1 if tweets else None
+            limit = None if num_tweets is None else num_tweets - len(tweets)
+            older = list(self.fetch(object, max_id=max_id, limit=limit))
+            if limit is None or len(older) < limit:
+                timeline["complete"] = True
+            tweets += older
+            modified = True
+
+        if modified:
+            timeline["tweets"] = tweets
+            self.save_timeline(object, timeline)
+        return [entry for (_, entry) in tweets]
+
     def query(self, q: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -166,24 +325,17 @@ class TwitterConnector(Connector):
 
         if q.action == ACTION_READ:
             if q.object in {"self", "feed"}:
-                # Retrieve Tweets
-                assert q.limit > 0
-                size = q.limit
-                if q.object == "self":
-                    tweets = self.api.user_timeline(
-                        id=self.twitter_id,
-                        tweet_mode="extended",
-                        count=size
-                    )
-                elif q.object == "feed":
-                    tweets = self.api.home_timeline(
-                        id=self.twitter_id,
-                        tweet_mode="extended",
-                        count=size
-                    )
+                # Retrieve Tweets. The filters are applied locally, so
+                # the number of needed tweets is only known without filters.
+                num_tweets = (
+                    None if q.limit is None or q.filters is not None
+                    else (q.offset if q.offset else 0) + q.limit
+                )
+                if self.incremental:
+                    entries = self.sync(q.object, num_tweets)
                 else:
-                    tweets = list()
-                entries = [tweet_to_dict(tweet) for tweet in tweets]
+                    entries = [entry for (_, entry) in self.fetch(q.object, limit=num_tweets)]
+                entries = self.reshape_entries(q, entries)
             else:
                 raise ValueError(f"Invalid object '{q.object}'")
         else:
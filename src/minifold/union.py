@@ -86,3 +86,18 @@ class UnionConnector(Connector):
         if query.action != ACTION_READ:
             raise ValueError("Invalid action in query %s" % query)
         return union([child.query(query) for child in self.children])
+
+    def count(self, query: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance,
+        i.e., the sum of the counts of the children.
+
+        Args:
+            query (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        if query.action != ACTION_READ:
+            raise ValueError("Invalid action in query %s" % query)
+        return sum(child.count(query) for child in self.children)
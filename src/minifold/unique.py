@@ -4,50 +4,134 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+from itertools import islice
 from .connector import Connector
 from .hash import to_hashable
-from .query import Query
+from .hyperloglog import HyperLogLog
+from .query import Query, ACTION_READ
 from .values_from_dict import ValuesFromDictFonctor
 
 
-def unique_impl(functor: ValuesFromDictFonctor, entries: list) -> list:
+def make_key(functor: ValuesFromDictFonctor, entry: dict) -> object:
     """
-    Implementation details of :func:`unique`.
+    Extracts the hashable key identifying an entry.
 
     Args:
         functor (ValuesFromDictFonctor): The functor allowing to extract
-            the values used to form the aggregates.
-        entries (list): A list of minifold entries.
+            the values identifying the entry.
+        entry (dict): A minifold entry.
 
     Returns:
-        A dictionary where each entries are unique with respect to ``functor``.
+        The corresponding hashable key.
+    """
+    key = functor(entry)
+    if len(key) == 1:
+        (key,) = key
+    try:
+        # Fast path: the key only involves hashable (e.g., scalar) values.
+        hash(key)
+        return key
+    except TypeError:
+        return to_hashable(list(key) if isinstance(key, tuple) else key)
+
+
+def unique_gen(functor: ValuesFromDictFonctor, entries: iter) -> iter:
+    """
+    Iterates over the entries that are unique with respect to ``functor``.
+    The entries are streamed: the iteration can be stopped at any time.
+
+    Args:
+        functor (ValuesFromDictFonctor): The functor allowing to extract
+            the values used to identify the entries.
+        entries (iter): An iterable over minifold entries.
+
+    Returns:
+        An iterator over the first entry of each key.
     """
-    ret = list()
     seen_keys = set()
     for entry in entries:
-        key = functor(entry)
-        if len(key) == 1:
-            (key,) = key
-        key = to_hashable(key)
+        key = make_key(functor, entry)
         if key not in seen_keys:
-            ret.append(entry)
             seen_keys.add(key)
-    return ret
+            yield entry
+
+
+def unique_impl(functor: ValuesFromDictFonctor, entries: iter, limit: int = None) -> list:
+    """
+    Implementation details of :func:`unique`.
+
+    Args:
+        functor (ValuesFromDictFonctor): The functor allowing to extract
+            the values used to form the aggregates.
+        entries (iter): An iterable over minifold entries.
+        limit (int): The maximal number of returned entries, or ``None``.
+            The input entries are consumed until this limit is reached.
+
+    Returns:
+        A dictionary where each entries are unique with respect to ``functor``.
+    """
+    return list(islice(unique_gen(functor, entries), limit))
 
 
-def unique(attributes: list, entries: list) -> list:
+def unique(attributes: list, entries: iter, limit: int = None) -> list:
     """
     Implements the UNIQUE statement for a list of minifold entries.
 
     Args:
         attributes (list): The list of entry keys used to determine the uniqueness.
-        entries (list): A list of minifold entries.
+        entries (iter): An iterable over minifold entries.
+        limit (int): The maximal number of returned entries, or ``None``.
 
     Returns:
         The remaining entries once the UNIQUE filtering has been applied.
     """
     functor = ValuesFromDictFonctor(attributes)
-    return unique_impl(functor, entries)
+    return unique_impl(functor, entries, limit)
+
+
+def count_distinct_impl(functor: ValuesFromDictFonctor, entries: iter, error: float = None) -> int:
+    """
+    Implementation details of :func:`count_distinct`.
+
+    Args:
+        functor (ValuesFromDictFonctor): The functor allowing to extract
+            the values used to identify the entries.
+        entries (iter): An iterable over minifold entries.
+        error (float): The relative standard error of the count, or ``None``.
+            See :py:func:`count_distinct`.
+
+    Returns:
+        The (possibly approximate) number of distinct keys.
+    """
+    if error is None:
+        return len({make_key(functor, entry) for entry in entries})
+    sketch = HyperLogLog(error)
+    for entry in entries:
+        sketch.add(make_key(functor, entry))
+    return len(sketch)
+
+
+def count_distinct(attributes: list, entries: iter, error: float = None) -> int:
+    """
+    Implements the COUNT(DISTINCT ...) statement for a list of minifold entries.
+
+    Example:
+        >>> count_distinct(["a"], [{"a": 1}, {"a": 2}, {"a": 1}])
+        2
+
+    Args:
+        attributes (list): The list of entry keys used to determine the uniqueness.
+        entries (iter): An iterable over minifold entries.
+        error (float): Pass ``None`` to compute the exact count (the memory
+            grows with the number of distinct keys), or the relative standard
+            error of the approximate count, computed in constant memory
+            using a :py:class:`HyperLogLog` sketch.
+
+    Returns:
+        The (possibly approximate) number of distinct keys.
+    """
+    functor = ValuesFromDictFonctor(attributes)
+    return count_distinct_impl(functor, entries, error)
 
 
 class UniqueConnector(Connector):
@@ -97,6 +181,9 @@ class UniqueConnector(Connector):
         """
         Handles an input :py:class:`Query` instance.
 
+        The OFFSET and LIMIT are applied once the duplicates are removed,
+        and the child entries are consumed until the LIMIT is reached.
+
         Args:
             query (Query): The handled query.
 
@@ -104,11 +191,22 @@ class UniqueConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(q)
+        child_query = q.copy()
+        child_query.offset = None
+        child_query.limit = None
+        start = q.offset if q.offset else 0
+        stop = start + q.limit if q.limit is not None else None
         return self.answer(
             q,
-            unique_impl(
-                self.m_functor,
-                self.m_child.query(q)
+            list(
+                islice(
+                    unique_gen(
+                        self.m_functor,
+                        self.m_child.query_gen(child_query)
+                    ),
+                    start,
+                    stop
+                )
             )
         )
 
@@ -122,3 +220,71 @@ class UniqueConnector(Connector):
             :py:class:`UniqueConnector` instance
         """
         return "DUP %s" % ", ".join(self.m_functor.attributes)
+
+
+class CountDistinctConnector(Connector):
+    """
+    The :py:class:`CountDistinctConnector` class implements the
+    COUNT(DISTINCT ...) statement in a minifold pipeline.
+    Like :py:class:`CountConnector`, it returns an integer.
+    """
+    def __init__(self, attributes: list, child: Connector, error: float = None):
+        """
+        Constructor.
+
+        Args:
+            attributes (list): The list of entry keys used to determine the uniqueness.
+            child (Connector): The child minifold :py:class:`Connector`
+                instance.
+            error (float): Pass ``None`` to compute the exact count, or
+                the relative standard error of the approximate count.
+                See :py:func:`count_distinct`.
+        """
+        super().__init__()
+        self.m_functor = ValuesFromDictFonctor(attributes)
+        self.m_child = child
+        self.m_error = error
+
+    @property
+    def child(self):
+        """
+        Accessor to the child minifold :py:class:`Connector` instance.
+
+        Returns:
+            The child minifold :py:class:`Connector` instance.
+        """
+        return self.m_child
+
+    def query(self, q: Query) -> int:
+        """
+        Handles a minifold query.
+
+        Args:
+            q (Query): The handled :py:class:`Query` instance.
+
+        Raises:
+            ValueError: if ``q.action != ACTION_READ``.
+
+        Returns:
+            The (possibly approximate) number of distinct entries
+            matched by this :py:class:`Query`.
+        """
+        super().query(q)
+        if q.action != ACTION_READ:
+            raise ValueError("Invalid action in query %s" % q)
+        return count_distinct_impl(
+            self.m_functor,
+            self.m_child.query_gen(q),
+            self.m_error
+        )
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this
+        :py:class:`CountDistinctConnector` instance
+
+        Returns:
+            The string representation of this
+            :py:class:`CountDistinctConnector` instance
+        """
+        return "COUNT DISTINCT %s" % ", ".join(self.m_functor.attributes)
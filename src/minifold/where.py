@@ -4,6 +4,8 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+from copy import copy
+from .binary_predicate import BinaryPredicate, from_conjuncts, to_conjuncts
 from .connector import Connector
 from .query import Query
 
@@ -82,6 +84,18 @@ class WhereConnector(Connector):
         """
         return self.m_keep_if
 
+    def query_gen(self, q: Query) -> iter:
+        """
+        Iterates over the entries matching an input :py:class:`Query` instance.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            An iterator over the entries matching the input query.
+        """
+        return (entry for entry in self.m_child.query_gen(q) if self.m_keep_if(entry))
+
     def query(self, q: Query) -> list:
         """
         Handles an input :py:class:`Query` instance.
@@ -93,10 +107,25 @@ class WhereConnector(Connector):
             The list of entries matching the input query.
         """
         super().query(q)
-        return self.answer(
-            q,
-            where(
-                self.m_child.query(q),
-                self.m_keep_if
+        return self.answer(q, list(self.query_gen(q)))
+
+    def count(self, q: Query) -> int:
+        """
+        Counts the entries matching an input :py:class:`Query` instance.
+        If the filtering function is a :py:class:`BinaryPredicate` and
+        the query has no OFFSET and LIMIT, the count is delegated to the
+        child, with the filtering function added to the query filters.
+
+        Args:
+            q (Query): The handled query.
+
+        Returns:
+            The number of entries matching the input query.
+        """
+        if isinstance(self.m_keep_if, BinaryPredicate) and not q.offset and q.limit is None:
+            q_child = copy(q)
+            q_child.filters = from_conjuncts(
+                to_conjuncts(q.filters) + to_conjuncts(self.m_keep_if)
             )
-        )
+            return self.m_child.count(q_child)
+        return sum(1 for entry in self.m_child.query_gen(q) if self.m_keep_if(entry))
@@ -0,0 +1,57 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import pytest
+import requests_cache
+import threading
+from http.server import ThreadingHTTPServer
+from minifold import request_cache
+from minifold.session import SessionManager
+
+
+@pytest.fixture(scope="session", autouse=True)
+def http_cache(tmp_path_factory):
+    """
+    Stores the HTTP cache in a temporary directory during the tests.
+    Otherwise, as the ports of the local servers are reused across runs,
+    they could be bypassed by the responses cached by a previous run.
+    """
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(
+        request_cache, "DEFAULT_CACHE_STORAGE_BASE_DIR",
+        str(tmp_path_factory.mktemp("cache"))
+    )
+    # The next sessions install the temporary cache.
+    SessionManager().close()
+    yield
+    SessionManager().close()
+    monkeypatch.undo()
+
+
+@pytest.fixture
+def http_server():
+    """
+    Starts local HTTP servers, shut down at the end of the test.
+
+    Returns:
+        A function that starts a server given its
+        ``BaseHTTPRequestHandler`` class, and returns its base URL.
+    """
+    servers = list()
+
+    def start(handler_class) -> str:
+        # The port may have been used by a previous server.
+        requests_cache.clear()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append(server)
+        return "http://127.0.0.1:%d" % server.server_address[1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
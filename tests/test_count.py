@@ -7,7 +7,13 @@
 from minifold.count import CountConnector, count
 from minifold.entries_connector import EntriesConnector
 from minifold.binary_predicate import BinaryPredicate
+from minifold.limit import LimitConnector
 from minifold.query import Query
+from minifold.rename import RenameConnector
+from minifold.select import SelectConnector
+from minifold.sort_by import SortByConnector
+from minifold.union import UnionConnector
+from minifold.where import WhereConnector
 
 ENTRIES = [
     {'a': 1, 'b': 2, 'c': 3},
@@ -33,3 +39,30 @@ def test_count_connector():
     assert count_connector.query(
         Query(filters=BinaryPredicate("c", ">", 1000))
     ) == 0
+
+
+class CountOnlyConnector(EntriesConnector):
+    def query(self, query: Query) -> list:
+        assert False, "The entries must not be fetched"
+
+
+def test_count_pushdown():
+    child = CountOnlyConnector(ENTRIES)
+    union = UnionConnector([child, child])
+    assert CountConnector(union).query(Query()) == 8
+    where = WhereConnector(union, BinaryPredicate("a", "==", 100))
+    assert CountConnector(where).query(Query()) == 4
+    assert CountConnector(where).query(Query(filters=BinaryPredicate("b", "<", 100))) == 0
+    assert CountConnector(LimitConnector(where, 3)).query(Query()) == 3
+    assert CountConnector(LimitConnector(where, 10)).query(Query()) == 4
+    assert CountConnector(SelectConnector(SortByConnector(["a"], where), ["a"])).query(Query()) == 4
+    rename = RenameConnector({"a": "A"}, child)
+    assert CountConnector(rename).query(Query(filters=BinaryPredicate("A", ">", 1))) == 3
+
+
+def test_count_where_lambda():
+    where = WhereConnector(EntriesConnector(ENTRIES), lambda e: e["a"] >= 10)
+    assert CountConnector(where).query(Query()) == 3
+    # The count is consistent with WhereConnector.query.
+    assert CountConnector(where).query(Query(limit=2)) == len(where.query(Query(limit=2)))
+    assert EntriesConnector(ENTRIES).count(Query(offset=3, limit=2)) == 1
@@ -4,7 +4,13 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+import datetime
+import json
+import pytest
 import requests
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 from minifold.binary_predicate import BinaryPredicate
 from minifold.dblp import DblpConnector
 from minifold.query import Query
@@ -121,3 +127,102 @@ def test_dblp_researcher():
         requests.exceptions.ConnectTimeout
     ):
         pass
+
+
+# ---------------------------------------------------------------
+# Local mock DBLP server
+# ---------------------------------------------------------------
+
+MOCK_DBLP_TOTAL = 25
+
+
+class MockDblpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    requests = list()
+    clients = set()
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        h = int(params["h"][0])
+        f = int(params.get("f", [0])[0])
+        MockDblpHandler.requests.append((f, h))
+        MockDblpHandler.clients.add(self.client_address)
+        hits = [
+            {
+                "@id": str(i),
+                "@score": "1",
+                "info": {"title": "Title %d" % i, "year": "2020"},
+            } for i in range(f, min(f + h, MOCK_DBLP_TOTAL))
+        ]
+        body = json.dumps({
+            "result": {
+                "hits": {
+                    "@total": str(MOCK_DBLP_TOTAL),
+                    "@sent": str(len(hits)),
+                    "@first": str(f),
+                    "hit": hits,
+                }
+            }
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url(http_server):
+    MockDblpHandler.requests.clear()
+    MockDblpHandler.clients.clear()
+    return http_server(MockDblpHandler)
+
+
+def test_dblp_paging(api_url):
+    dblp = DblpConnector(
+        dblp_api_url=api_url,
+        wait_time=datetime.timedelta(seconds=0),
+        page_size=10,
+        max_workers=2
+    )
+    entries = dblp.query(Query(object="publication"))
+    assert [entry["dblp_id"] for entry in entries] == list(range(MOCK_DBLP_TOTAL))
+    assert sorted(MockDblpHandler.requests) == [(0, 10), (10, 10), (20, 5)]
+    # Persistent session: connections are reused.
+    assert len(MockDblpHandler.clients) <= 2
+
+
+def test_dblp_paging_offset_limit(api_url):
+    dblp = DblpConnector(
+        dblp_api_url=api_url,
+        wait_time=datetime.timedelta(seconds=0),
+        page_size=4
+    )
+    entries = dblp.query(Query(object="publication", offset=3, limit=6))
+    assert [entry["dblp_id"] for entry in entries] == list(range(3, 9))
+    assert sorted(MockDblpHandler.requests) == [(3, 4), (7, 2)]
+
+
+def test_dblp_query_gen(api_url):
+    dblp = DblpConnector(
+        dblp_api_url=api_url,
+        wait_time=datetime.timedelta(seconds=0),
+        page_size=10
+    )
+    gen = dblp.query_gen(Query(object="publication"))
+    assert next(gen)["dblp_id"] == 0
+    gen.close()
+
+
+def test_dblp_rate_limit():
+    dblp = DblpConnector(wait_time=datetime.timedelta(milliseconds=50))
+    start = datetime.datetime.now()
+    threads = [threading.Thread(target=dblp.wait) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert datetime.datetime.now() - start >= datetime.timedelta(milliseconds=150)
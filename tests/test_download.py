@@ -4,10 +4,18 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+import pytest
 import requests
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from minifold.binary_predicate import BinaryPredicate
 from minifold.entries_connector import EntriesConnector
-from minifold.query import Query
-from minifold.download import DownloadConnector, download
+from minifold.query import Query, SORT_ASC, SORT_DESC
+from minifold.download import (
+    DownloadConnector, download, downloads, downloads_gen,
+    extract_response, extract_response_lxml
+)
 
 # ============================================================
 # NOTE: If you require proxy, see minifold.proxy
@@ -98,6 +106,213 @@ def test_html_to_text():
     assert success >= 1
 
 
+# ----------------------------------------------------------------------------
+#  Local HTTP server
+# ----------------------------------------------------------------------------
+
+class DelayHandler(BaseHTTPRequestHandler):
+    """
+    - ``/delay/<ms>/<i>`` replies ``"<ms>"`` after ``<ms>`` milliseconds.
+    - ``/size/<n>/<i>`` replies ``<n>`` bytes.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    lock = threading.Lock()
+    num_pending = 0
+    max_pending = 0
+
+    def do_GET(self):
+        with DelayHandler.lock:
+            DelayHandler.num_pending += 1
+            DelayHandler.max_pending = max(DelayHandler.max_pending, DelayHandler.num_pending)
+        try:
+            (_, kind, value, _) = self.path.split("/")
+            if kind == "delay":
+                time.sleep(int(value) / 1000)
+                body = value.encode("utf-8")
+            else:
+                body = b"x" * int(value)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with DelayHandler.lock:
+                DelayHandler.num_pending -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url(http_server):
+    DelayHandler.max_pending = 0
+    return http_server(DelayHandler)
+
+
+def test_downloads_gen_as_completed(url):
+    urls = ["%s/delay/%d/%d" % (url, delay, i) for (i, delay) in enumerate([300, 0, 150])]
+    obtained = [response.text for (_, response) in downloads_gen(urls)]
+    assert obtained == ["0", "150", "300"]
+
+
+def test_downloads_max_per_host(url):
+    urls = ["%s/delay/50/%d" % (url, i) for i in range(12)]
+    map_url_response = downloads(urls, max_per_host=3)
+    assert set(map_url_response.keys()) == set(urls)
+    assert all(response.text == "50" for response in map_url_response.values())
+    assert DelayHandler.max_pending <= 3
+
+
+def test_download_max_body_size(url):
+    response = download("%s/size/100/0" % url, max_body_size=1000)
+    assert response.content == b"x" * 100
+    response = download("%s/size/2000/0" % url, max_body_size=1000)
+    assert isinstance(response, ValueError)
+
+
+def test_download_connector_downloads_gen(url):
+    entries = [{"url": "%s/delay/%d/%d" % (url, 10 * i, i)} for i in range(5)]
+    c = DownloadConnector(
+        {"url": "response"},
+        EntriesConnector(entries),
+        extract_response=lambda response: response.text
+    )
+    entries = c.query(Query(attributes=("url", "response")))
+    assert [entry["response"] for entry in entries] == [str(10 * i) for i in range(5)]
+
+
+def test_download_connector_process_pool(url):
+    entries = [{"url": "%s/delay/%d/%d" % (url, i, i)} for i in range(10)]
+    entries.append({"url": "http://127.0.0.1:1/unreachable"})
+    expected = [str(i) for i in range(10)]
+    for f in [extract_response, extract_response_lxml]:
+        c = DownloadConnector(
+            {"url": "response"},
+            EntriesConnector(entries),
+            extract_response=f,
+            num_workers=2,
+            chunk_size=3
+        )
+        obtained = c.query(Query(attributes=("url", "response")))
+        assert [entry["response"] for entry in obtained[:-1]] == expected
+        assert isinstance(obtained[-1]["response"], Exception)
+
+
+def test_download_connector_shared_executor():
+    (c1, c2) = (
+        DownloadConnector({"url": "response"}, EntriesConnector(list()), num_workers=2)
+        for _ in range(2)
+    )
+    assert c1.executor() is not None
+    assert c1.executor() is c2.executor()
+
+
+def test_download_connector_not_picklable(url):
+    entries = [{"url": "%s/delay/0/0" % url}]
+    c = DownloadConnector(
+        {"url": "response"},
+        EntriesConnector(entries),
+        extract_response=lambda response: response.text,
+        num_workers=2
+    )
+    obtained = c.query(Query(attributes=("url", "response")))
+    assert obtained[0]["response"] == "0"
+
+
+def test_download_connector_late_materialization(url):
+    num_entries = 100
+    entries = [
+        {"id": i, "url": "%s/delay/%d/%d" % (url, i % 10, i)}
+        for i in range(num_entries)
+    ]
+    fetched = list()
+
+    def downloads(urls: set) -> dict:
+        fetched.extend(urls)
+        return {url: download(url) for url in urls}
+
+    def make_connector():
+        fetched.clear()
+        return DownloadConnector(
+            {"url": "response"},
+            EntriesConnector(entries),
+            downloads=downloads,
+            extract_response=lambda response: response.text
+        )
+
+    # The filter and the LIMIT do not depend on the downloaded attribute.
+    c = make_connector()
+    obtained = c.query(Query(
+        attributes=["id", "response"],
+        filters=BinaryPredicate("id", ">=", 50),
+        offset=2,
+        limit=3
+    ))
+    assert obtained == [
+        {"id": 52, "response": "2"},
+        {"id": 53, "response": "3"},
+        {"id": 54, "response": "4"},
+    ]
+    assert len(fetched) == 3
+
+    # Only the filter on "id" is evaluated before downloading.
+    c = make_connector()
+    obtained = c.query(Query(
+        attributes=["id"],
+        filters=BinaryPredicate(
+            BinaryPredicate("id", "<", 50), "&&",
+            BinaryPredicate("response", "==", "7")
+        ),
+        limit=2
+    ))
+    assert obtained == [{"id": 7}, {"id": 17}]
+    assert len(fetched) < 50
+
+    # No LIMIT: every remaining URL is fetched.
+    c = make_connector()
+    obtained = c.query(Query(
+        attributes=["id"],
+        filters=lambda entry: entry["response"] == "7"
+    ))
+    assert [entry["id"] for entry in obtained] == list(range(7, num_entries, 10))
+    assert len(fetched) == num_entries
+
+
+def test_download_connector_late_sort(url):
+    entries = [
+        {"id": i, "url": "%s/delay/%d/%d" % (url, i % 10, i)}
+        for i in range(50)
+    ]
+    c = DownloadConnector(
+        {"url": "response"},
+        EntriesConnector(entries),
+        extract_response=lambda response: response.text
+    )
+    # The entries are sorted after downloading, before the OFFSET and the LIMIT.
+    obtained = c.query(Query(
+        attributes=["id", "response"],
+        filters=BinaryPredicate("id", "<", 30),
+        sort_by={"response": SORT_DESC, "id": SORT_ASC},
+        offset=1,
+        limit=3
+    ))
+    assert obtained == [
+        {"id": 19, "response": "9"},
+        {"id": 29, "response": "9"},
+        {"id": 8, "response": "8"},
+    ]
+    # Same with a filter on the downloaded attribute.
+    obtained = c.query(Query(
+        attributes=["id"],
+        filters=BinaryPredicate("response", "<=", "1"),
+        sort_by={"response": SORT_DESC, "id": SORT_DESC},
+        limit=3
+    ))
+    assert obtained == [{"id": 41}, {"id": 31}, {"id": 21}]
+
+
 # ----------------------------------------------------------------------------
 #  Example:
 # ----------------------------------------------------------------------------
@@ -0,0 +1,104 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import hashlib
+import os
+from minifold.binary_predicate import BinaryPredicate
+from minifold.filesystem import FilesystemConnector, find
+from minifold.query import Query
+
+FILES = {
+    "a.txt": b"a",
+    "b.py": b"bb",
+    "sub/c.txt": b"ccc",
+    "sub/deep/d.py": b"dddd",
+    "other/e.txt": b"eeeee",
+}
+
+
+def make_tree(tmp_path) -> str:
+    root = str(tmp_path / "root")
+    for (filename, content) in FILES.items():
+        path = os.path.join(root, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+    return root
+
+
+def relative_paths(root: str, entries: list) -> list:
+    return sorted(os.path.relpath(entry["path"], root) for entry in entries)
+
+
+def test_find(tmp_path):
+    root = make_tree(tmp_path)
+    gen = find(root)
+    assert next(gen).startswith(root)
+    assert sorted(os.path.relpath(path, root) for path in find(root)) == sorted(FILES.keys())
+
+
+def test_filesystem_connector(tmp_path):
+    root = make_tree(tmp_path)
+    for max_workers in [1, 4]:
+        connector = FilesystemConnector(root, hash_algorithm="md5", max_workers=max_workers)
+        assert connector.attributes(None) == {"path", "name", "extension", "size", "mtime", "hash"}
+        entries = connector.query(Query())
+        assert relative_paths(root, entries) == sorted(FILES.keys())
+        for entry in entries:
+            content = FILES[os.path.relpath(entry["path"], root)]
+            assert entry["size"] == len(content)
+            assert entry["hash"] == hashlib.md5(content).hexdigest()
+
+        entries = connector.query(Query(
+            attributes=["name", "size"],
+            filters=BinaryPredicate(
+                BinaryPredicate("extension", "==", "txt"),
+                "&&",
+                BinaryPredicate("size", ">", 1)
+            )
+        ))
+        assert sorted(entries, key=lambda entry: entry["name"]) == [
+            {"name": "c.txt", "size": 3},
+            {"name": "e.txt", "size": 5},
+        ]
+
+
+def test_filesystem_connector_pruning(tmp_path):
+    root = make_tree(tmp_path)
+    scanned = list()
+
+    class TracedFilesystemConnector(FilesystemConnector):
+        def scan(self, dir_name, *args):
+            scanned.append(os.path.relpath(dir_name, root))
+            return super().scan(dir_name, *args)
+
+    connector = TracedFilesystemConnector(root)
+    entries = connector.query(Query(
+        attributes=["path"],
+        filters=BinaryPredicate("path", ">=", os.path.join(root, "sub", ""))
+    ))
+    assert relative_paths(root, entries) == ["sub/c.txt", "sub/deep/d.py"]
+    assert sorted(scanned) == [".", "sub", "sub/deep"]
+
+    del scanned[:]
+    entries = connector.query(Query(
+        filters=BinaryPredicate("path", "IN", [os.path.join(root, "other", "e.txt")])
+    ))
+    assert relative_paths(root, entries) == ["other/e.txt"]
+    assert sorted(scanned) == [".", "other"]
+
+
+def test_filesystem_connector_limit(tmp_path):
+    root = make_tree(tmp_path)
+    connector = FilesystemConnector(root)
+    entries = connector.query(Query(
+        attributes=["name"],
+        filters=lambda entry: entry["size"] >= 2,
+        offset=1,
+        limit=2
+    ))
+    assert len(entries) == 2
+    assert all(set(entry.keys()) == {"name"} for entry in entries)
@@ -0,0 +1,120 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+from minifold.binary_predicate import BinaryPredicate
+from minifold.entries_connector import EntriesConnector
+from minifold.full_text import (
+    FullTextFilter, FullTextIndex, FullTextIndexConnector,
+    parse_full_text_query, tokenize
+)
+from minifold.query import Query, SORT_ASC
+
+ENTRIES = [
+    {"id": 0, "title": "Deep learning for computer networks", "authors": ["Alice Martin"], "year": 2018},
+    {"id": 1, "title": "Learning deep networks, deep networks", "authors": ["Bob Smith"], "year": 2019},
+    {"id": 2, "title": "Élève et école", "authors": ["Céline Dupont", "Alice Martin"], "year": 2020},
+    {"id": 3, "title": "State-of-the-art network optimization", "authors": [], "year": 2021},
+]
+
+
+def make_connector(entries=None, **kwargs) -> FullTextIndexConnector:
+    return FullTextIndexConnector(
+        EntriesConnector(entries if entries is not None else ENTRIES),
+        ["title", "authors"],
+        **kwargs
+    )
+
+
+def ids(entries: list) -> list:
+    return [entry["id"] for entry in entries]
+
+
+def test_tokenize():
+    assert tokenize("Deep-Learning: l'ÉCOLE") == ["deep", "learning", "l", "ecole"]
+    assert tokenize(None) == []
+    assert tokenize(2020) == ["2020"]
+
+
+def test_parse_full_text_query():
+    assert parse_full_text_query('state-of-the-art "" netw* *') == [
+        ("phrase", ["state", "of", "the", "art"]),
+        ("prefix", "netw"),
+    ]
+
+
+def test_full_text_index_add_remove():
+    index = FullTextIndex()
+    index.add("a", ["foo bar", "baz"])
+    index.add("b", ["bar baz"])
+    assert len(index) == 2
+    assert index.search("bar baz") == [("a", 0.0), ("b", 0.0)]
+    # Phrases do not span two values.
+    assert index.search('"bar baz"') == [("b", 0.0)]
+    index.remove("b")
+    assert "b" not in index
+    assert index.search("ba*") == [("a", 0.0)]
+    index.add("a", ["qux"])
+    assert index.search("foo") == []
+    assert index.search("qux") == [("a", 0.0)]
+
+
+def test_full_text_connector_word():
+    connector = make_connector(ranked=False)
+    assert ids(connector.query(Query(filters=FullTextFilter("networks")))) == [0, 1]
+    assert ids(connector.query(Query(filters=FullTextFilter("ALICE")))) == [0, 2]
+    assert ids(connector.query(Query(filters=FullTextFilter("eleve")))) == [2]
+    assert ids(connector.query(Query(filters=FullTextFilter("alice networks")))) == [0]
+    assert ids(connector.query(Query(filters=FullTextFilter("unknown")))) == []
+
+
+def test_full_text_connector_phrase_prefix():
+    connector = make_connector(ranked=False)
+    assert ids(connector.query(Query(filters=FullTextFilter('"deep learning"')))) == [0]
+    assert ids(connector.query(Query(filters=FullTextFilter("state-of-the-art")))) == [3]
+    assert ids(connector.query(Query(filters=FullTextFilter("netw*")))) == [0, 1, 3]
+    assert ids(connector.query(Query(filters=FullTextFilter("netw* optim*")))) == [3]
+
+
+def test_full_text_connector_ranked():
+    connector = make_connector(score_attribute="score")
+    entries = connector.query(Query(filters=FullTextFilter("deep networks")))
+    assert ids(entries) == [1, 0]
+    assert entries[0]["score"] > entries[1]["score"] > 0
+    assert "score" not in ENTRIES[0]
+
+    entries = connector.query(Query(filters=FullTextFilter("deep networks"), sort_by={"id": SORT_ASC}))
+    assert ids(entries) == [0, 1]
+
+
+def test_full_text_connector_query():
+    connector = make_connector(ranked=False)
+    q = Query(
+        attributes=["id"],
+        filters=BinaryPredicate(FullTextFilter("netw*"), "&&", BinaryPredicate("year", ">=", 2019)),
+        limit=1
+    )
+    assert connector.query(q) == [{"id": 1}]
+    assert ids(connector.query(Query(offset=3))) == [3]
+
+
+def test_full_text_connector_refresh():
+    entries = [dict(entry) for entry in ENTRIES]
+    connector = make_connector(entries, ranked=False)
+    assert ids(connector.query(Query(filters=FullTextFilter("networks")))) == [0, 1]
+    entries[0]["title"] = "Shallow learning"
+    entries.pop(1)
+    entries.append({"id": 4, "title": "Networks", "authors": [], "year": 2022})
+    # Not refreshed yet.
+    assert ids(connector.query(Query(filters=FullTextFilter("networks")))) == [0, 1]
+    assert connector.refresh() == (2, 2)
+    assert ids(connector.query(Query(filters=FullTextFilter("networks")))) == [4]
+    assert ids(connector.query(Query(filters=FullTextFilter("shallow")))) == [0]
+    assert connector.refresh() == (0, 0)
+
+
+def test_full_text_filter():
+    f = FullTextFilter("alice netw*", ["title", "authors"])
+    assert [entry["id"] for entry in ENTRIES if f(entry)] == [0]
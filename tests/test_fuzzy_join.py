@@ -0,0 +1,133 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import random
+from difflib import SequenceMatcher
+from minifold.entries_connector import EntriesConnector
+from minifold.fuzzy_join import (
+    FuzzyJoinConnector, fuzzy_join, fuzzy_join_pairs, jaccard, ngrams
+)
+from minifold.join_if import INNER_JOIN, LEFT_JOIN, RIGHT_JOIN, FULL_OUTER_JOIN
+from minifold.query import Query
+from minifold.strings import to_canonic_fullname
+
+DBLP_ENTRIES = [
+    {"title": "Deep Learning for Computer Networks.", "year": 2018},
+    {"title": "A Survey of Élève Modelling", "year": 2019},
+    {"title": "Graph Algorithms", "year": 2020},
+]
+
+HAL_ENTRIES = [
+    {"title": "A survey of eleve modelling", "hal_id": "hal-1"},
+    {"title": "Deep learning for computer networks", "hal_id": "hal-2"},
+    {"title": "Quantum computing", "hal_id": "hal-3"},
+]
+
+
+def test_ngrams_jaccard():
+    assert ngrams("abcd", 3) == {"abc", "bcd"}
+    assert ngrams("ab", 3) == {"ab"}
+    assert ngrams("", 3) == set()
+    assert jaccard(set(), set()) == 0.0
+
+
+def test_fuzzy_join_modes():
+    obtained = fuzzy_join(DBLP_ENTRIES, HAL_ENTRIES, "title", mode=INNER_JOIN)
+    assert [(entry["year"], entry["hal_id"]) for entry in obtained] == [
+        (2018, "hal-2"), (2019, "hal-1")
+    ]
+    obtained = fuzzy_join(DBLP_ENTRIES, HAL_ENTRIES, "title", mode=LEFT_JOIN)
+    assert [(entry["year"], entry["hal_id"]) for entry in obtained] == [
+        (2018, "hal-2"), (2019, "hal-1"), (2020, None)
+    ]
+    obtained = fuzzy_join(DBLP_ENTRIES, HAL_ENTRIES, "title", mode=RIGHT_JOIN)
+    assert [(entry["year"], entry["hal_id"]) for entry in obtained] == [
+        (2018, "hal-2"), (2019, "hal-1"), (None, "hal-3")
+    ]
+    obtained = fuzzy_join(DBLP_ENTRIES, HAL_ENTRIES, "title", mode=FULL_OUTER_JOIN)
+    assert len(obtained) == 4
+    assert "hal_id" not in DBLP_ENTRIES[2]
+
+
+def test_fuzzy_join_fullname():
+    left = [{"author": "Céline Comte"}, {"author": "Marc-Olivier Buob"}]
+    right = [{"name": "celine comte", "id": 1}, {"name": "Marc Olivier Buob", "id": 2}]
+    obtained = fuzzy_join(
+        left, right, "author", "name",
+        canonize=to_canonic_fullname,
+        score_attribute="score"
+    )
+    assert [(entry["author"], entry["id"], entry["score"]) for entry in obtained] == [
+        ("Céline Comte", 1, 1.0), ("Marc-Olivier Buob", 2, 1.0)
+    ]
+
+
+def random_title(rng: random.Random) -> str:
+    words = ["deep", "learning", "network", "graph", "survey", "model", "query", "fast", "data", "system"]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(2, 6)))
+
+
+def brute_force_pairs(l_entries, r_entries, threshold):
+    return fuzzy_join_pairs(
+        l_entries, r_entries, "title",
+        threshold=threshold, blocking_threshold=0.0, match_once=False
+    )
+
+
+def test_fuzzy_join_ngram_blocking_is_exact():
+    rng = random.Random(1)
+    l_entries = [{"title": random_title(rng)} for _ in range(60)]
+    r_entries = [{"title": random_title(rng)} for _ in range(60)]
+    for threshold in [0.3, 0.6, 0.9]:
+        expected = brute_force_pairs(l_entries, r_entries, threshold)
+        obtained = fuzzy_join_pairs(l_entries, r_entries, "title", threshold=threshold, match_once=False)
+        assert obtained == expected
+
+
+def test_fuzzy_join_minhash_blocking():
+    rng = random.Random(2)
+    l_entries = [{"title": random_title(rng) + " %d" % i, "id": i} for i in range(50)]
+    r_entries = [{"title": entry["title"].upper() + ".", "rid": entry["id"]} for entry in l_entries]
+    rng.shuffle(r_entries)
+    obtained = fuzzy_join(l_entries, r_entries, "title", threshold=0.99, blocking="minhash")
+    assert sorted(entry["id"] for entry in obtained) == list(range(50))
+    assert all(entry["id"] == entry["rid"] for entry in obtained)
+
+
+def test_fuzzy_join_custom_similarity():
+    def ratio(x: str, y: str) -> float:
+        return SequenceMatcher(None, x, y).ratio()
+
+    obtained = fuzzy_join(
+        [{"title": "Graph algorithms"}],
+        [{"title": "Graph algorithm"}, {"title": "Graphs"}],
+        "title",
+        threshold=0.9,
+        similarity=ratio,
+        blocking_threshold=0.5,
+        score_attribute="score"
+    )
+    assert [entry["title"] for entry in obtained] == ["Graph algorithm"]
+    assert obtained[0]["score"] >= 0.9
+
+
+def test_fuzzy_join_connector():
+    connector = FuzzyJoinConnector(
+        EntriesConnector(DBLP_ENTRIES),
+        EntriesConnector(HAL_ENTRIES),
+        "title",
+        mode=LEFT_JOIN
+    )
+    obtained = connector.query(Query())
+    assert [entry["hal_id"] for entry in obtained] == ["hal-2", "hal-1", None]
+    assert connector.attributes(None) == {"title", "year", "hal_id"}
+    assert str(connector) == "FUZZY LEFT JOIN ON title ~ title (>= 0.8)"
+
+    try:
+        FuzzyJoinConnector(connector, connector, "title", blocking="unknown")
+        assert False, "ValueError not raised"
+    except ValueError:
+        pass
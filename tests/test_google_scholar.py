@@ -4,9 +4,13 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+import datetime
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
 from minifold.binary_predicate import BinaryPredicate
 from minifold.query import Query
-from minifold.google_scholar import GoogleScholarConnector
+from minifold.google_scholar import GoogleScholarConnector, MinifoldScholarQuerier
 
 SCHOLAR = GoogleScholarConnector()
 
@@ -48,3 +52,165 @@ def test_google_scholar_limit():
         assert len(entries) == 2
     except RuntimeError:
         pass
+
+
+# Recorded (and trimmed) Google Scholar result page.
+ARTICLE_HTML = """
+<div class="gs_r gs_or gs_scl" data-cid="%(cid)s">
+  <div class="gs_ggs gs_fl"><div class="gs_ggsd"><div class="gs_or_ggsm">
+    <a href="https://example.org/paper%(i)d.pdf"><span class="gs_ctg2">[PDF]</span> example.org</a>
+  </div></div></div>
+  <div class="gs_ri">
+    <h3 class="gs_rt"><a href="https://example.org/paper%(i)d">Paper&nbsp;number
+      %(i)d</a></h3>
+    <div class="gs_a">MO Buob,&nbsp;J Doe - Conference %(i)d, %(year)d - example.org</div>
+    <div class="gs_rs">Excerpt of\\n the paper %(i)d</div>
+    <div class="gs_fl gs_flb">
+      <a href="/scholar?cites=%(cid)s&amp;hl=en">Cited by %(i)d</a>
+      <a href="/scholar?cluster=%(cid)s&amp;hl=en">All 3 versions</a>
+    </div>
+  </div>
+</div>
+"""
+
+
+def make_page(start: int, num: int, total: int = 25) -> str:
+    articles = "".join(
+        ARTICLE_HTML % {"i": i, "cid": 1000 + i, "year": 2000 + i}
+        for i in range(start, min(start + num, total))
+    )
+    return (
+        "<html><body><div id=\"gs_res_ccl\">"
+        "<div id=\"gs_res_ccl_mid\">%s</div>"
+        "</div></body></html>" % articles
+    )
+
+
+def test_parse_article():
+    from bs4 import BeautifulSoup
+    from minifold.google_scholar import parse_article
+    s_html = ARTICLE_HTML % {"i": 7, "cid": 1007, "year": 2007}
+    expected = {
+        "url_pdf": "https://example.org/paper7.pdf",
+        "url_title": "https://example.org/paper7",
+        "title": "Paper number 7",
+        "authors": ["MO Buob", "J Doe"],
+        "conference": "Conference 7",
+        "year": 2007,
+        "editor": "example.org",
+        "excerpt": "Excerpt of\\n the paper 7",
+        "num_citations": 7,
+        "url_citations": "http://scholar.google.com/scholar?cites=1007&hl=en",
+        "num_versions": 3,
+        "url_versions": "http://scholar.google.com/scholar?cluster=1007&hl=en",
+        "cluster_id": 1007,
+    }
+    assert parse_article(s_html) == expected
+    div = BeautifulSoup(s_html, features="lxml").find("div", attrs={"class": "gs_r"})
+    assert parse_article(div) == expected
+
+
+def test_parse_articles():
+    from minifold.google_scholar import parse_articles
+    articles = parse_articles(make_page(0, 10))
+    assert [article["year"] for article in articles] == list(range(2000, 2010))
+    try:
+        parse_articles("<html></html>")
+        assert False, "RuntimeError not raised"
+    except RuntimeError:
+        pass
+
+
+class FixtureScholarQuerier(MinifoldScholarQuerier):
+    def __init__(self):
+        super().__init__()
+        self.urls = list()
+
+    def fetch(self, url: str) -> str:
+        self.urls.append(url)
+        params = parse_qs(urlparse(url).query)
+        start = int(params.get("start", [0])[0])
+        num = int(params.get("num", [10])[0])
+        return make_page(start, num)
+
+
+def make_connector() -> GoogleScholarConnector:
+    connector = GoogleScholarConnector(wait_time=datetime.timedelta(0))
+    connector.querier = FixtureScholarQuerier()
+    return connector
+
+
+def test_google_scholar_fixture_single_page():
+    connector = make_connector()
+    entries = connector.query(Query(
+        attributes=["year"],
+        filters=BinaryPredicate("authors", "CONTAINS", "Marc-Olivier Buob"),
+        limit=3
+    ))
+    assert entries == [{"year": 2000}, {"year": 2001}, {"year": 2002}]
+    assert len(connector.querier.urls) == 1
+
+
+def test_google_scholar_fixture_pages():
+    connector = make_connector()
+    entries = connector.query(Query(
+        attributes=["year", "authors"],
+        filters=BinaryPredicate("authors", "CONTAINS", "Marc-Olivier Buob"),
+        offset=2,
+        limit=100
+    ))
+    # The fixture only contains 25 results, hence the last page is incomplete.
+    assert [entry["year"] for entry in entries] == list(range(2002, 2025))
+    assert entries[0]["authors"] == ["Marc-Olivier Buob", "J Doe"]
+    assert sorted(
+        parse_qs(urlparse(url).query).get("start", ["0"])[0]
+        for url in connector.querier.urls
+    )[:3] == ["12", "2", "22"]
+
+
+def test_google_scholar_fixture_waves():
+    connector = make_connector()
+    connector.max_workers = 2
+    entries = connector.query(Query(
+        filters=BinaryPredicate("authors", "CONTAINS", "Marc-Olivier Buob"),
+        limit=100
+    ))
+    assert len(entries) == 25
+    # Two waves of two pages: the third page is incomplete, hence the last one.
+    assert len(connector.querier.urls) == 4
+
+
+def test_google_scholar_fixture_rate_limit():
+    connector = make_connector()
+    connector.wait_time = datetime.timedelta(seconds=0.05)
+    t0 = time.time()
+    entries = connector.query(Query(
+        filters=BinaryPredicate("authors", "CONTAINS", "Marc-Olivier Buob"),
+        limit=30
+    ))
+    assert len(entries) == 25
+    assert time.time() - t0 >= 0.1
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """
+    ``/<status>`` replies an HTML page with the given HTTP status.
+    """
+    def do_GET(self):
+        body = b"<html><body>captcha</body></html>"
+        self.send_response(int(self.path.strip("/")))
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_google_scholar_http_status(http_server):
+    url = http_server(StatusHandler)
+    querier = MinifoldScholarQuerier()
+    assert querier._get_http_response(url + "/200") == b"<html><body>captcha</body></html>"
+    assert querier._get_http_response(url + "/503") is None
+    assert querier._get_http_response(url + "/404") is None
@@ -4,9 +4,13 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+from minifold.aggregate import Avg, Collect, Count, Max, Min, Sum
+from minifold.binary_predicate import BinaryPredicate
 from minifold.entries_connector import EntriesConnector
+from minifold.limit import LimitConnector
 from minifold.query import Query, ACTION_READ
 from minifold.group_by import group_by, GroupByConnector
+from minifold.sort_by import SortByConnector
 
 ENTRIES = [
     {"a": 1, "b": 200, "c": 31},
@@ -71,3 +75,59 @@ def test_group_by_connector():
         object="",
         attributes=[],
     ))) == 4
+
+
+def test_group_by_aggregates():
+    obtained = group_by("a", ENTRIES, {
+        "n": Count(),
+        "sum_b": Sum("b"),
+        "min_c": Min("c"),
+        "max_c": Max("c"),
+        "avg_b": Avg("b"),
+        "cs": Collect("c"),
+    })
+    assert obtained == [
+        {"a": 1, "n": 2, "sum_b": 450, "min_c": 3, "max_c": 31, "avg_b": 225, "cs": [31, 3]},
+        {"a": 10, "n": 1, "sum_b": 200, "min_c": 300, "max_c": 300, "avg_b": 200, "cs": [300]},
+        {"a": 100, "n": 1, "sum_b": 2, "min_c": 30, "max_c": 30, "avg_b": 2, "cs": [30]},
+    ]
+
+
+def test_group_by_aggregates_missing_values():
+    entries = [{"a": 1, "b": None}, {"a": 1}, {"b": 3}]
+    assert group_by("a", entries, {"n": Count(), "nb": Count("b"), "max_b": Max("b"), "avg_b": Avg("b")}) == [
+        {"a": 1, "n": 2, "nb": 0, "max_b": None, "avg_b": None},
+        {"a": None, "n": 1, "nb": 1, "max_b": 3, "avg_b": 3},
+    ]
+
+
+def test_group_by_collect():
+    obtained = group_by("b", ENTRIES, {"entries": Collect()})
+    assert {entry["b"]: entry["entries"] for entry in obtained} == group_by("b", ENTRIES)
+
+
+def test_group_by_connector_aggregates():
+    connector = GroupByConnector(
+        ["b"],
+        EntriesConnector(ENTRIES),
+        aggregates={"n": Count(), "last": Max("c")}
+    )
+    assert connector.attributes(None) == {"b", "n", "last"}
+    assert str(connector) == "GROUP BY b AGGREGATE COUNT(*) AS n, MAX(c) AS last"
+    assert connector.query(Query()) == [
+        {"b": 200, "n": 2, "last": 300},
+        {"b": 250, "n": 1, "last": 3},
+        {"b": 2, "n": 1, "last": 30},
+    ]
+    assert connector.query(Query(
+        attributes=["b", "n"],
+        filters=BinaryPredicate("c", ">=", 30),
+        offset=1
+    )) == [{"b": 2, "n": 1}]
+
+    # The output can be sorted and limited.
+    sorted_connector = SortByConnector(["n", "b"], connector, desc=True)
+    assert LimitConnector(sorted_connector, 2).query(Query()) == [
+        {"b": 200, "n": 2, "last": 300},
+        {"b": 250, "n": 1, "last": 3},
+    ]
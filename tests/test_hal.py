@@ -4,6 +4,11 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+import json
+import pytest
+import re
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 from minifold.binary_predicate import BinaryPredicate
 from minifold.hal import HAL_ALIASES, HalConnector
 from minifold.log import Log
@@ -135,3 +140,135 @@ def test_lincs_laboratory_with_aliases():
     for entry in entries:
         assert set(entry.keys()) == set(attributes)
         assert entry["year"] == year
+
+
+# ---------------------------------------------------------------
+# Local mock HAL (Solr) server
+# ---------------------------------------------------------------
+
+MOCK_HAL_DOCS = [
+    {
+        "docid": i,
+        "title_s": ["Title %d" % i],
+        "producedDateY_i": 2000 + i % 7 if i % 10 else None,
+    } for i in range(53)
+]
+
+RE_RANGE = re.compile(r"(-?)(\w+):\[(\S+) TO (\S+)\]")
+
+
+def mock_hal_match(fq: str, doc: dict) -> bool:
+    (negate, key, start, end) = RE_RANGE.match(fq).groups()
+    value = doc.get(key)
+    match = value is not None and (
+        (start == "*" or value >= int(start))
+        and (end == "*" or value <= int(end))
+    )
+    return match != bool(negate)
+
+
+class MockHalHandler(BaseHTTPRequestHandler):
+    requests = list()
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        MockHalHandler.requests.append(params)
+        docs = [
+            doc for doc in MOCK_HAL_DOCS
+            if all(mock_hal_match(fq, doc) for fq in params.get("fq", []))
+        ]
+        rows = int(params["rows"][0])
+        data = {"response": {"numFound": len(docs)}}
+        if "cursorMark" in params:
+            assert "start" not in params
+            assert params["sort"][0].endswith("docid asc")
+            cursor_mark = params["cursorMark"][0]
+            start = 0 if cursor_mark == "*" else int(cursor_mark)
+            data["nextCursorMark"] = str(min(start + rows, len(docs)))
+        else:
+            start = int(params.get("start", [0])[0])
+        data["response"]["docs"] = [
+            {k: v for (k, v) in doc.items() if v is not None}
+            for doc in docs[start:start + rows]
+        ]
+        if "facet" in params:
+            counts = dict()
+            for doc in docs:
+                year = doc["producedDateY_i"]
+                counts[year] = counts.get(year, 0) + 1
+            data["facet_counts"] = {
+                "facet_fields": {
+                    "producedDateY_i": [
+                        x for (year, count) in counts.items()
+                        for x in (str(year) if year else None, count)
+                    ]
+                }
+            }
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url(http_server):
+    MockHalHandler.requests.clear()
+    return http_server(MockHalHandler)
+
+
+def test_hal_query_cursor_mark():
+    q = Query(object="publication", attributes=["title_s"])
+    obtained = HAL.query_to_hal(q, rows=100, cursor_mark="AoE/+w==")
+    expected = "https://api.archives-ouvertes.fr/search/?q=*:*&fl=title_s&rows=100&cursorMark=AoE%2F%2Bw%3D%3D&sort=submittedDate_tdate+desc,docid+asc&wt=json"
+    assert obtained == expected
+
+
+def test_hal_deep_paging(api_url):
+    hal = HalConnector(hal_api_url=api_url, page_size=10)
+    entries = hal.query(Query(object="publication"))
+    assert [entry["docid"] for entry in entries] == list(range(53))
+    assert len(MockHalHandler.requests) == 6
+
+
+def test_hal_offset_limit(api_url):
+    hal = HalConnector(hal_api_url=api_url, page_size=10)
+    # Single page
+    entries = hal.query(Query(object="publication", offset=5, limit=3))
+    assert [entry["docid"] for entry in entries] == [5, 6, 7]
+    # Several pages
+    entries = hal.query(Query(object="publication", offset=5, limit=25))
+    assert [entry["docid"] for entry in entries] == list(range(5, 30))
+    assert [int(params["rows"][0]) for params in MockHalHandler.requests] == [
+        3, 10, 10, 10
+    ]
+
+
+def test_hal_partitions(api_url):
+    hal = HalConnector(hal_api_url=api_url, page_size=10, max_workers=3)
+    entries = hal.query(Query(object="publication"))
+    assert sorted(entry["docid"] for entry in entries) == list(range(53))
+
+
+def test_hal_query_gen(api_url):
+    hal = HalConnector(hal_api_url=api_url, page_size=10)
+    gen = hal.query_gen(Query(object="publication"))
+    assert [next(gen)["docid"] for _ in range(10)] == list(range(10))
+    assert len(MockHalHandler.requests) == 1
+    gen.close()
+
+
+def test_hal_count(api_url):
+    hal = HalConnector(hal_api_url=api_url, page_size=10)
+    filters = BinaryPredicate("producedDateY_i", ">=", 2005)
+    expected = sum(
+        1 for doc in MOCK_HAL_DOCS
+        if doc["producedDateY_i"] is not None and doc["producedDateY_i"] >= 2005
+    )
+    assert hal.count(Query(object="publication", filters=filters)) == expected
+    assert hal.count(Query(object="publication", offset=50, limit=10)) == 3
+    assert [params["rows"] for params in MockHalHandler.requests] == [["0"], ["0"]]
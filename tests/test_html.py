@@ -73,5 +73,12 @@ try:
 
     def test_sanitize_html():
         assert sanitize_html(HTML2).rstrip() == EXPECTED2
+
+    def test_html_to_text_lxml():
+        from minifold.html import html_to_text, html_to_text_lxml
+        s_html = "<p>par1 <b>bold</b> tail<!-- comment --> end</p>"
+        assert html_to_text_lxml(s_html) == "par1 bold tail end"
+        assert html_to_text_lxml(HTML2) == html_to_text(HTML2)
+        assert html_to_text_lxml("") == ""
 except ImportError:
     pass
@@ -0,0 +1,85 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+from minifold.html_table import (
+    HtmlTableConnector, html_table, html_table_gen, html_table_gen_lxml
+)
+from minifold.query import Query
+
+HTML = """
+<html>
+    <body>
+        <table>
+            <tr><th>Name</th><th>Year</th><th>Tags</th></tr>
+            <tr><td>Alice <i>A.</i></td><td>2018</td><td>x</td><td>y</td></tr>
+            <tr><td>Bob</td><td>2019</td></tr>
+            <tr><td>Charlie  <!-- comment --> C.</td><td>2020</td><td>z</td></tr>
+        </table>
+    </body>
+</html>
+"""
+
+COLUMNS = ["name", "year", "tags"]
+
+EXPECTED = [
+    {"name": "AliceA.", "year": "2018", "tags": ["x", "y"]},
+    {"name": "Bob", "year": "2019"},
+    {"name": "CharlieC.", "year": "2020", "tags": "z"},
+]
+
+
+def keep_entry(entry: dict) -> bool:
+    return "name" in entry
+
+
+def make_html_file(tmp_path) -> str:
+    filename = str(tmp_path / "table.html")
+    with open(filename, "w") as f:
+        f.write(HTML)
+    return filename
+
+
+def test_html_table(tmp_path):
+    filename = make_html_file(tmp_path)
+    assert html_table(filename, COLUMNS, keep_entry) == EXPECTED
+
+
+def test_html_table_small_chunks(tmp_path):
+    filename = make_html_file(tmp_path)
+    for chunk_size in [1, 3, 7, 64]:
+        obtained = list(html_table_gen(filename, COLUMNS, keep_entry, chunk_size))
+        assert obtained == EXPECTED
+
+
+def test_html_table_gen_is_lazy(tmp_path):
+    filename = make_html_file(tmp_path)
+    seen = list()
+
+    def keep_and_record(entry: dict) -> bool:
+        seen.append(entry)
+        return keep_entry(entry)
+
+    gen = html_table_gen(filename, COLUMNS, keep_and_record, chunk_size=16)
+    assert next(gen) == EXPECTED[0]
+    assert len(seen) < 4
+
+
+def test_html_table_lxml(tmp_path):
+    filename = make_html_file(tmp_path)
+    try:
+        obtained = list(html_table_gen_lxml(filename, COLUMNS, keep_entry))
+    except ImportError:
+        return
+    assert obtained == EXPECTED
+
+
+def test_html_table_connector(tmp_path):
+    filename = make_html_file(tmp_path)
+    for use_lxml in [False, True]:
+        connector = HtmlTableConnector(filename, COLUMNS, keep_entry, use_lxml)
+        assert connector.attributes(None) == set(COLUMNS)
+        obtained = connector.query(Query(attributes=["name"], limit=2))
+        assert obtained == [{"name": "AliceA."}, {"name": "Bob"}]
@@ -0,0 +1,66 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+from minifold.hyperloglog import HyperLogLog, error_to_precision, hash64
+
+
+def test_error_to_precision():
+    assert error_to_precision(0.5) == 4
+    assert error_to_precision(0.0001) == 18
+    try:
+        error_to_precision(0)
+        assert False, "ValueError not raised"
+    except ValueError:
+        pass
+
+
+def test_hash64_is_stable():
+    # Unlike hash(), hash64() does not depend on PYTHONHASHSEED.
+    import subprocess
+    import sys
+    script = "from minifold.hyperloglog import hash64; print(hash64('abc'))"
+    for seed in ["1", "2"]:
+        output = subprocess.check_output(
+            [sys.executable, "-c", script],
+            env={"PYTHONHASHSEED": seed, "PYTHONPATH": ":".join(sys.path)}
+        )
+        assert int(output) == hash64("abc")
+    assert hash64([1, 2]) == hash64([1, 2])
+    assert hash64("abc") != hash64("abd")
+    assert hash64(1) != hash64("1")
+    assert hash64([1, 2]) != hash64("(1, 2)")
+
+
+def test_hyperloglog_small():
+    hll = HyperLogLog()
+    assert len(hll) == 0
+    hll.update(["a", "b", "a", "c"])
+    assert len(hll) == 3
+
+
+def test_hyperloglog_error_bound():
+    for error in [0.1, 0.02]:
+        hll = HyperLogLog(error)
+        assert hll.error <= error
+        n = 50000
+        hll.update(range(n))
+        # 4 standard deviations
+        assert abs(len(hll) - n) <= 4 * error * n
+
+
+def test_hyperloglog_merge():
+    (hll1, hll2) = (HyperLogLog(0.02), HyperLogLog(0.02))
+    hll1.update(range(0, 30000))
+    hll2.update(range(20000, 50000))
+    union = hll1 | hll2
+    assert abs(len(union) - 50000) <= 4 * 0.02 * 50000
+    hll1.merge(hll2)
+    assert len(hll1) == len(union)
+    try:
+        hll1.merge(HyperLogLog(0.1))
+        assert False, "ValueError not raised"
+    except ValueError:
+        pass
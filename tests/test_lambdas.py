@@ -4,12 +4,16 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+from operator import itemgetter
 from minifold.entries_connector import EntriesConnector
 from minifold.query import Query
 from minifold.lambdas import (
     LambdasConnector,
+    MemoizedLambda,
     find_lambda_dependencies,
-    find_lambdas_dependencies
+    find_lambda_dependencies_static,
+    find_lambdas_dependencies,
+    parallel_lambdas
 )
 
 ENTRIES = [
@@ -160,3 +164,171 @@ def test_lambdas_attributes():
         "d"
     }
     assert obtained == expected
+
+
+def test_find_lambda_dependencies_static():
+    calls = list()
+
+    def f(e):
+        calls.append(None)
+        return e["a"] + e.get("b", 0) if e["c"] else e["d"]
+
+    assert find_lambda_dependencies_static(f) == {"a", "b", "c", "d"}
+    assert find_lambda_dependencies(f) == {"a", "b", "c", "d"}
+    assert calls == []
+
+
+def test_find_lambda_dependencies_fallback():
+    def f(e):
+        key = "a"
+        return e[key] + len(e)
+
+    assert find_lambda_dependencies_static(f) is None
+    assert find_lambda_dependencies(f) == {"a"}
+    assert find_lambda_dependencies_static(max) is None
+
+
+def test_find_lambda_dependencies_cached():
+    calls = list()
+
+    def f(e):
+        calls.append(e)
+        return e[sorted(["a"])[0]]
+
+    assert find_lambda_dependencies(f) == {"a"}
+    num_calls = len(calls)
+    assert num_calls > 0
+    assert find_lambda_dependencies(f) == {"a"}
+    assert len(calls) == num_calls
+
+
+def test_memoized_lambda():
+    calls = list()
+
+    def f(e):
+        calls.append(None)
+        return e["a"] * 2
+
+    g = MemoizedLambda(f, max_size=2)
+    assert [g({"a": a, "b": a}) for a in [1, 1, 2, 1, 3, 1]] == [2, 2, 4, 2, 6, 2]
+    assert len(calls) == 3
+    assert (g.hits, g.misses) == (3, 3)
+    assert g({"a": [1]}) == [1, 1]
+
+
+def test_memoized_lambda_optional_key():
+    calls = list()
+
+    def f(e):
+        calls.append(None)
+        return e["a"] + e.get("b", 0)
+
+    g = MemoizedLambda(f)
+    assert [g(e) for e in [{"a": 1}, {"a": 1}, {"a": 1, "b": 2}, {"a": 1}]] == [1, 1, 3, 1]
+    assert len(calls) == 2
+    assert (g.hits, g.misses) == (2, 2)
+    # A present None value is not confused with a missing key.
+    try:
+        g({"a": 1, "b": None})
+        assert False, "TypeError not raised"
+    except TypeError:
+        pass
+
+
+def test_lambdas_memoize():
+    calls = list()
+
+    def f(e):
+        calls.append(None)
+        return e["a"] % 2
+
+    entries = [{"a": a % 3} for a in range(10)]
+    connector = LambdasConnector({"parity": f}, EntriesConnector(entries), memoize=True)
+    obtained = connector.query(Query(attributes=["a", "parity"]))
+    assert obtained == [{"a": a % 3, "parity": (a % 3) % 2} for a in range(10)]
+    assert len(calls) == 3
+
+    connector = LambdasConnector({"parity": f}, EntriesConnector(entries), memoize={"other"})
+    connector.query(Query())
+    assert len(calls) == 13
+
+
+def get_title(e: dict) -> str:
+    return e.get("title").lower()
+
+
+def test_lambdas_memoize_probed_dependencies():
+    # The dependencies of the lambda cannot be inferred from its bytecode.
+    entries = [{"title": title} for title in ["A", "B", "A", "C"]]
+    connector = LambdasConnector(
+        {"t": lambda e: get_title(e)},
+        EntriesConnector(entries),
+        memoize=True
+    )
+    assert [e["t"] for e in connector.query(Query())] == ["a", "b", "a", "c"]
+    assert (connector.m_map_lambdas["t"].hits, connector.m_map_lambdas["t"].misses) == (1, 3)
+
+
+def test_memoized_lambda_typed_key():
+    g = MemoizedLambda(lambda e: str(e["a"]))
+    assert [g({"a": a}) for a in [1, True, 1.0, [1], (1,), 1]] == ["1", "True", "1.0", "[1]", "(1,)", "1"]
+    assert (g.hits, g.misses) == (1, 5)
+
+
+def entry_size(e: dict) -> int:
+    # Not inferred from the bytecode: find_lambda_dependencies probes it.
+    return e.get("x", 0) + len(e)
+
+
+def test_parallel_lambdas_probed_dependencies():
+    entries = [{"x": x, "y": -x} for x in range(20)]
+    for use_processes in [True, False]:
+        serial = LambdasConnector({"z": entry_size}, EntriesConnector([dict(e) for e in entries]))
+        parallel = LambdasConnector(
+            {"z": entry_size},
+            EntriesConnector([dict(e) for e in entries]),
+            max_workers=2,
+            chunk_size=3,
+            use_processes=use_processes
+        )
+        expected = serial.query(Query())
+        assert [e["z"] for e in expected] == [x + 2 for x in range(20)]
+        assert parallel.query(Query()) == expected
+
+
+def test_parallel_lambdas_processes():
+    entries = [{"a": a, "b": -a} for a in range(25)]
+    obtained = parallel_lambdas(
+        {"c": itemgetter("a"), "d": itemgetter("b")},
+        entries,
+        attributes={"a", "c"},
+        max_workers=2,
+        chunk_size=4
+    )
+    assert obtained is entries
+    assert obtained == [{"a": a, "b": -a, "c": a} for a in range(25)]
+
+
+def test_parallel_lambdas_threads():
+    entries = [{"a": a} for a in range(25)]
+    obtained = parallel_lambdas(
+        {"a2": lambda e: e["a"] ** 2, "a3": lambda e: e["a"] * e["a2"], "x": lambda e: e["x"]},
+        entries,
+        max_workers=2,
+        chunk_size=4
+    )
+    assert obtained == [{"a": a, "a2": a ** 2, "a3": a ** 3, "x": None} for a in range(25)]
+
+
+def test_lambdas_parallel():
+    connector = LambdasConnector(
+        MAP_LAMBDAS,
+        EntriesConnector(ENTRIES),
+        max_workers=2,
+        chunk_size=1,
+        memoize=True
+    )
+    expected = LambdasConnector(MAP_LAMBDAS, EntriesConnector(ENTRIES)).query(Query())
+    assert connector.query(Query()) == expected
+    obtained = connector.query(Query(attributes=["a2", "a3"], filters=lambda e: e["a2"] == 100))
+    assert obtained == [{"a2": 100, "a3": 1000}]
@@ -0,0 +1,121 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+from minifold.binary_predicate import BinaryPredicate
+from minifold.query import Query
+
+try:
+    import threading
+    from ldap3 import Server, Connection, MOCK_SYNC, OFFLINE_SLAPD_2_4
+    from minifold.ldap import LdapConnectionPool, LdapConnector
+
+    BASE_DN = "ou=people,dc=example,dc=com"
+    SERVER = Server("fake", get_info=OFFLINE_SLAPD_2_4)
+    NUM_ENTRIES = 10
+
+    class MockLdapConnector(LdapConnector):
+        num_connections = 0
+
+        def connect(self) -> Connection:
+            MockLdapConnector.num_connections += 1
+            connection = Connection(SERVER, client_strategy=MOCK_SYNC)
+            for i in range(NUM_ENTRIES):
+                connection.strategy.add_entry(
+                    "cn=user%d,%s" % (i, BASE_DN),
+                    {
+                        "objectClass": "person",
+                        "cn": "user%d" % i,
+                        "sn": "last%d" % (i % 2),
+                    }
+                )
+            connection.bind()
+            return connection
+
+    def make_connector(**kwargs) -> LdapConnector:
+        return MockLdapConnector("fake", **kwargs)
+
+    def test_ldap_paged_search():
+        connector = make_connector(page_size=3)
+        entries = connector.query(
+            Query(object=BASE_DN, attributes=["cn", "sn"])
+        )
+        assert len(entries) == NUM_ENTRIES
+        assert {entry["cn"] for entry in entries} == {
+            "user%d" % i for i in range(NUM_ENTRIES)
+        }
+
+    def test_ldap_filter_offset_limit():
+        connector = make_connector(page_size=2)
+        entries = connector.query(
+            Query(
+                object=BASE_DN,
+                attributes=["cn"],
+                filters=BinaryPredicate("sn", "==", "last1"),
+                offset=1,
+                limit=3
+            )
+        )
+        assert len(entries) == 3
+        assert all(entry.keys() == {"cn"} for entry in entries)
+
+    def test_ldap_limit_zero():
+        connector = make_connector(page_size=2)
+        assert connector.query(Query(object=BASE_DN, limit=0)) == []
+        assert connector.query(Query(object=BASE_DN, offset=3, limit=0)) == []
+        assert list(connector.query_gen(Query(object=BASE_DN, limit=0))) == []
+
+    def test_ldap_query_gen():
+        connector = make_connector(page_size=2)
+        gen = connector.query_gen(Query(object=BASE_DN, attributes=["cn"]))
+        assert "cn" in next(gen)
+        assert len(list(gen)) == NUM_ENTRIES - 1
+
+    def test_ldap_attributes_cached():
+        connector = make_connector()
+        attributes = connector.attributes(BASE_DN)
+        assert {"cn", "sn"} <= attributes
+        assert connector.m_attributes is not None
+        attributes.clear()
+        assert connector.attributes(BASE_DN)
+
+    def test_ldap_connection_pool():
+        num_connections = MockLdapConnector.num_connections
+        connector = make_connector(pool_size=2)
+        gen1 = connector.query_gen(Query(object=BASE_DN))
+        gen2 = connector.query_gen(Query(object=BASE_DN))
+        next(gen1)
+        next(gen2)
+        # Both queries are pending, so they use distinct connections.
+        assert MockLdapConnector.num_connections == num_connections + 2
+        gen1.close()
+        gen2.close()
+
+        results = list()
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(connector.query(Query(object=BASE_DN)))
+            ) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [len(entries) for entries in results] == [NUM_ENTRIES] * 4
+        assert MockLdapConnector.num_connections == num_connections + 2
+
+    def test_ldap_connection_pool_blocks():
+        pool = LdapConnectionPool(lambda: object(), 1)
+        connection = pool.acquire()
+        acquired = list()
+        thread = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        thread.start()
+        thread.join(0.1)
+        assert acquired == []
+        pool.release(connection)
+        thread.join()
+        assert acquired == [connection]
+except ImportError:
+    pass
@@ -0,0 +1,121 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+from minifold.binary_predicate import BinaryPredicate
+from minifold.mongo import MongoConnector
+from minifold.query import Query, SORT_DESC
+
+ENTRIES = [
+    {"a": 1, "b": 2, "c": 3},
+    {"a": 10, "b": 20, "c": 30},
+    {"a": 100, "b": 200, "c": 300},
+    {"a": 100, "b": 200, "d": 400},
+]
+
+
+def test_binary_predicate_to_mongo():
+    p = BinaryPredicate(
+        BinaryPredicate("a", "<=", 10),
+        "||",
+        BinaryPredicate(
+            BinaryPredicate("b", "IN", (200, 300)),
+            "&&",
+            BinaryPredicate("c", "!=", 300)
+        )
+    )
+    assert MongoConnector.binary_predicate_to_mongo(p) == {
+        "$or": [
+            {"a": {"$lte": 10}},
+            {
+                "$and": [
+                    {"b": {"$in": [200, 300]}},
+                    {"c": {"$ne": 300, "$exists": True}},
+                ]
+            }
+        ]
+    }
+
+
+def test_binary_predicate_to_mongo_unsupported():
+    for p in [
+        BinaryPredicate("a", "CONTAINS", "substring"),
+        BinaryPredicate(BinaryPredicate("a", "==", 1), "^", BinaryPredicate("b", "==", 2)),
+    ]:
+        try:
+            MongoConnector.binary_predicate_to_mongo(p)
+            assert False, "ValueError not raised for %s" % p
+        except ValueError:
+            pass
+
+
+try:
+    import mongomock
+
+    class MockMongoConnector(MongoConnector):
+        def connect(self, mongo_url: str):
+            client = mongomock.MongoClient()
+            client["db"]["entries"].insert_many([dict(entry) for entry in ENTRIES])
+            return client
+
+    def without_id(entries: list) -> list:
+        return [
+            {k: v for (k, v) in entry.items() if k != "_id"}
+            for entry in entries
+        ]
+
+    def test_mongo_connector_pushdown():
+        connector = MockMongoConnector("mongodb://localhost", "db", batch_size=2)
+        obtained = connector.query(
+            Query(
+                object="entries",
+                attributes=["a", "b"],
+                filters=BinaryPredicate("a", ">=", 10),
+                sort_by={"a": SORT_DESC, "b": SORT_DESC},
+                offset=1,
+                limit=2
+            )
+        )
+        assert without_id(obtained) == [
+            {"a": 100, "b": 200},
+            {"a": 10, "b": 20},
+        ]
+
+    def test_mongo_connector_local_filter():
+        # The filter is applied before the OFFSET and the LIMIT.
+        connector = MockMongoConnector("mongodb://localhost", "db")
+        obtained = connector.query(
+            Query(
+                object="entries",
+                attributes=["a"],
+                filters=lambda entry: entry["b"] >= 20,
+                limit=1
+            )
+        )
+        assert without_id(obtained) == [{"a": 10}]
+
+    def test_mongo_connector_query_gen():
+        connector = MockMongoConnector("mongodb://localhost", "db")
+        gen = connector.query_gen(Query(object="entries"))
+        assert without_id([next(gen)]) == [ENTRIES[0]]
+        assert len(list(gen)) == 3
+
+    def test_mongo_connector_limit_zero():
+        # For Mongo, limit=0 means no limit, but LIMIT 0 returns nothing.
+        connector = MockMongoConnector("mongodb://localhost", "db")
+        for filters in [None, BinaryPredicate("a", ">=", 10), lambda entry: entry["b"] >= 20]:
+            q = Query(object="entries", filters=filters, limit=0)
+            assert connector.query(q) == []
+            assert connector.count(q) == 0
+
+    def test_mongo_connector_count():
+        connector = MockMongoConnector("mongodb://localhost", "db")
+        assert connector.count(Query(object="entries")) == 4
+        assert connector.count(Query(object="entries", filters=BinaryPredicate("a", ">=", 10))) == 3
+        assert connector.count(Query(object="entries", offset=1, limit=2)) == 2
+        assert connector.count(Query(object="entries", limit=0)) == 0
+        assert connector.count(Query(object="entries", filters=lambda e: e["a"] == 100)) == 2
+except ImportError:
+    pass
@@ -0,0 +1,146 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import pytest
+from http.server import BaseHTTPRequestHandler
+from minifold.download import DownloadConnector
+from minifold.entries_connector import EntriesConnector
+from minifold.page_store import PageStore, callable_name
+from minifold.query import Query
+
+
+class EtagHandler(BaseHTTPRequestHandler):
+    """
+    ``/<i>`` replies an HTML page, whose ETag is ``"v<version>"``.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    version = 1
+    num_200 = 0
+    num_304 = 0
+
+    def do_GET(self):
+        etag = '"v%d"' % EtagHandler.version
+        if self.headers.get("If-None-Match") == etag:
+            EtagHandler.num_304 += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        EtagHandler.num_200 += 1
+        body = (
+            "<html><body><p>page %s version %d</p></body></html>" % (
+                self.path.split("?")[0].strip("/"), EtagHandler.version
+            )
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url(http_server):
+    EtagHandler.version = 1
+    EtagHandler.num_200 = 0
+    EtagHandler.num_304 = 0
+    return http_server(EtagHandler)
+
+
+def test_page_store_revalidation(tmp_path, url):
+    store = PageStore(str(tmp_path))
+    page_url = url + "/1"
+    response = store.download(page_url)
+    assert response.text == "<html><body><p>page 1 version 1</p></body></html>"
+    assert page_url in store
+
+    # Not modified: the stored copy is returned.
+    response = store.download(page_url)
+    assert (EtagHandler.num_200, EtagHandler.num_304) == (1, 1)
+    assert response.text == "<html><body><p>page 1 version 1</p></body></html>"
+
+    # Modified: the new version is stored.
+    EtagHandler.version = 2
+    response = store.download(page_url)
+    assert (EtagHandler.num_200, EtagHandler.num_304) == (2, 1)
+    assert store.get(page_url).text == "<html><body><p>page 1 version 2</p></body></html>"
+
+    # The store is persistent.
+    store.close()
+    store = PageStore(str(tmp_path))
+    assert store.get(page_url).text == "<html><body><p>page 1 version 2</p></body></html>"
+
+
+def test_page_store_content_addressed(tmp_path, url):
+    store = PageStore(str(tmp_path))
+    store.download(url + "/same")
+    store.download(url + "/same?x=1")
+    assert store.digest(url + "/same") == store.digest(url + "/same?x=1")
+    store.put_text(url + "/same", "extractor", "text")
+    assert store.text(url + "/same?x=1", "extractor") == "text"
+    assert store.text(url + "/same?x=1", "other") is None
+
+
+def test_page_store_eviction(tmp_path, url):
+    store = PageStore(str(tmp_path), max_size=200)
+    for i in range(10):
+        store.download("%s/%d" % (url, i))
+        assert store.size <= 200
+    assert url + "/9" in store
+    assert url + "/0" not in store
+
+
+def test_page_store_size(tmp_path, url):
+    def sql_size(store) -> int:
+        return sum(
+            store.m_connection.execute("SELECT COALESCE(SUM(size), 0) FROM %s" % table).fetchone()[0]
+            for table in ["bodies", "texts"]
+        )
+
+    store = PageStore(str(tmp_path), max_size=300)
+    for i in range(10):
+        store.download("%s/%d" % (url, i % 4))
+        store.put_text("%s/%d" % (url, i % 4), "extractor", "text %d" % i)
+        assert store.size == sql_size(store)
+        assert store.size <= 300
+    size = store.size
+    store.close()
+    store = PageStore(str(tmp_path), max_size=300)
+    assert store.size == size
+
+
+def extract_text(response) -> str:
+    extract_text.num_calls += 1
+    return response.text.upper()
+
+
+extract_text.num_calls = 0
+
+
+def test_download_connector_store(tmp_path, url):
+    entries = [{"url": "%s/%d" % (url, i)} for i in range(5)]
+    store = PageStore(str(tmp_path))
+    for _ in range(2):
+        c = DownloadConnector(
+            {"url": "text"},
+            EntriesConnector(entries),
+            extract_response=extract_text,
+            store=store
+        )
+        obtained = c.query(Query(attributes=["text"]))
+        assert obtained[3] == {"text": "<HTML><BODY><P>PAGE 3 VERSION 1</P></BODY></HTML>"}
+    assert (EtagHandler.num_200, EtagHandler.num_304) == (5, 5)
+    assert extract_text.num_calls == 5
+
+
+def test_callable_name():
+    assert callable_name(extract_text) == "test_page_store.extract_text"
@@ -0,0 +1,151 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import itertools
+import threading
+import time
+import pytest
+from minifold.connector import Connector
+from minifold.entries_connector import EntriesConnector
+from minifold.lambdas import LambdasConnector
+from minifold.limit import LimitConnector
+from minifold.pipeline import PipelineConnector
+from minifold.query import ACTION_CREATE, Query
+from minifold.select import SelectConnector
+from minifold.sqlite import SqliteConnector
+from minifold.where import WhereConnector
+
+ENTRIES = [{"a": i, "b": i % 3} for i in range(1000)]
+
+
+class GeneratorConnector(Connector):
+    """
+    Streams the entries ``{"a": 0}, {"a": 1}, ...``, possibly without end.
+    """
+    def __init__(self, num_entries: int = None, fail_at: int = None):
+        super().__init__()
+        self.num_entries = num_entries
+        self.fail_at = fail_at
+        self.num_produced = 0
+        self.closed = threading.Event()
+
+    def attributes(self, object: str) -> set:
+        return {"a"}
+
+    def query_gen(self, q: Query) -> iter:
+        try:
+            for i in itertools.count():
+                if i == self.num_entries:
+                    break
+                if i == self.fail_at:
+                    raise ValueError("failure at %s" % i)
+                self.num_produced += 1
+                yield {"a": i}
+        finally:
+            self.closed.set()
+
+    def query(self, q: Query) -> list:
+        super().query(q)
+        return self.answer(q, list(self.query_gen(q)))
+
+
+def test_pipeline_query():
+    for chunk_size in [1, 7, 1000]:
+        connector = PipelineConnector(EntriesConnector(ENTRIES), queue_size=2, chunk_size=chunk_size)
+        assert connector.query(Query()) == ENTRIES
+        assert connector.query(Query(filters=lambda e: e["b"] == 0, limit=3)) == [
+            {"a": 0, "b": 0}, {"a": 3, "b": 0}, {"a": 6, "b": 0}
+        ]
+        assert connector.count(Query()) == len(ENTRIES)
+
+
+def test_pipeline_stages():
+    def make_plan(source):
+        return SelectConnector(
+            WhereConnector(
+                LambdasConnector({"c": lambda e: 2 * e["a"]}, source),
+                lambda e: e["b"] == 1
+            ),
+            ["c"]
+        )
+    expected = make_plan(EntriesConnector(ENTRIES)).query(Query())
+    pipelined = make_plan(PipelineConnector(EntriesConnector(ENTRIES), chunk_size=10))
+    assert pipelined.query(Query()) == expected
+    assert list(pipelined.query_gen(Query())) == expected
+
+
+def test_pipeline_unbounded_source():
+    # Every stage streams, so that the LIMIT stops the endless source.
+    source = GeneratorConnector()
+    connector = LimitConnector(
+        WhereConnector(
+            LambdasConnector({"b": lambda e: e["a"] % 2}, PipelineConnector(source)),
+            lambda e: e["b"] == 0
+        ),
+        3
+    )
+    assert list(connector.query_gen(Query())) == [
+        {"a": 0, "b": 0}, {"a": 2, "b": 0}, {"a": 4, "b": 0}
+    ]
+    assert source.closed.wait(5)
+
+
+def test_pipeline_backpressure():
+    (queue_size, chunk_size) = (2, 5)
+    source = GeneratorConnector()
+    entries = PipelineConnector(source, queue_size=queue_size, chunk_size=chunk_size).query_gen(Query())
+    assert next(entries) == {"a": 0}
+    time.sleep(0.5)
+    # The queued chunks, the chunk being built and the chunk being consumed.
+    assert source.num_produced <= (queue_size + 2) * chunk_size + 1
+    entries.close()
+    assert source.closed.wait(5)
+
+
+def test_pipeline_exception():
+    source = GeneratorConnector(fail_at=100)
+    entries = PipelineConnector(source, chunk_size=10).query_gen(Query())
+    with pytest.raises(ValueError):
+        for (i, entry) in enumerate(entries):
+            assert entry == {"a": i}
+    assert source.closed.wait(5)
+
+
+def test_pipeline_processes():
+    connector = PipelineConnector(EntriesConnector(ENTRIES), chunk_size=10, use_processes=True)
+    assert connector.query(Query()) == ENTRIES
+    entries = connector.query_gen(Query())
+    assert next(entries) == ENTRIES[0]
+    entries.close()
+
+
+def test_pipeline_processes_fallback():
+    # The source is not picklable (it owns a threading.Event), so it runs in a thread.
+    connector = PipelineConnector(GeneratorConnector(5), use_processes=True)
+    assert connector.query(Query()) == [{"a": i} for i in range(5)]
+
+
+def test_pipeline_sqlite():
+    sqlite = SqliteConnector(":memory:", batch_size=10)
+    sqlite.connection.execute("CREATE TABLE t (a INTEGER, b INTEGER)")
+    sqlite.query(Query(action=ACTION_CREATE, object="t", values=ENTRIES))
+    # The SQLite connection is created by this thread and used by the stage threads.
+    for use_processes in [False, True]:
+        connector = PipelineConnector(sqlite, chunk_size=7, use_processes=use_processes)
+        assert connector.query(Query(object="t")) == ENTRIES
+    # Concurrent cursors on the same connection.
+    (gen1, gen2) = (
+        PipelineConnector(sqlite, queue_size=1, chunk_size=5).query_gen(Query(object="t"))
+        for _ in range(2)
+    )
+    assert list(zip(gen1, gen2)) == [(entry, entry) for entry in ENTRIES]
+
+
+def test_pipeline_invalid_sizes():
+    with pytest.raises(ValueError):
+        PipelineConnector(EntriesConnector(ENTRIES), queue_size=0)
+    with pytest.raises(ValueError):
+        PipelineConnector(EntriesConnector(ENTRIES), chunk_size=0)
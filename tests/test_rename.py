@@ -48,3 +48,24 @@ def test_rename_select_where():
 def test_rename_attributes():
     obtained = RENAME_CONNECTOR.attributes(None)
     assert obtained == {"A", "b", "C", "D"}
+
+
+def test_rename_does_not_mutate():
+    entries = [{"a": 1, "b": 2}, {"a": 10, "b": 20}]
+    child = EntriesConnector(entries)
+    connector = RenameConnector({"a": "A"}, child)
+    filters = BinaryPredicate(BinaryPredicate("A", ">", 1), "&&", BinaryPredicate("b", "==", "A"))
+    query = Query(attributes=["A", "b"], filters=filters, sort_by={"A": True})
+
+    assert connector.query(query) == []
+    assert connector.query(Query(filters=BinaryPredicate("A", ">", 1))) == [{"A": 10, "b": 20}]
+    assert entries == [{"a": 1, "b": 2}, {"a": 10, "b": 20}]
+    assert query.attributes == ["A", "b"]
+    assert query.filters is filters
+    assert str(filters) == "A > 1 AND b == A"
+    assert query.sort_by == {"A": True}
+
+
+def test_rename_lambda_filters():
+    obtained = RENAME_CONNECTOR.query(Query(filters=lambda e: e["A"] == 10))
+    assert obtained == [{"A": 10, "b": 20, "C": 30, "D": None}]
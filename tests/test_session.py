@@ -0,0 +1,74 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import pytest
+from http.server import BaseHTTPRequestHandler
+from minifold.download import download
+from minifold.proxy import make_session, proxy_enable_localhost, proxy_disable
+from minifold.session import SessionManager, get_session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True
+    clients = set()
+
+    def do_GET(self):
+        KeepAliveHandler.clients.add(self.client_address)
+        body = b"hello"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url(http_server):
+    KeepAliveHandler.clients.clear()
+    return http_server(KeepAliveHandler)
+
+
+def test_session_manager_singleton():
+    assert SessionManager() is SessionManager()
+    assert get_session() is get_session()
+
+
+def test_session_proxy():
+    session = get_session()
+    proxy_enable_localhost()
+    assert session.proxies == {}  # Refreshed when the session is handed out.
+    assert get_session().proxies["http"] == "http://127.0.0.1:8080"
+    proxy_disable()
+    assert get_session().proxies == {}
+
+
+def test_download_keep_alive(url):
+    num_queries = 20
+    for i in range(num_queries):
+        session = make_session()
+        session.get("%s/fresh/%d" % (url, i)).close()
+        session.close()
+    num_clients = len(KeepAliveHandler.clients)
+    assert num_clients == num_queries
+
+    KeepAliveHandler.clients.clear()
+    for i in range(num_queries):
+        response = download("%s/pooled/%d" % (url, i))
+        assert response.text == "hello"
+    assert len(KeepAliveHandler.clients) == 1
+
+
+def test_session_manager_pool_size(url):
+    host = url.split("://")[1]
+    manager = SessionManager()
+    manager.set_pool_size(host, 4)
+    adapter = get_session().get_adapter(url + "/")
+    assert adapter._pool_maxsize == 4
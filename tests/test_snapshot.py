@@ -0,0 +1,97 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+import datetime
+import json
+import pickle
+from minifold.binary_predicate import BinaryPredicate
+from minifold.query import Query
+from minifold.snapshot import (
+    Snapshot, SnapshotConnector, infer_column_type, is_snapshot, json_to_snapshot,
+    pickle_to_snapshot, save_snapshot, snapshot_to_json, snapshot_to_pickle
+)
+
+ENTRIES = [
+    {"name": "alice", "age": 31, "score": 1.5, "admin": True, "tags": ["a", "b"]},
+    {"name": "bob", "age": None, "score": 2.5, "admin": False},
+    {"name": "alice", "age": 1 << 70, "date": datetime.date(2020, 1, 1)},
+    {"name": "élodie", "tags": None},
+    {},
+]
+
+
+def test_infer_column_type():
+    assert infer_column_type([True, None, False]) == "bool"
+    assert infer_column_type([1, 2]) == "int"
+    assert infer_column_type([1, 1 << 70]) == "pickle"
+    assert infer_column_type([1.0, None]) == "float"
+    assert infer_column_type(["a", None]) == "str"
+    assert infer_column_type([[1], "a"]) == "pickle"
+
+
+def test_snapshot(tmp_path):
+    directory = str(tmp_path / "snapshot")
+    assert not is_snapshot(directory)
+    save_snapshot(ENTRIES, directory)
+    assert is_snapshot(directory)
+    with Snapshot(directory) as snapshot:
+        assert len(snapshot) == len(ENTRIES)
+        assert list(snapshot) == ENTRIES
+        assert snapshot[-2] == ENTRIES[-2]
+        assert snapshot[1:3] == ENTRIES[1:3]
+        assert snapshot.columns["name"].type == "str"
+        assert snapshot.columns["score"].type == "float"
+        assert snapshot.columns["tags"][0] == ["a", "b"]
+        assert snapshot.entry(0, ["name", "age"]) == {"name": "alice", "age": 31}
+
+
+def test_snapshot_empty(tmp_path):
+    directory = str(tmp_path / "snapshot")
+    save_snapshot(list(), directory)
+    with Snapshot(directory) as snapshot:
+        assert list(snapshot) == list()
+
+
+def test_snapshot_conversions(tmp_path):
+    entries = [{"a": 1, "b": "x"}, {"a": 2, "c": [1, 2]}]
+
+    pickle_filename = str(tmp_path / "cache.pkl")
+    with open(pickle_filename, "wb") as f:
+        pickle.dump(entries, f)
+    pickle_to_snapshot(pickle_filename, str(tmp_path / "from_pickle"))
+    snapshot_to_json(str(tmp_path / "from_pickle"), str(tmp_path / "cache.json"))
+    with open(str(tmp_path / "cache.json")) as f:
+        assert json.load(f) == entries
+
+    json_to_snapshot(str(tmp_path / "cache.json"), str(tmp_path / "from_json"))
+    snapshot_to_pickle(str(tmp_path / "from_json"), str(tmp_path / "cache2.pkl"))
+    with open(str(tmp_path / "cache2.pkl"), "rb") as f:
+        assert pickle.load(f) == entries
+
+
+def test_snapshot_connector(tmp_path):
+    directory = str(tmp_path / "snapshot")
+    calls = list()
+
+    def load_entries() -> list:
+        calls.append(True)
+        return ENTRIES
+
+    with SnapshotConnector(directory, load_entries) as connector:
+        assert connector.attributes(None) == {"name", "age", "score", "admin", "tags", "date"}
+        assert connector.query(Query(attributes=["name", "age"], offset=1, limit=2)) == [
+            {"name": "bob", "age": None},
+            {"name": "alice", "age": 1 << 70},
+        ]
+        assert connector.query(Query(
+            attributes=["score"],
+            filters=BinaryPredicate("name", "==", "alice")
+        )) == [{"score": 1.5}, {"score": None}]
+
+    # The snapshot is reused.
+    with SnapshotConnector(directory, load_entries) as connector:
+        assert len(connector.query(Query())) == len(ENTRIES)
+    assert len(calls) == 1
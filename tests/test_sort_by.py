@@ -4,9 +4,10 @@
 # This file is part of the minifold project.
 # https://github.com/nokia/minifold
 
+import tempfile
 from minifold.entries_connector import EntriesConnector
-from minifold.query import Query
-from minifold.sort_by import sort_by, SortByConnector
+from minifold.query import Query, SORT_ASC, SORT_DESC
+from minifold.sort_by import external_sort, sort_by, SortByConnector
 
 
 ENTRIES = [
@@ -114,3 +115,73 @@ def test_sort_by_connector():
         {"a": 10, "b": 200, "c": 300},
         {"a": 1, "b": 250, "c": 3}
     ]
+
+
+def test_sort_by_mixed_orders():
+    obtained = sort_by({"b": SORT_DESC, "a": SORT_ASC}, ENTRIES)
+    assert obtained == [
+        {"a": 1, "b": 250, "c": 3},
+        {"a": 1, "b": 200, "c": 31},
+        {"a": 10, "b": 200, "c": 300},
+        {"a": 100, "b": 2, "c": 30},
+    ]
+    assert sort_by({"a": SORT_ASC}, ENTRIES) == EXPECTED_ASC["a"]
+    assert sort_by({"a": SORT_DESC, "b": SORT_DESC}, ENTRIES) == EXPECTED_DESC[("a", "b")]
+
+
+def test_external_sort():
+    # Stability: "i" records the input order.
+    entries = [
+        {"k": (i * 7) % 10, "s": "abcde"[(i * 3) % 5], "i": i}
+        for i in range(103)
+    ]
+    for sort_by_attributes in [
+        ["k"],
+        {"k": SORT_DESC},
+        {"s": SORT_DESC, "k": SORT_ASC},
+    ]:
+        expected = sort_by(sort_by_attributes, entries)
+        for codec in ["pickle", "json"]:
+            for max_run_size in [1, 10, 103, 1000]:
+                obtained = sort_by(sort_by_attributes, entries, max_run_size=max_run_size, codec=codec)
+                assert obtained == expected
+
+
+def test_external_sort_spills(tmp_path, monkeypatch):
+    runs = list()
+
+    def temporary_file(*args, **kwargs):
+        f = temporary_file_impl(*args, **kwargs)
+        runs.append(f)
+        return f
+
+    temporary_file_impl = tempfile.TemporaryFile
+    monkeypatch.setattr(tempfile, "TemporaryFile", temporary_file)
+    entries = [{"a": i % 17} for i in range(100)]
+    gen = external_sort(iter(entries), lambda entry: entry["a"], max_run_size=10, temp_dir=str(tmp_path))
+    assert next(gen) == {"a": 0}
+    # The 100 entries have been spilled in 10 runs.
+    assert len(runs) == 10
+    gen.close()
+    assert all(f.closed for f in runs)
+
+
+def test_sort_by_connector_external():
+    connector = SortByConnector(
+        {"b": SORT_ASC, "a": SORT_DESC},
+        EntriesConnector(ENTRIES),
+        max_run_size=2,
+        codec="json"
+    )
+    assert str(connector) == "SORT BY b ASC, a DESC"
+    assert connector.query(Query()) == [
+        {"a": 100, "b": 2, "c": 30},
+        {"a": 10, "b": 200, "c": 300},
+        {"a": 1, "b": 200, "c": 31},
+        {"a": 1, "b": 250, "c": 3}
+    ]
+    try:
+        SortByConnector(["a"], EntriesConnector(ENTRIES), codec="xml")
+        assert False, "ValueError not raised"
+    except ValueError:
+        pass
@@ -0,0 +1,198 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+from minifold.binary_predicate import BinaryPredicate
+from minifold.query import ACTION_CREATE, ACTION_DELETE, ACTION_UPDATE, Query, SORT_DESC
+from minifold.sqlite import SqliteConnector
+
+ENTRIES = [
+    {"a": 1, "b": 2, "c": "foo"},
+    {"a": 10, "b": 20, "c": "bar"},
+    {"a": 100, "b": 200, "c": "foobar"},
+    {"a": 100, "b": 200, "c": None},
+]
+
+
+def make_connector(batch_size: int = 2) -> SqliteConnector:
+    connector = SqliteConnector(":memory:", batch_size=batch_size)
+    connector.connection.execute("CREATE TABLE entries (a INTEGER, b INTEGER, c TEXT)")
+    connector.query(Query(action=ACTION_CREATE, object="entries", values=ENTRIES))
+    return connector
+
+
+def test_binary_predicate_to_sql():
+    p = BinaryPredicate(
+        BinaryPredicate("a", "<=", 10),
+        "||",
+        BinaryPredicate(
+            BinaryPredicate("b", "IN", (200, 300)),
+            "&&",
+            BinaryPredicate("c", "!=", "foo")
+        )
+    )
+    assert SqliteConnector.binary_predicate_to_sql(p) == (
+        '("a" <= ?) OR (("b" IN (?, ?)) AND ("c" IS NOT ?))',
+        [10, 200, 300, "foo"]
+    )
+    for p in [
+        BinaryPredicate("a", "CONTAINS", 1),
+        BinaryPredicate(BinaryPredicate("a", "==", 1), "^", BinaryPredicate("b", "==", 2)),
+    ]:
+        try:
+            SqliteConnector.binary_predicate_to_sql(p)
+            assert False, "ValueError not raised for %s" % p
+        except ValueError:
+            pass
+
+
+def test_sqlite_attributes():
+    connector = make_connector()
+    assert connector.attributes("entries") == {"a", "b", "c"}
+
+
+def test_sqlite_select():
+    connector = make_connector()
+    assert connector.query(Query(object="entries")) == ENTRIES
+    obtained = connector.query(
+        Query(
+            object="entries",
+            attributes=["a", "c"],
+            filters=BinaryPredicate("a", ">=", 10),
+            sort_by={"a": SORT_DESC, "c": SORT_DESC},
+            offset=1,
+            limit=2
+        )
+    )
+    assert obtained == [{"a": 100, "c": None}, {"a": 10, "c": "bar"}]
+
+
+def test_sqlite_where_operators():
+    connector = make_connector()
+
+    def query_a(filters) -> list:
+        return [entry["a"] for entry in connector.query(Query(object="entries", filters=filters))]
+
+    assert query_a(BinaryPredicate("c", "CONTAINS", "foo")) == [1, 100]
+    assert query_a(BinaryPredicate("c", "==", None)) == [100]
+    assert query_a(BinaryPredicate("c", "!=", "foo")) == [10, 100, 100]
+    assert query_a(BinaryPredicate("a", "IN", [])) == []
+    assert query_a(BinaryPredicate("a", "IN", [1, 10])) == [1, 10]
+
+
+def test_sqlite_local_filter():
+    # The lambda is evaluated locally, before the OFFSET and the LIMIT.
+    connector = make_connector()
+    obtained = connector.query(
+        Query(
+            object="entries",
+            attributes=["a"],
+            filters=BinaryPredicate(
+                BinaryPredicate("a", ">", 1),
+                "&&",
+                lambda entry: entry["c"] is None or entry["c"].startswith("foo")
+            ),
+            limit=1
+        )
+    )
+    assert obtained == [{"a": 100}]
+
+
+def test_sqlite_select_columns():
+    connector = make_connector()
+    statements = list()
+    connector.connection.set_trace_callback(statements.append)
+
+    def query(attributes: list, filters: object = None) -> list:
+        statements.clear()
+        ret = connector.query(Query(object="entries", attributes=attributes, filters=filters))
+        (sql,) = [statement for statement in statements if statement.startswith("SELECT")]
+        return (sql, ret)
+
+    assert query(["c", "a"]) == (
+        'SELECT "a", "c" FROM "entries"',
+        [{"c": entry["c"], "a": entry["a"]} for entry in ENTRIES]
+    )
+    # The column needed by the lambda is fetched, then stripped.
+    assert query(["a"], lambda entry: entry["b"] > 2) == (
+        'SELECT "a", "b" FROM "entries"',
+        [{"a": 10}, {"a": 100}, {"a": 100}]
+    )
+    # The dependencies of this lambda cannot be inferred from its bytecode.
+    assert query(["a"], lambda entry: len(entry) == 3 and entry["b"] > 2) == (
+        'SELECT * FROM "entries"',
+        [{"a": 10}, {"a": 100}, {"a": 100}]
+    )
+    # The missing attributes are not selected.
+    assert query(["a", "missing"]) == (
+        'SELECT "a" FROM "entries"',
+        [{"a": entry["a"], "missing": None} for entry in ENTRIES]
+    )
+    assert query(["missing"]) == (
+        'SELECT NULL FROM "entries"',
+        [{"missing": None} for entry in ENTRIES]
+    )
+
+
+def test_sqlite_query_gen():
+    connector = make_connector(batch_size=1)
+    gen = connector.query_gen(Query(object="entries"))
+    assert next(gen) == ENTRIES[0]
+    assert len(list(gen)) == 3
+
+
+def test_sqlite_update_delete():
+    connector = make_connector()
+    connector.query(Query(
+        action=ACTION_UPDATE,
+        object="entries",
+        filters=BinaryPredicate("a", "==", 100),
+        values={"b": 0}
+    ))
+    assert [entry["b"] for entry in connector.query(Query(object="entries"))] == [2, 20, 0, 0]
+
+    # Partially evaluated locally
+    connector.query(Query(
+        action=ACTION_UPDATE,
+        object="entries",
+        filters=BinaryPredicate(BinaryPredicate("a", "<", 100), "&&", lambda entry: entry["c"] == "bar"),
+        values={"c": "baz"}
+    ))
+    assert [entry["c"] for entry in connector.query(Query(object="entries"))] == [
+        "foo", "baz", "foobar", None
+    ]
+
+    connector.query(Query(
+        action=ACTION_DELETE,
+        object="entries",
+        filters=lambda entry: entry["b"] == 0
+    ))
+    connector.query(Query(
+        action=ACTION_DELETE,
+        object="entries",
+        filters=BinaryPredicate("a", "==", 1)
+    ))
+    assert connector.query(Query(object="entries", attributes=["a"])) == [{"a": 10}]
+
+
+def test_sqlite_insert_heterogeneous():
+    connector = SqliteConnector(":memory:", batch_size=2)
+    connector.connection.execute("CREATE TABLE t (a INTEGER, b INTEGER)")
+    values = [{"a": 1}, {"a": 2, "b": 3}, {"b": 4, "a": 5}, {"a": 6}, {"a": 7}, {"a": 8}]
+    connector.query(Query(action=ACTION_CREATE, object="t", values=values))
+    assert connector.query(Query(object="t", attributes=["a"])) == [
+        {"a": a} for a in [1, 2, 5, 6, 7, 8]
+    ]
+    assert connector.query(Query(object="t", filters=BinaryPredicate("b", "!=", None))) == [
+        {"a": 2, "b": 3}, {"a": 5, "b": 4}
+    ]
+
+
+def test_sqlite_count():
+    connector = make_connector()
+    assert connector.count(Query(object="entries")) == 4
+    assert connector.count(Query(object="entries", filters=BinaryPredicate("a", ">=", 10))) == 3
+    assert connector.count(Query(object="entries", offset=1, limit=2)) == 2
+    assert connector.count(Query(object="entries", filters=lambda e: e["a"] == 100)) == 2
@@ -0,0 +1,93 @@
+#!/usr/bin/env pytest-3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the minifold project.
+# https://github.com/nokia/minifold
+
+from minifold.query import Query
+
+try:
+    from minifold.twitter import TwitterConnector
+
+    class Tweet:
+        def __init__(self, id: int):
+            self.id = id
+            self._json = {
+                "full_text": "Tweet %d https://t.co/xyz" % id,
+                "entities": {"media": [{"media_url": "https://example.org/%d.jpg" % id}]},
+                "user": {"name": "Alice", "profile_image_url": "https://example.org/alice.jpg"},
+                "created_at": "Wed Oct 10 20:19:24 +0000 2018",
+            }
+
+    class StubApi:
+        """Stubs the tweepy timeline API: tweets are sorted from the newest to the oldest."""
+        def __init__(self, ids: list):
+            self.ids = sorted(ids, reverse=True)
+            self.calls = list()
+
+        def user_timeline(self, id=None, tweet_mode=None, count=20, since_id=None, max_id=None):
+            self.calls.append({"count": count, "since_id": since_id, "max_id": max_id})
+            return [
+                Tweet(i) for i in self.ids
+                if (since_id is None or i > since_id) and (max_id is None or i <= max_id)
+            ][:count]
+
+        home_timeline = user_timeline
+
+    class StubTwitterConnector(TwitterConnector):
+        def __init__(self, ids: list, **kwargs):
+            self.stub_api = StubApi(ids)
+            super().__init__("alice", "key", "secret", "token", "token_secret", **kwargs)
+
+        def connect(self):
+            self.api = self.stub_api
+
+    def texts(entries: list) -> list:
+        return [entry["text"] for entry in entries]
+
+    def test_twitter_query():
+        connector = StubTwitterConnector(range(1, 11), page_size=3)
+        entries = connector.query(Query(object="self", attributes=["text"], offset=1, limit=4))
+        assert entries == [{"text": "Tweet %d" % i} for i in [9, 8, 7, 6]]
+        assert [call["count"] for call in connector.api.calls] == [3, 2]
+        assert len(connector.query(Query(object="feed"))) == 10
+
+    def test_twitter_incremental(tmp_path):
+        connector = StubTwitterConnector(
+            range(1, 11), incremental=True, store_dir=str(tmp_path), page_size=3
+        )
+        calls = connector.api.calls
+
+        # Initial synchronization
+        assert texts(connector.query(Query(object="self", limit=2))) == ["Tweet 10", "Tweet 9"]
+        assert len(calls) == 1
+
+        # Only the new tweets are fetched.
+        connector.api.ids = [12, 11] + connector.api.ids
+        del calls[:]
+        assert texts(connector.query(Query(object="self", limit=3))) == [
+            "Tweet 12", "Tweet 11", "Tweet 10"
+        ]
+        assert {call["since_id"] for call in calls} == {10}
+
+        # Older tweets are fetched using max_id.
+        del calls[:]
+        entries = connector.query(Query(object="self", offset=3, limit=3))
+        assert texts(entries) == ["Tweet 9", "Tweet 8", "Tweet 7"]
+        assert calls[-1]["max_id"] == 8
+
+        # The timeline persists across connector instances.
+        connector = StubTwitterConnector(
+            range(1, 13), incremental=True, store_dir=str(tmp_path), page_size=3
+        )
+        entries = connector.query(Query(object="self", limit=5))
+        assert texts(entries) == ["Tweet %d" % i for i in range(12, 7, -1)]
+        assert len(connector.api.calls) == 1
+
+        # Whole timeline
+        assert len(connector.query(Query(object="self"))) == 12
+        del connector.api.calls[:]
+        assert len(connector.query(Query(object="self"))) == 12
+        assert len(connector.api.calls) == 1
+except ImportError:
+    pass
@@ -6,7 +6,7 @@
 
 from minifold.entries_connector import EntriesConnector
 from minifold.query import Query
-from minifold.unique import unique, UniqueConnector
+from minifold.unique import CountDistinctConnector, UniqueConnector, count_distinct, unique
 
 
 ENTRIES = [
@@ -63,3 +63,51 @@ def test_unique_connector():
         {"a": 100, "b": 2, "c": 30}
     ]
     assert obtained == expected
+
+
+def test_unique_nested_values():
+    entries = [
+        {"a": [1, {"x": 2}], "b": 1},
+        {"a": [1, {"x": 2}], "b": 2},
+        {"a": [1, {"x": 3}], "b": 3},
+    ]
+    assert [entry["b"] for entry in unique(["a"], entries)] == [1, 3]
+    assert [entry["b"] for entry in unique(["a", "b"], entries)] == [1, 2, 3]
+
+
+def test_unique_limit_stops_early():
+    consumed = list()
+
+    def entries():
+        for i in range(1000):
+            consumed.append(i)
+            yield {"a": i % 3}
+
+    assert unique(["a"], entries(), limit=2) == [{"a": 0}, {"a": 1}]
+    assert len(consumed) == 2
+
+
+def test_unique_connector_offset_limit():
+    unique_connector = UniqueConnector(["b"], EntriesConnector(ENTRIES))
+    assert unique_connector.query(Query(offset=1, limit=1)) == [{"a": 100, "b": 2, "c": 30}]
+
+
+def test_count_distinct():
+    assert count_distinct(["b"], ENTRIES) == 2
+    assert count_distinct(["a", "b"], ENTRIES) == 3
+    entries = [{"a": i % 5000} for i in range(20000)]
+    assert count_distinct(["a"], entries) == 5000
+    assert abs(count_distinct(["a"], entries, error=0.02) - 5000) < 5000 * 0.1
+
+
+def test_count_distinct_mixed_types():
+    entries = [{"a": 1}, {"a": "1"}, {"a": 2}, {"a": "2"}]
+    assert count_distinct(["a"], entries) == 4
+    assert count_distinct(["a"], entries, error=0.01) == 4
+
+
+def test_count_distinct_connector():
+    connector = CountDistinctConnector(["b"], EntriesConnector(ENTRIES))
+    assert connector.query(Query()) == 2
+    connector = CountDistinctConnector(["a"], EntriesConnector(ENTRIES), error=0.05)
+    assert connector.query(Query()) == 3